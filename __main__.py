@@ -15,6 +15,7 @@ from src.usa_forecast import usa_forecast_code as fc
 from src.usa_forecast.aux_functions.open_browser_code import open_browser
 from src.usa_forecast.calculations import build_forecast_summary_table as bf
 from src.usa_forecast.services import historical_analysis as ha
+from src.usa_forecast.services import warm_restart as wr
 from src.usa_forecast.dashboard.app_callback import app_callback
 from src.usa_forecast.dashboard.callbacks.target_price_table_callback import register_callback_actuals
 from src.usa_forecast.dashboard.callbacks.front_callback import register_callback_forecast_table
@@ -23,6 +24,9 @@ from src.usa_forecast.dashboard.callbacks.plot_callback import register_callback
 from src.usa_forecast.dashboard.callbacks.stock_analysis_callback import register_callback_market_analysis
 from dash.dependencies import Input, Output
 from src.usa_forecast.dashboard.dash_components.navigation import build_navbar
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.storage import output_archive as oa
 
 import pandas as pd
 from datetime import datetime
@@ -53,16 +57,11 @@ import dash_html_components as html
 #
 #%%
 
-def save_daily_dict(date_dict, output_folder="Output/Daily_Price_Target_Analysis"):
-    os.makedirs(output_folder, exist_ok=True)
-    for date, df in date_dict.items():
-        if hasattr(date, "strftime"):
-            date_str = date.strftime("%Y-%m-%d")
-        else:
-            date_str = str(date).split()[0]
-
-        path = os.path.join(output_folder, f"{date_str}.csv")
-        df.to_csv(path, index=True)
+def save_daily_dict(date_dict):
+    # Un csv por fecha reciente en Output/Daily_Price_Target_Analysis, las viejas en su archivo compactado
+    bw.get_writer().submit("daily analysis", oa.get_daily_archive().write, date_dict)
+    bw.get_writer().submit("output compaction", oa.get_daily_archive().run)
+    bw.get_writer().submit("output manifest", of.get_outputs().save)
 
 #%%
 configurator = ExcelConfigurator(
@@ -73,84 +72,106 @@ configuration = configurator.get_configuration()
 
 #%%
 
-final_dict, mkt_data = fc.main(configuration=configuration)
+def build_forecast_tables(final_dict, mkt_data):
+    forecast_tables_dict: dict[datetime.date, pd.DataFrame] = {}
 
-#%%
+    for snapshot_date in final_dict.keys():
+        try:
+            snapshot_ts = pd.Timestamp(snapshot_date)
+            snapshot = ha.extract_snapshot(data_dict=mkt_data, snapshot_date=snapshot_ts)
+            forecast_table = bf.build_forecast_summary_table(data_dict=snapshot)
+            forecast_tables_dict[snapshot_date] = forecast_table
+        except Exception as e:
+            logger.warning(f"Error building forecast table for {snapshot_date}: {e}")
 
-lista = list(final_dict.keys())
-
-df = final_dict[lista[0]]
+    latest_timestamp = max(df.index.max() for df in mkt_data.values())
+    latest_snapshot = ha.extract_snapshot(data_dict=mkt_data, snapshot_date=latest_timestamp)
 
+    latest_forecast_table = bf.build_forecast_summary_table(data_dict=latest_snapshot)
 
-#%%
+    forecast_tables_dict[latest_timestamp.date()] = latest_forecast_table
 
-forecast_tables_dict: dict[datetime.date, pd.DataFrame] = {}
-
-for snapshot_date in final_dict.keys():
-    try:
-        snapshot_ts = pd.Timestamp(snapshot_date)
-        snapshot = ha.extract_snapshot(data_dict=mkt_data, snapshot_date=snapshot_ts)
-        forecast_table = bf.build_forecast_summary_table(data_dict=snapshot)
-        forecast_tables_dict[snapshot_date] = forecast_table
-    except Exception as e:
-        logger.warning(f"Error building forecast table for {snapshot_date}: {e}")
+    return forecast_tables_dict
 
 #%%
 
-latest_timestamp = max(df.index.max() for df in mkt_data.values())
-latest_snapshot = ha.extract_snapshot(data_dict=mkt_data, snapshot_date=latest_timestamp)
-
-latest_forecast_table = bf.build_forecast_summary_table(data_dict=latest_snapshot)
+def build_date_dict(mkt_data, configuration):
+    all_dates = mkt_data[next(iter(mkt_data))].index
 
-forecast_tables_dict[latest_timestamp.date()] = latest_forecast_table
+    dates_for_analysis = ha.generate_summary_dates(all_dates=all_dates,
+                                                   configuration=configuration)
 
-#%%
+    last_date_in_data = max(
+        max(df.index) for df in mkt_data.values()
+    )
 
+    if last_date_in_data not in dates_for_analysis:
+        dates_for_analysis = dates_for_analysis.append(
+            pd.DatetimeIndex([last_date_in_data])
+        )
 
-all_dates = mkt_data[next(iter(mkt_data))].index
+    cols = ["Compra_Apartir_de",
+            "Precio_Minimo_Que_Puede_Llegar",
+            "Vender_Apartir_De",
+            "Precio_Maximo_Que_Puede_Llegar",
+            "Rate"]
 
-dates_for_analysis = ha.generate_summary_dates(all_dates=all_dates,
-                                               configuration=configuration)
+    date_dict = {date: {} for date in dates_for_analysis}
 
-#%%
+    for ticker, df in mkt_data.items():
+        # filtrar el DataFrame del ticker para solo fechas en dates_for_analysis
+        df_filtered = df.loc[df.index.intersection(dates_for_analysis), cols]
 
+        for date, row in df_filtered.iterrows():
+            date_dict[date][ticker] = row.to_dict()
 
-last_date_in_data = max(
-    max(df.index) for df in mkt_data.values()
-)
+    for date in date_dict:
+        if date_dict[date]:
+            date_dict[date] = pd.DataFrame.from_dict(date_dict[date], orient="index")[cols]
+        else:
+            date_dict[date] = pd.DataFrame(columns=cols)
 
-if last_date_in_data not in dates_for_analysis:
-    dates_for_analysis = dates_for_analysis.append(
-        pd.DatetimeIndex([last_date_in_data])
-    )
+    return date_dict
 
 #%%
 
-cols = ["Compra_Apartir_de",
-        "Precio_Minimo_Que_Puede_Llegar",
-        "Vender_Apartir_De",
-        "Precio_Maximo_Que_Puede_Llegar",
-        "Rate"]
-
-date_dict = {date: {} for date in dates_for_analysis}
-
-for ticker, df in mkt_data.items():
-    # filtrar el DataFrame del ticker para solo fechas en dates_for_analysis
-    df_filtered = df.loc[df.index.intersection(dates_for_analysis), cols]
-
-    for date, row in df_filtered.iterrows():
-        date_dict[date][ticker] = row.to_dict()
-
-for date in date_dict:
-    if date_dict[date]:
-        date_dict[date] = pd.DataFrame.from_dict(date_dict[date], orient="index")[cols]
-    else:
-        date_dict[date] = pd.DataFrame(columns=cols)
-
+# Mismos insumos que la última corrida: se carga el estado guardado en vez de recalcularlo
+# Los almacenamientos y el escritor se configuran aunque main no corra
+fc.configure_runtime(configuration=configuration)
+state_groups = ("final_dict", "mkt_data", "forecast_tables_dict", "date_dict")
+state = wr.load_state(configuration, groups=state_groups) if configuration.warm_restart == "True" else None
+
+if state is not None:
+    final_dict = state["final_dict"]
+    mkt_data = state["mkt_data"]
+    forecast_tables_dict = state["forecast_tables_dict"]
+    date_dict = state["date_dict"]
+else:
+    final_dict, mkt_data = fc.main(configuration=configuration)
+    forecast_tables_dict = build_forecast_tables(final_dict=final_dict, mkt_data=mkt_data)
+    date_dict = build_date_dict(mkt_data=mkt_data, configuration=configuration)
+
+    save_daily_dict(date_dict=date_dict)
+
+    if configuration.warm_restart == "True":
+        # Después de las escrituras de la corrida, que definen el hash de los insumos
+        bw.get_writer().submit(
+            "warm restart state",
+            wr.save_state,
+            configuration,
+            {
+                "final_dict": final_dict,
+                "mkt_data": mkt_data,
+                "forecast_tables_dict": forecast_tables_dict,
+                "date_dict": date_dict,
+            }
+        )
 
 #%%
 
-save_daily_dict(date_dict=date_dict, output_folder="Output/Daily_Price_Target_Analysis")
+lista = list(final_dict.keys())
+
+df = final_dict[lista[0]]
 
 #%%
 
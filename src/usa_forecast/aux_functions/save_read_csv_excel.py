@@ -1,3 +1,7 @@
+from src.usa_forecast.storage import ticker_store as ts
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.calculations import lazy_targets as lt
+
 from pathlib import Path
 import pandas as pd
 
@@ -5,7 +9,8 @@ import pandas as pd
 
 def export_results_to_csv(
     results: dict[str, pd.DataFrame],
-    output_dir: str = "Output"
+    output_dir: str = "Output",
+    store: ts.TickerStore | None = None
 ) -> None:
     """
     Exports each DataFrame in the results dictionary to a CSV file.
@@ -17,9 +22,19 @@ def export_results_to_csv(
         Dictionary mapping ticker symbols to their enriched DataFrames.
     output_dir : str, optional
         Directory where CSV files will be saved (default is 'Output').
+    store : TickerStore, optional
+        When given, the results are written through the store, in its format and folder,
+        instead of as CSV files in ``output_dir``.
     """
+    if store is not None:
+        store.write_many(results)
+        return
+
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
     for ticker, df in results.items():
         file_path = Path(output_dir) / f"{ticker}.csv"
-        df.to_csv(file_path)
+        # Con objetivos perezosos sólo se guardan las columnas base
+        if isinstance(df, lt.LazyTargetFrame):
+            df = df.base
+        of.write_csv(file_path, df)
@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 #%%
 
@@ -6,7 +9,8 @@ def add_lagged_return_columns(
     df: pd.DataFrame,
     column: str,
     lags: tuple[int, ...],
-    prefix: str = "P"
+    prefix: str = "P",
+    tail_rows: int | None = None
 ) -> pd.DataFrame:
     """
     Adds percentage return columns based on specified lags to a DataFrame.
@@ -21,6 +25,9 @@ def add_lagged_return_columns(
         Tuple of integer lags (e.g., [5, 10, 15]) to compute returns over.
     prefix : str, optional
         Prefix for the new columns (default is "P").
+    tail_rows : int, optional
+        If given, only the last ``tail_rows`` rows are recomputed and the earlier rows keep
+        their current values. Used when new rows are appended to an already enriched history.
 
     Returns
     -------
@@ -38,6 +45,28 @@ def add_lagged_return_columns(
 
     lag_columns = []
 
+    if tail_rows is not None:
+        tail_rows = min(tail_rows, len(df))
+        if tail_rows == 0:
+            return df
+
+        # Only the rows inside the widest lag window of the new rows are needed
+        window = df[column].iloc[-(tail_rows + max(lags)):]
+
+        for lag in lags:
+            col_name = f"{prefix}{lag}"
+            if col_name not in df.columns:
+                df[col_name] = np.nan
+            values = (window / window.shift(lag) - 1) * 100
+            df.iloc[-tail_rows:, df.columns.get_loc(col_name)] = values.iloc[-tail_rows:].to_numpy()
+            lag_columns.append(col_name)
+
+        if "Total_%" not in df.columns:
+            df["Total_%"] = np.nan
+        df.iloc[-tail_rows:, df.columns.get_loc("Total_%")] = df[lag_columns].iloc[-tail_rows:].sum(axis=1).to_numpy()
+
+        return df
+
     for lag in lags:
         col_name = f"{prefix}{lag}"
         df[col_name] = (df[column] / df[column].shift(lag) - 1) * 100
@@ -47,9 +76,66 @@ def add_lagged_return_columns(
 
     return df
 
-# def add_lagged_return_columns_arrow(table: pa.Table, column: str, lags: list[int], prefix: str = "P") -> pa.Table:
-#     for lag in lags:
-#         shifted = pc.shift(table[column], periods=lag)
-#         pct_return = pc.multiply(pc.divide(pc.subtract(table[column], shifted), shifted), 100)
-#         table = table.append_column(f"{prefix}{lag}", pct_return)
-#     return table
+def shift_array(values: pa.Array | pa.ChunkedArray, periods: int) -> pa.Array:
+    """
+    Shifts an Arrow array down by ``periods`` rows, filling the head with nulls.
+    Built from a zero-copy slice, the values are not copied until concatenated.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    periods = min(periods, len(values))
+    return pa.concat_arrays([pa.nulls(periods, type=values.type), values.slice(0, len(values) - periods)])
+
+def set_table_column(table: pa.Table, name: str, values: pa.Array) -> pa.Table:
+    """
+    Replaces ``name`` in place if the table already has it, otherwise appends it,
+    like assigning a DataFrame column.
+    """
+    index = table.schema.get_field_index(name)
+    if index == -1:
+        return table.append_column(name, values)
+    return table.set_column(index, name, values)
+
+def add_lagged_return_columns_arrow(
+    table: pa.Table,
+    column: str,
+    lags: tuple[int, ...],
+    prefix: str = "P"
+) -> pa.Table:
+    """
+    Arrow counterpart of add_lagged_return_columns, computed with Arrow compute kernels.
+
+    Parameters
+    ----------
+    table : pa.Table
+        Table containing the time series data, sorted by date.
+    column : str
+        Name of the column to calculate lagged returns from (e.g., 'close').
+    lags : tuple[int]
+        Tuple of integer lags (e.g., [5, 10, 15]) to compute returns over.
+    prefix : str, optional
+        Prefix for the new columns (default is "P").
+
+    Returns
+    -------
+    pa.Table
+        Table with the lagged percentage return columns and 'Total_%' added.
+    """
+    if column not in table.column_names:
+        raise ValueError(f"Column '{column}' not found in Table.")
+
+    values = pc.cast(table[column], pa.float64()).combine_chunks()
+    lag_columns = []
+
+    for lag in lags:
+        shifted = shift_array(values, lag)
+        pct_return = pc.multiply(pc.subtract(pc.divide(values, shifted), 1.0), 100.0)
+        table = set_table_column(table, f"{prefix}{lag}", pct_return)
+        lag_columns.append(pct_return)
+
+    # Missing returns count as 0 in the total, like DataFrame.sum(skipna=True)
+    total = pa.array(np.zeros(len(values)))
+    for pct_return in lag_columns:
+        total = pc.add(total, pc.fill_null(pc.if_else(pc.is_nan(pct_return), 0.0, pct_return), 0.0))
+
+    return set_table_column(table, "Total_%", total)
@@ -0,0 +1,236 @@
+#Libraries
+import collections.abc
+import threading
+import typing
+
+import numpy as np
+import pandas as pd
+
+#%%
+
+# Rows of the max/min % windows of the price targets. Every engine, the lazy frames and
+# the frames rebuilt from stored data use it, so their values cannot drift apart
+LOOKBACK = 100
+
+# Columns that only repeat another one under the name shown in the dashboard
+ALIASES = {
+    "Compra_Apartir_de": "MaxMin",
+    "Precio_Minimo_Que_Puede_Llegar": "MinMin",
+    "Precio_Maximo_Que_Puede_Llegar": "MaxMax",
+}
+
+
+def target_columns(lags: tuple[int, ...]) -> list[str]:
+    """
+    Columns added by calculate_price_targets, in the order it adds them.
+    """
+    return (
+        [f"Max%_{lag}" for lag in lags]
+        + [f"Min%_{lag}" for lag in lags]
+        + [f"MaxPT_{lag}" for lag in lags]
+        + [f"MinPT_{lag}" for lag in lags]
+        + [
+            "MinMax%", "Alcance", "Max",
+            "MaxMax", "AvgMax", "MinMax",
+            "MaxMin", "AvgMin", "MinMin",
+            "Rate_For_Max_Min", "HighMin", "Vender_Apartir_De", "Rate",
+        ]
+        + list(ALIASES)
+    )
+
+
+class LazyTargetFrame:
+    """
+    Price data of a ticker holding only the stored columns (OHLCV, lag returns, 52-week
+    low) and computing the price target columns when they are first asked for.
+
+    ``frame["AvgMax"]`` computes AvgMax and only the columns it depends on, and keeps each
+    of them in a per-column cache. ``to_frame`` materializes a regular DataFrame, the same
+    calculate_price_targets returns, and ``snapshot`` the row of one date from the last
+    ``lookback`` rows only.
+
+    The formulas live here and calculate_price_targets uses them, so both ways give the
+    same values.
+    """
+
+    def __init__(
+        self,
+        base: pd.DataFrame,
+        lags: tuple[int, ...],
+        column: str = "close",
+        lookback: int = LOOKBACK,
+        prefix: str = "P"
+    ):
+        """
+        Parameters
+        ----------
+        base : pd.DataFrame
+            Data with the price column, the lag return columns and '52_week_low'. Target
+            columns already in it are ignored and computed again.
+        lags : tuple[int, ...]
+            Lags of the return columns.
+        column : str
+            Price column the targets are based on.
+        lookback : int
+            Rolling window of the max/min % columns.
+        prefix : str
+            Prefix of the lag return columns.
+        """
+        derived = set(target_columns(lags))
+        self.base = base.drop(columns=[name for name in base.columns if name in derived])
+        self.lags = tuple(lags)
+        self.column = column
+        self.lookback = lookback
+        self.prefix = prefix
+        self._cache: dict[str, pd.Series] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return self.base.index
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.base.columns.append(pd.Index(target_columns(self.lags)))
+
+    @property
+    def empty(self) -> bool:
+        return self.base.empty
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.base.columns or name in target_columns(self.lags)
+
+    def __getitem__(self, key: str | list[str]) -> pd.Series | pd.DataFrame:
+        if isinstance(key, str):
+            with self._lock:
+                return self._get(key, self._cache)
+        return self.to_frame(columns=list(key))
+
+    @property
+    def cached_columns(self) -> list[str]:
+        with self._lock:
+            return list(self._cache)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _get(self, name: str, cache: dict[str, pd.Series]) -> pd.Series:
+        if name in self.base.columns:
+            return self.base[name]
+        if name not in cache:
+            cache[name] = self._derive(name, lambda dependency: self._get(dependency, cache))
+        return cache[name]
+
+    def _derive(self, name: str, get: typing.Callable[[str], pd.Series]) -> pd.Series:
+        column, lags, prefix = self.column, self.lags, self.prefix
+
+        if name in ALIASES:
+            return get(ALIASES[name]).rename(name)
+
+        kind, _, lag = name.partition("_")
+        if kind in {"Max%", "Min%"} and lag:
+            rolling = get(f"{prefix}{lag}").rolling(window=self.lookback, min_periods=1)
+            values = rolling.max() if kind == "Max%" else rolling.min()
+        elif kind in {"MaxPT", "MinPT"} and lag:
+            pct = get(f"{kind[:3]}%_{lag}")
+            values = self.base[column].shift(int(lag)) * (1 + pct / 100)
+        elif name == "MinMax%":
+            values = pd.concat([get(f"Max%_{lag}") for lag in lags], axis=1).min(axis=1)
+        elif name == "Alcance":
+            values = self.base[column] * (1 + get("MinMax%") / 100)
+        elif name == "Max":
+            values = get("52_week_low") * (1 + get("MinMax%") / 100)
+        elif name in {"MaxMax", "AvgMax", "MinMax", "MaxMin", "AvgMin", "MinMin"}:
+            targets = pd.concat([get(f"{name[-3:]}PT_{lag}") for lag in lags], axis=1)
+            values = getattr(targets, {"Max": "max", "Avg": "mean", "Min": "min"}[name[:3]])(axis=1)
+        elif name == "Rate_For_Max_Min":
+            values = (get("MinMax") - get("close")) / get("close")
+        elif name == "HighMin":
+            values = (get("52_week_low") * get("Rate_For_Max_Min")) + get("52_week_low")
+        elif name == "Vender_Apartir_De":
+            values = pd.Series(
+                np.where(get("HighMin") < get("close"), get("MinMax"), get("HighMin")),
+                index=self.base.index
+            )
+        elif name == "Rate":
+            values = ((get("MaxMin") / get("close")) - 1) * 100
+        else:
+            raise KeyError(name)
+
+        return values.rename(name)
+
+    def to_frame(self, columns: list[str] | None = None, cache: bool = False) -> pd.DataFrame:
+        """
+        Materializes a DataFrame with ``columns`` (all of them by default).
+
+        Parameters
+        ----------
+        columns : list[str], optional
+            Columns to include, in this order.
+        cache : bool
+            Keep the computed columns in the per-column cache. By default they are
+            released with the returned DataFrame.
+        """
+        with self._lock:
+            store = self._cache if cache else dict(self._cache)
+            if columns is None:
+                df = self.base.copy()
+                for name in target_columns(self.lags):
+                    df[name] = self._get(name, store)
+                return df
+            return pd.DataFrame({name: self._get(name, store) for name in columns}, index=self.base.index)
+
+    def snapshot(self, date: pd.Timestamp) -> pd.DataFrame | None:
+        """
+        One-row DataFrame with every column on ``date``, or on the last date before it,
+        like historical_analysis.extract_snapshot. Only the rows inside the rolling and
+        lag windows of that date are used. None if there is no date before it.
+        """
+        position = self.base.index.searchsorted(date, side="right") - 1
+        if position < 0:
+            return None
+        start = max(0, position - max(self.lookback - 1, max(self.lags, default=0)))
+        window = LazyTargetFrame(
+            base=self.base.iloc[start:position + 1],
+            lags=self.lags,
+            column=self.column,
+            lookback=self.lookback,
+            prefix=self.prefix
+        )
+        return window.to_frame().iloc[[-1]]
+
+
+class LazyResults(collections.abc.Mapping):
+    """
+    The ``mkt_data`` dict of a lazy run: ticker -> DataFrame, each access materializing
+    the full DataFrame of that ticker (not cached, so memory only grows with what is in
+    use). ``frame(ticker)`` gives the LazyTargetFrame itself.
+    """
+
+    def __init__(self, frames: dict[str, LazyTargetFrame]):
+        self.frames = frames
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        return self.frames[ticker].to_frame()
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def frame(self, ticker: str) -> LazyTargetFrame:
+        return self.frames[ticker]
+
+
+def ensure_frame(data: pd.DataFrame | LazyTargetFrame, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    A regular DataFrame with ``columns`` (all by default) from either kind of ticker data.
+    """
+    if isinstance(data, LazyTargetFrame):
+        return data.to_frame(columns=columns)
+    return data if columns is None else data[columns]
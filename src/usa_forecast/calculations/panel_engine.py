@@ -0,0 +1,185 @@
+from src.usa_forecast.calculations import rolling as rr
+from src.usa_forecast.calculations import lazy_targets as lt
+
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+# Tickers computed together; bounds the matrices to a few hundred MB on long histories
+PANEL_CHUNK = 128
+
+
+def _matrix(frames: list[pd.DataFrame], name: str, rows: int) -> np.ndarray:
+    """
+    rows × tickers float64 matrix of one column. Each ticker fills its own column from the
+    top, in its own row order; shorter histories are padded with NaN at the bottom, which
+    the trailing windows and shifts never look at.
+    """
+    matrix = np.full((rows, len(frames)), np.nan)
+    for j, df in enumerate(frames):
+        matrix[:len(df), j] = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    return matrix
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _nan_sum(arrays: list[np.ndarray]) -> np.ndarray:
+    # Sequential, in column order, like DataFrame.sum(axis=1) over a few columns
+    total = np.zeros_like(arrays[0])
+    for values in arrays:
+        total = total + np.where(np.isnan(values), 0.0, values)
+    return total
+
+
+def _nan_mean(arrays: list[np.ndarray]) -> np.ndarray:
+    count = np.zeros_like(arrays[0])
+    for values in arrays:
+        count = count + ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, _nan_sum(arrays) / count, np.nan)
+
+
+def _panel_columns(
+    price: np.ndarray,
+    close: np.ndarray,
+    week_low: np.ndarray,
+    lags: tuple[int, ...],
+    lookback: int,
+    prefix: str
+) -> dict[str, np.ndarray]:
+    """
+    Lag returns, 'Total_%' and every target column of calculate_price_targets, each as a
+    rows × tickers matrix. One vectorized pass per lag, whatever the number of tickers.
+    """
+    columns: dict[str, np.ndarray] = {}
+    max_pct, min_pct, max_pt, min_pt = {}, {}, {}, {}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for lag in lags:
+            shifted = _shift(price, lag)
+            returns = (price / shifted - 1) * 100
+            columns[f"{prefix}{lag}"] = returns
+
+            max_pct[lag] = rr.rolling_max(returns, window=lookback)
+            min_pct[lag] = rr.rolling_min(returns, window=lookback)
+            max_pt[lag] = shifted * (1 + max_pct[lag] / 100)
+            min_pt[lag] = shifted * (1 + min_pct[lag] / 100)
+
+        columns["Total_%"] = _nan_sum([columns[f"{prefix}{lag}"] for lag in lags])
+
+        columns.update({f"Max%_{lag}": max_pct[lag] for lag in lags})
+        columns.update({f"Min%_{lag}": min_pct[lag] for lag in lags})
+        columns.update({f"MaxPT_{lag}": max_pt[lag] for lag in lags})
+        columns.update({f"MinPT_{lag}": min_pt[lag] for lag in lags})
+
+        # fmin/fmax skip NaN and give NaN only when every lag is NaN, like min(axis=1)
+        min_max_pct = np.fmin.reduce(list(max_pct.values()))
+        columns["MinMax%"] = min_max_pct
+        columns["Alcance"] = price * (1 + min_max_pct / 100)
+        columns["Max"] = week_low * (1 + min_max_pct / 100)
+
+        columns["MaxMax"] = np.fmax.reduce(list(max_pt.values()))
+        columns["AvgMax"] = _nan_mean(list(max_pt.values()))
+        columns["MinMax"] = np.fmin.reduce(list(max_pt.values()))
+        columns["MaxMin"] = np.fmax.reduce(list(min_pt.values()))
+        columns["AvgMin"] = _nan_mean(list(min_pt.values()))
+        columns["MinMin"] = np.fmin.reduce(list(min_pt.values()))
+
+        columns["Rate_For_Max_Min"] = (columns["MinMax"] - close) / close
+        columns["HighMin"] = (week_low * columns["Rate_For_Max_Min"]) + week_low
+        columns["Vender_Apartir_De"] = np.where(columns["HighMin"] < close, columns["MinMax"], columns["HighMin"])
+        columns["Rate"] = ((columns["MaxMin"] / close) - 1) * 100
+
+    for alias, source in lt.ALIASES.items():
+        columns[alias] = columns[source]
+
+    return columns
+
+
+def calculate_panel_targets(
+    data_dict: dict[str, pd.DataFrame],
+    column: str = "close",
+    lags: tuple[int, ...] = (5, 10, 15),
+    lookback: int = lt.LOOKBACK,
+    prefix: str = "P"
+) -> dict[str, pd.DataFrame]:
+    """
+    Panel counterpart of add_lagged_return_columns plus calculate_price_targets for a
+    whole universe: same columns, same order, same values.
+
+    The price, close and 52-week low of the tickers are aligned in rows × tickers NumPy
+    matrices (row k of a column is the k-th row of that ticker, so histories of different
+    lengths keep their own lags and windows), every lag return and target is computed for
+    all tickers at once, and each ticker gets its DataFrame back from its matrix columns.
+    Tickers go through in chunks of PANEL_CHUNK.
+
+    Parameters
+    ----------
+    data_dict : dict[str, pd.DataFrame]
+        DataFrames indexed by date with the price column, 'close' and '52_week_low'.
+    column : str
+        Name of the price column the returns and targets are based on.
+    lags : tuple[int, ...]
+        Tuple of integer lag values (e.g., (5, 10, 15)).
+    lookback : int
+        Number of days to look back for max/min % calculations.
+    prefix : str
+        Prefix for lag return columns (default 'P').
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Enriched DataFrame per ticker. Tickers missing a required column are logged and
+        left out, like process_all_tickers does.
+    """
+    valid = {}
+    for ticker, df in data_dict.items():
+        missing = [name for name in dict.fromkeys((column, "close", "52_week_low")) if name not in df.columns]
+        if missing:
+            logger.error(f"Error processing {ticker}: missing columns {missing}")
+            continue
+        valid[ticker] = df
+
+    targets = lt.target_columns(lags)
+    lag_columns = [f"{prefix}{lag}" for lag in lags] + ["Total_%"]
+
+    results = {}
+    tickers = list(valid)
+    for start in range(0, len(tickers), PANEL_CHUNK):
+        chunk = tickers[start:start + PANEL_CHUNK]
+        frames = [valid[ticker] for ticker in chunk]
+        rows = max((len(df) for df in frames), default=0)
+
+        columns = _panel_columns(
+            price=_matrix(frames, column, rows),
+            close=_matrix(frames, "close", rows),
+            week_low=_matrix(frames, "52_week_low", rows),
+            lags=lags,
+            lookback=lookback,
+            prefix=prefix
+        )
+
+        # tickers × targets × rows: the targets of each ticker are one contiguous block,
+        # which its DataFrame uses as is
+        block = np.empty((len(chunk), len(targets), rows))
+        for c, name in enumerate(targets):
+            block[:, c, :] = columns[name].T
+
+        for j, (ticker, df) in enumerate(zip(chunk, frames)):
+            base = [name for name in df.columns if name not in targets]
+            frame = df[base] if len(base) < len(df.columns) else df.copy(deep=False)
+            for name in lag_columns:
+                frame[name] = columns[name][:len(df), j]
+            computed = pd.DataFrame(block[j, :, :len(df)].T, index=df.index, columns=targets, copy=False)
+            results[ticker] = pd.concat([frame, computed], axis=1)
+
+    return results
@@ -0,0 +1,166 @@
+#Modules
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.storage import output_files as of
+
+#Libraries
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+VALID_PRECISIONS = {"float64", "float32"}
+
+# Market data as downloaded; the precision policy only applies to the derived columns
+RAW_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Derived columns the price targets are computed from. They keep float64 so results
+# recomputed from a float32 cache (delta downloads, reloads) match the stored ones
+INPUT_COLUMN_PATTERN = re.compile(r"P\d+|52_week_low")
+
+# Largest relative difference accepted between a float32 column and its float64 values
+TOLERANCE = 1e-6
+
+
+def compact_frame(df: pd.DataFrame, precision: str = "float32") -> pd.DataFrame:
+    """
+    Applies the precision policy to an enriched DataFrame.
+
+    With 'float32' the derived float columns (targets, percentages, averages) become
+    float32, integer columns take the smallest integer type holding their values and text
+    columns become categorical. The raw prices and the lag returns and 52-week low the
+    targets are computed from keep float64. 'float64' returns ``df``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched data of a ticker.
+    precision : str
+        'float64' or 'float32'.
+
+    Returns
+    -------
+    pd.DataFrame
+        A new DataFrame, or ``df`` itself when nothing changes.
+    """
+    if precision == "float64":
+        return df
+
+    dtypes = {}
+    for name, dtype in df.dtypes.items():
+        if (
+            pd.api.types.is_float_dtype(dtype)
+            and dtype != np.float32
+            and name not in RAW_COLUMNS
+            and not INPUT_COLUMN_PATTERN.fullmatch(str(name))
+        ):
+            dtypes[name] = np.float32
+        elif pd.api.types.is_integer_dtype(dtype):
+            smallest = pd.to_numeric(df[name], downcast="integer").dtype
+            if smallest != dtype:
+                dtypes[name] = smallest
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            dtypes[name] = "category"
+
+    return df.astype(dtypes) if dtypes else df
+
+
+def compact_results(results: dict[str, pd.DataFrame], precision: str = "float32") -> dict[str, pd.DataFrame]:
+    # Lazy frames only hold the raw and input columns, which the policy leaves as they are
+    return {
+        ticker: compact_frame(df, precision) if isinstance(df, pd.DataFrame) else df
+        for ticker, df in results.items()
+    }
+
+
+def max_relative_error(original: pd.DataFrame, compact: pd.DataFrame) -> float:
+    """
+    Largest relative difference between the float columns of two versions of a DataFrame.
+    NaN in both is not a difference; NaN in only one is an infinite one.
+    """
+    columns = [name for name in original.columns if pd.api.types.is_float_dtype(original[name].dtype)]
+    if not columns:
+        return 0.0
+
+    expected = original[columns].to_numpy(dtype=np.float64)
+    actual = compact[columns].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        error = np.abs(actual - expected) / np.maximum(np.abs(expected), np.finfo(np.float32).tiny)
+    error[np.isnan(expected) & np.isnan(actual)] = 0.0
+    error[np.isnan(error)] = np.inf
+    return float(error.max()) if error.size else 0.0
+
+
+def _parquet_size(df: pd.DataFrame, compression: str) -> int:
+    sink = pa.BufferOutputStream()
+    pq.write_table(pc.frame_to_table(df), sink, compression=compression)
+    return sink.tell()
+
+
+def savings_report(
+    original: dict[str, pd.DataFrame],
+    compact: dict[str, pd.DataFrame],
+    compression: str = "zstd"
+) -> pd.DataFrame:
+    """
+    Memory and disk used by each ticker before and after the precision policy, and the
+    largest relative error it introduced. Tickers over TOLERANCE are logged.
+
+    Parameters
+    ----------
+    original : dict[str, pd.DataFrame]
+        float64 results per ticker.
+    compact : dict[str, pd.DataFrame]
+        The same results after compact_frame.
+    compression : str
+        Parquet codec used to measure the disk size.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per ticker, plus a 'TOTAL' row.
+    """
+    rows = {}
+    for ticker, df in original.items():
+        compact_df = compact[ticker]
+        error = max_relative_error(df, compact_df)
+        if error > TOLERANCE:
+            logger.warning(f"[{ticker}] Precision policy error {error:.2e} is over the tolerance {TOLERANCE:.0e}.")
+        rows[ticker] = {
+            "memory_before": int(df.memory_usage(deep=True).sum()),
+            "memory_after": int(compact_df.memory_usage(deep=True).sum()),
+            "disk_before": _parquet_size(df, compression),
+            "disk_after": _parquet_size(compact_df, compression),
+            "max_relative_error": error,
+        }
+
+    report = pd.DataFrame.from_dict(rows, orient="index")
+    if report.empty:
+        return report
+
+    report.loc["TOTAL"] = report.sum()
+    report.loc["TOTAL", "max_relative_error"] = report["max_relative_error"].iloc[:-1].max()
+    report["within_tolerance"] = report["max_relative_error"] <= TOLERANCE
+
+    total = report.loc["TOTAL"]
+    logger.info(
+        f"Precision policy: memory {total['memory_before'] / 2**20:.1f} -> {total['memory_after'] / 2**20:.1f} MiB, "
+        f"disk {total['disk_before'] / 2**20:.1f} -> {total['disk_after'] / 2**20:.1f} MiB, "
+        f"max relative error {total['max_relative_error']:.1e}."
+    )
+    return report
+
+
+def write_savings_report(
+    original: dict[str, pd.DataFrame],
+    compact: dict[str, pd.DataFrame],
+    path: str,
+    compression: str = "zstd"
+) -> None:
+    of.write_csv(path, savings_report(original, compact, compression=compression))
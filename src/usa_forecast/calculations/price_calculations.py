@@ -1,7 +1,13 @@
+from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import rolling as rr
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.calculations import panel_engine as pe
+
 import numpy as np
 import pandas as pd
 import logging
 import pyarrow as pa
+import pyarrow.compute as pac
 
 logger = logging.getLogger('myAppLogger')
 
@@ -11,7 +17,8 @@ def add_52_week_low_column(
     df: pd.DataFrame,
     column: str,
     window_days: int = 252,
-    output_column: str = "52w_low"
+    output_column: str = "52w_low",
+    tail_rows: int | None = None
 ) -> pd.DataFrame:
     """
     Adds a column representing the rolling minimum (52-week low) of a given column.
@@ -26,6 +33,9 @@ def add_52_week_low_column(
         Rolling window size in days (default is 252, approximating 52 trading weeks).
     output_column : str, optional
         Name of the output column (default is '52w_low').
+    tail_rows : int, optional
+        If given, only the last ``tail_rows`` rows are recomputed and the earlier rows keep
+        their current values.
 
     Returns
     -------
@@ -42,28 +52,90 @@ def add_52_week_low_column(
     if column not in df.columns:
         raise ValueError(f"Column '{column}' not found in DataFrame.")
 
+    if tail_rows is not None:
+        tail_rows = min(tail_rows, len(df))
+        if tail_rows == 0:
+            return df
+        if output_column not in df.columns:
+            df[output_column] = np.nan
+        window = df[column].iloc[-(tail_rows + window_days - 1):]
+        rolling_min = window.rolling(window=window_days, min_periods=1).min()
+        df.iloc[-tail_rows:, df.columns.get_loc(output_column)] = rolling_min.iloc[-tail_rows:].to_numpy()
+        return df
+
     df[output_column] = df[column].rolling(window=window_days, min_periods=1).min()
     return df
 
-def add_52_week_low_column_arrow(table: pa.Table, low_column: str = "low", output_column: str = "52_week_low") -> pa.Table:
-    df = table.to_pandas()
-    df[output_column] = df[low_column].rolling(window=252, min_periods=1).min()
-    return pa.Table.from_pandas(df)
+def add_52_week_low_column_arrow(
+    table: pa.Table,
+    low_column: str = "low",
+    output_column: str = "52_week_low",
+    window_days: int = 252
+) -> pa.Table:
+    """
+    Arrow counterpart of add_52_week_low_column. The table is never converted to pandas,
+    the rolling minimum runs on a NumPy view of the column.
 
-def calculate_price_targets(
-    df: pd.DataFrame,
+    Parameters
+    ----------
+    table : pa.Table
+        Table containing time series data, sorted by date.
+    low_column : str
+        Column from which to compute the 52-week low.
+    output_column : str
+        Name of the output column.
+    window_days : int
+        Rolling window size in days.
+
+    Returns
+    -------
+    pa.Table
+        Table with the 52-week low column added.
+    """
+    if low_column not in table.column_names:
+        raise ValueError(f"Column '{low_column}' not found in Table.")
+
+    rolling_min = rr.rolling_min(table[low_column].to_numpy(), window=window_days)
+    return la.set_table_column(table, output_column, pa.array(rolling_min))
+
+def _float_values(table: pa.Table, name: str) -> pa.Array:
+    return pac.cast(table[name], pa.float64()).combine_chunks()
+
+def _nan_to_null(values: pa.Array) -> pa.Array:
+    return pac.if_else(pac.is_nan(values), pa.scalar(None, type=pa.float64()), values)
+
+def _row_min(arrays: list[pa.Array]) -> pa.Array:
+    # Row-wise reductions skip NaN and nulls, like DataFrame.min(axis=1)
+    return pac.min_element_wise(*[_nan_to_null(values) for values in arrays], skip_nulls=True)
+
+def _row_max(arrays: list[pa.Array]) -> pa.Array:
+    return pac.max_element_wise(*[_nan_to_null(values) for values in arrays], skip_nulls=True)
+
+def _row_mean(arrays: list[pa.Array]) -> pa.Array:
+    total = None
+    count = None
+    for values in arrays:
+        values = _nan_to_null(values)
+        value = pac.fill_null(values, 0.0)
+        valid = pac.cast(pac.is_valid(values), pa.float64())
+        total = value if total is None else pac.add(total, value)
+        count = valid if count is None else pac.add(count, valid)
+    return _nan_to_null(pac.divide(total, count))
+
+def calculate_price_targets_arrow(
+    table: pa.Table,
     column: str,
     lags: tuple[int, ...],
-    lookback: int = 100,
+    lookback: int = lt.LOOKBACK,
     prefix: str = "P"
-) -> pd.DataFrame:
+) -> pa.Table:
     """
-    Calculates rolling max/min % changes and price targets for given lags.
+    Arrow counterpart of calculate_price_targets: same columns, same order, same values.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        Time series DataFrame containing price and percentage lag columns.
+    table : pa.Table
+        Table with a 'date' column, prices, lag return columns and '52_week_low'.
     column : str
         Name of the price column (e.g., 'close').
     lags : tuple[int, ...]
@@ -75,10 +147,10 @@ def calculate_price_targets(
 
     Returns
     -------
-    pd.DataFrame
-        DataFrame with all calculated target columns.
+    pa.Table
+        Table with all calculated target columns.
     """
-    df = df.copy()
+    price = _float_values(table, column)
 
     max_pct_cols = {}
     min_pct_cols = {}
@@ -88,85 +160,181 @@ def calculate_price_targets(
     for lag in lags:
         lag_col = f"{prefix}{lag}"
 
-        if lag_col not in df.columns:
+        if lag_col not in table.column_names:
             raise ValueError(f"Missing lagged return column: '{lag_col}'")
 
-        max_pct = df[lag_col].rolling(window=lookback, min_periods=1).max()
-        min_pct = df[lag_col].rolling(window=lookback, min_periods=1).min()
+        lag_values = table[lag_col].to_numpy()
+        max_pct = pa.array(rr.rolling_max(lag_values, window=lookback))
+        min_pct = pa.array(rr.rolling_min(lag_values, window=lookback))
 
         max_pct_cols[f"Max%_{lag}"] = max_pct
         min_pct_cols[f"Min%_{lag}"] = min_pct
 
-        shifted_price = df[column].shift(lag)
-        max_price_targets[f"MaxPT_{lag}"] = shifted_price * (1 + max_pct / 100)
-        min_price_targets[f"MinPT_{lag}"] = shifted_price * (1 + min_pct / 100)
+        shifted_price = la.shift_array(price, lag)
+        max_price_targets[f"MaxPT_{lag}"] = pac.multiply(shifted_price, pac.add(1.0, pac.divide(max_pct, 100.0)))
+        min_price_targets[f"MinPT_{lag}"] = pac.multiply(shifted_price, pac.add(1.0, pac.divide(min_pct, 100.0)))
+
+    derived = {**max_pct_cols, **min_pct_cols, **max_price_targets, **min_price_targets}
 
-    df = df.assign(**max_pct_cols, **min_pct_cols, **max_price_targets, **min_price_targets)
+    close = _float_values(table, "close")
+    week_low = _float_values(table, "52_week_low")
 
-    maxpt_df = pd.concat(max_price_targets.values(), axis=1)
-    minpt_df = pd.concat(min_price_targets.values(), axis=1)
-    maxpct_df = pd.concat(max_pct_cols.values(), axis=1)
+    min_max_pct = _row_min(list(max_pct_cols.values()))
+    derived["MinMax%"] = min_max_pct
+    derived["Alcance"] = pac.multiply(price, pac.add(1.0, pac.divide(min_max_pct, 100.0)))
+    derived["Max"] = pac.multiply(week_low, pac.add(1.0, pac.divide(min_max_pct, 100.0)))
 
-    df["MinMax%"] = maxpct_df.min(axis=1)
-    df["Alcance"] = df[column] * (1 + df["MinMax%"] / 100)
-    df["Max"] = df["52_week_low"] * (1 + df["MinMax%"] / 100)
+    max_max = _row_max(list(max_price_targets.values()))
+    min_max = _row_min(list(max_price_targets.values()))
+    max_min = _row_max(list(min_price_targets.values()))
+    min_min = _row_min(list(min_price_targets.values()))
 
-    df["MaxMax"] = maxpt_df.max(axis=1)
-    df["AvgMax"] = maxpt_df.mean(axis=1)
-    df["MinMax"] = maxpt_df.min(axis=1)
+    derived["MaxMax"] = max_max
+    derived["AvgMax"] = _row_mean(list(max_price_targets.values()))
+    derived["MinMax"] = min_max
 
-    df["MaxMin"] = minpt_df.max(axis=1)
-    df["AvgMin"] = minpt_df.mean(axis=1)
-    df["MinMin"] = minpt_df.min(axis=1)
+    derived["MaxMin"] = max_min
+    derived["AvgMin"] = _row_mean(list(min_price_targets.values()))
+    derived["MinMin"] = min_min
 
-    df["Rate_For_Max_Min"] = (df["MinMax"] - df["close"]) / df["close"]
-    df["HighMin"] = (df["52_week_low"] * df["Rate_For_Max_Min"]) + df["52_week_low"]
-    df["Vender_Apartir_De"] = np.where(df["HighMin"] < df["close"], df["MinMax"], df["HighMin"])
-    df["Rate"] = ((df["MaxMin"] / df["close"]) - 1) * 100
+    rate_for_max_min = pac.divide(pac.subtract(min_max, close), close)
+    high_min = pac.add(pac.multiply(week_low, rate_for_max_min), week_low)
+    derived["Rate_For_Max_Min"] = rate_for_max_min
+    derived["HighMin"] = high_min
+    derived["Vender_Apartir_De"] = pac.if_else(pac.fill_null(pac.less(high_min, close), False), min_max, high_min)
+    derived["Rate"] = pac.multiply(pac.subtract(pac.divide(max_min, close), 1.0), 100.0)
 
-    #@TODO: mejor reenombrar despues, no agregar porque memoria
-    df["Compra_Apartir_de"] = df["MaxMin"]
-    df["Precio_Minimo_Que_Puede_Llegar"] = df["MinMin"]
-    df["Precio_Maximo_Que_Puede_Llegar"] = df["MaxMax"]
+    derived["Compra_Apartir_de"] = max_min
+    derived["Precio_Minimo_Que_Puede_Llegar"] = min_min
+    derived["Precio_Maximo_Que_Puede_Llegar"] = max_max
 
-    a = 1 + 1
+    for name, values in derived.items():
+        table = la.set_table_column(table, name, values)
 
+    return table
+
+def table_to_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    Converts a price table with a 'date' column into the DataFrame layout used by the
+    pandas path (DatetimeIndex named 'date').
+    """
+    date_index = table.schema.get_field_index("date")
+    dates = table.column(date_index).to_numpy()
+    df = table.remove_column(date_index).to_pandas(split_blocks=True)
+    df.index = pd.DatetimeIndex(dates, name="date")
     return df
 
+def frame_to_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts a DataFrame indexed by date into a table with the dates as first 'date' column.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    dates = pa.array(pd.DatetimeIndex(df.index).to_numpy(), type=pa.timestamp("ns"))
+    return table.add_column(0, "date", dates)
+
+def calculate_price_targets(
+    df: pd.DataFrame,
+    column: str,
+    lags: tuple[int, ...],
+    lookback: int = lt.LOOKBACK,
+    prefix: str = "P"
+) -> pd.DataFrame:
+    """
+    Calculates rolling max/min % changes and price targets for given lags.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time series DataFrame containing price and percentage lag columns.
+    column : str
+        Name of the price column (e.g., 'close').
+    lags : tuple[int, ...]
+        Tuple of integer lag values (e.g., (5, 10, 15)).
+    lookback : int
+        Number of days to look back for max/min % calculations.
+    prefix : str
+        Prefix for lag return columns (default 'P').
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with all calculated target columns.
+    """
+    for lag in lags:
+        lag_col = f"{prefix}{lag}"
+
+        if lag_col not in df.columns:
+            raise ValueError(f"Missing lagged return column: '{lag_col}'")
+
+    # Las fórmulas viven en lazy_targets, así el modo perezoso da los mismos valores
+    return lt.LazyTargetFrame(base=df, lags=lags, column=column, lookback=lookback, prefix=prefix).to_frame()
+
 def process_all_tickers(
     data_dict: dict[str, pd.DataFrame],
     column: str = "close",
     lags: tuple[int, ...] = (5, 10, 15),
-    lookback: int = 100
-) -> dict[str, pd.DataFrame]:
+    lookback: int = lt.LOOKBACK,
+    compute_engine: str = "pandas",
+    lazy: bool = False
+) -> dict[str, pd.DataFrame | lt.LazyTargetFrame]:
     """
     Applies price target calculations to all tickers in a dictionary.
 
     Parameters
     ----------
-    data_dict : dict[str, pd.DataFrame]
-        Dictionary mapping ticker symbols to DataFrames with price data.
+    data_dict : dict[str, pd.DataFrame | pa.Table]
+        Dictionary mapping ticker symbols to DataFrames (or Arrow tables in 'arrow' mode)
+        with price data.
     column : str
         Name of the price column to base calculations on.
     lags : tuple[int, ...]
         Tuple of lag days to use for % return calculations.
     lookback : int
         Number of days for rolling max/min window.
+    compute_engine : str
+        'pandas', 'arrow' to compute on Arrow tables and convert to pandas only once at the end,
+        or 'panel' to compute the lag returns and targets of every ticker at once on
+        dates × tickers matrices (see panel_engine.calculate_panel_targets).
+    lazy : bool
+        Return LazyTargetFrames, which compute the target columns only when they are used.
 
     Returns
     -------
-    dict[str, pd.DataFrame]
-        Dictionary with ticker as key and enriched DataFrame as value.
+    dict[str, pd.DataFrame | LazyTargetFrame]
+        Dictionary with ticker as key and enriched DataFrame (or LazyTargetFrame) as value.
     """
+    if compute_engine == "panel" and not lazy:
+        return pe.calculate_panel_targets(
+            data_dict={ticker: table_to_frame(df) if isinstance(df, pa.Table) else df for ticker, df in data_dict.items()},
+            column=column,
+            lags=lags,
+            lookback=lookback
+        )
+
     results = {}
     for ticker, df in data_dict.items():
         try:
-            enriched_df = calculate_price_targets(
-                df=df,
-                column=column,
-                lags=lags,
-                lookback=lookback
-            )
+            if lazy:
+                df = table_to_frame(df) if isinstance(df, pa.Table) else df
+                missing = [f"P{lag}" for lag in lags if f"P{lag}" not in df.columns]
+                if missing:
+                    raise ValueError(f"Missing lagged return columns: {missing}")
+                enriched_df = lt.LazyTargetFrame(base=df, lags=lags, column=column, lookback=lookback)
+            elif compute_engine == "arrow":
+                table = df if isinstance(df, pa.Table) else frame_to_table(df)
+                enriched_df = table_to_frame(calculate_price_targets_arrow(
+                    table=table,
+                    column=column,
+                    lags=lags,
+                    lookback=lookback
+                ))
+            else:
+                enriched_df = calculate_price_targets(
+                    df=df,
+                    column=column,
+                    lags=lags,
+                    lookback=lookback
+                )
             results[ticker] = enriched_df
         except Exception as e:
             logger.error(f"Error processing {ticker}: {e}")
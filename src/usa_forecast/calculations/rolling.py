@@ -0,0 +1,78 @@
+import numpy as np
+
+#%%
+
+def _rolling_extreme(values: np.ndarray, window: int, ufunc: np.ufunc, fill: float) -> np.ndarray:
+    """
+    Trailing rolling min/max with ``min_periods=1`` using the van Herk/Gil-Werman algorithm.
+
+    The series is split into blocks of ``window`` rows; a forward running extreme inside each
+    block and a backward one give the extreme of any window with one ``ufunc`` call per row,
+    whatever the window size. Works along axis 0, so a 2-D array computes every column at
+    once. NaN and infinite values are skipped like pandas does, windows with no valid value
+    give NaN.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = x.shape[0]
+    if n == 0:
+        return x.copy()
+
+    window = max(1, min(window, n))
+    valid = np.isfinite(x)
+    data = np.where(valid, x, fill)
+
+    pad = (-n) % window
+    if pad:
+        data = np.concatenate([data, np.full((pad,) + x.shape[1:], fill)])
+
+    blocks = data.reshape((-1, window) + x.shape[1:])
+    forward = ufunc.accumulate(blocks, axis=1).reshape(data.shape)
+    backward = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(data.shape)
+
+    out = np.empty_like(x)
+    out[:window - 1] = forward[:window - 1]
+    out[window - 1:] = ufunc(backward[:n - window + 1], forward[window - 1:n])
+
+    # Number of valid values inside each window, windows without any are NaN
+    counts = np.concatenate([np.zeros((1,) + x.shape[1:], dtype=np.int64), np.cumsum(valid, axis=0)])
+    starts = np.maximum(np.arange(n) - window + 1, 0)
+    in_window = counts[1:] - counts[starts]
+    out[in_window == 0] = np.nan
+
+    return out
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling minimum, equivalent to ``Series.rolling(window, min_periods=1).min()``.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1-D series, or 2-D array with one series per column.
+    window : int
+        Number of rows in the window.
+
+    Returns
+    -------
+    np.ndarray
+        float64 array with the same shape as ``values``.
+    """
+    return _rolling_extreme(values=values, window=window, ufunc=np.minimum, fill=np.inf)
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling maximum, equivalent to ``Series.rolling(window, min_periods=1).max()``.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1-D series, or 2-D array with one series per column.
+    window : int
+        Number of rows in the window.
+
+    Returns
+    -------
+    np.ndarray
+        float64 array with the same shape as ``values``.
+    """
+    return _rolling_extreme(values=values, window=window, ufunc=np.maximum, fill=-np.inf)
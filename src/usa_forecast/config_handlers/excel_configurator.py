@@ -46,6 +46,40 @@ class ExcelConfigurator(ConfiguratorInterface):
         ),
     })
 
+    # Optional General params: when a key is missing from the sheet its default is used
+    SHEET_OPTIONAL_KEY_VALUES = types.MappingProxyType({
+        'General': types.MappingProxyType({
+            'http_pool_size': 16,
+            'http_max_per_host': 8,
+            'download_engine': 'threads',
+            'download_concurrency': 8,
+            'request_timeout': 30.0,
+            'incremental_download': 'True',
+            'response_cache_mode': 'read_write',
+            'intraday_cache_ttl': 60.0,
+            'rate_limit_per_minute': 300.0,
+            'max_retries': 3,
+            'compute_engine': 'pandas',
+            'latest_price_source': '1min',
+            'quote_batch_size': 100,
+            'fmp_base_url': 'https://financialmodelingprep.com',
+            'chunk_years': 0,
+            'daily_call_budget': 0,
+            'storage_format': 'parquet',
+            'panel_store': 'False',
+            'summary_storage': 'dataset',
+            'summary_partition': 'year',
+            'background_writes': 'True',
+            'precision': 'float64',
+            'storage_compression': 'zstd',
+            'sql_store': 'False',
+            'lazy_targets': 'False',
+            'warm_restart': 'True',
+            'compaction_days': 0,
+            'retention_days': 0,
+        }),
+    })
+
     SHEET_COLUMNS = types.MappingProxyType({
         'Tickers': (
             'tickers',
@@ -86,6 +120,10 @@ class ExcelConfigurator(ConfiguratorInterface):
                 workbook,
                 self.SHEET_KEY_VALUES,
             )
+            sheet_optional_values = self._extract_workbook_optional_key_values_by_schema(
+                workbook,
+                self.SHEET_OPTIONAL_KEY_VALUES,
+            )
             sheet_columns = self._extract_workbook_columns_by_schema(
                 workbook,
                 self.SHEET_COLUMNS,
@@ -107,7 +145,8 @@ class ExcelConfigurator(ConfiguratorInterface):
                 summary_start_date=sheet_key_values['General']['summary_start_date'].date(),
                 summary_end_date=sheet_key_values['General']['summary_end_date'].date(),
                 tickers=sheet_columns['Tickers']['tickers'],
-                window_shift=window_shift_converted
+                window_shift=window_shift_converted,
+                **sheet_optional_values['General']
             )
 
             # remove this logger
@@ -317,6 +356,60 @@ class ExcelConfigurator(ConfiguratorInterface):
 
         return sheets
 
+    @classmethod
+    def _extract_workbook_optional_key_values_by_schema(
+        cls,
+        workbook: openpyxl.workbook.workbook.Workbook,
+        schema: typing.Mapping[str, typing.Mapping[str, typing.Any]],
+        key_column: str='A',
+    ) -> dict[str, dict[str, typing.Any]]:
+        """
+        Extract optional key values from a workbook's sheets, falling back to the schema defaults.
+
+        Parameters
+        ----------
+        workbook
+            The workbook to search
+        schema
+            The schema indicating the sheets, the optional keys and their default values
+        key_column
+            The letter identifier of the column to search for the key
+
+        Returns
+        -------
+        The extracted values, in the same arrangement as the schema
+        """
+        value_column = cls._increment_column_identifier(key_column)
+
+        sheets = {}
+        for sheet_name, defaults in schema.items():
+            sheets[sheet_name] = {}
+            for field_name, default in defaults.items():
+                value = None
+                if sheet_name in workbook.sheetnames:
+                    row = cls._find_sheet_row_by_column_value(
+                        workbook[sheet_name],
+                        key_column,
+                        field_name
+                    )
+                    if row is not None:
+                        value = workbook[sheet_name][f'{value_column}{row}'].value
+
+                if value is None:
+                    value = default
+                elif isinstance(default, bool):
+                    value = str(value).strip().lower() in {'true', '1', 'yes'}
+                elif isinstance(default, int):
+                    value = int(value)
+                elif isinstance(default, float):
+                    value = float(value)
+                else:
+                    value = str(value).strip()
+
+                sheets[sheet_name][field_name] = value
+
+        return sheets
+
     @staticmethod
     def _find_sheet_column_by_row_value(
         sheet: openpyxl.worksheet.worksheet.Worksheet,
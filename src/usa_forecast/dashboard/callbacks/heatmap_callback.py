@@ -4,6 +4,7 @@ import dash_html_components as html
 import pandas as pd
 import re
 from dash_table.Format import Format, Scheme, Symbol
+from src.usa_forecast.services import download_scheduler as ds
 
 def register_callback_show_p_columns(app, mkt_data: dict):
 
@@ -16,6 +17,9 @@ def register_callback_show_p_columns(app, mkt_data: dict):
         if not n_clicks or not selected_ticker:
             return html.Div("Please select a ticker and press Submit.")
 
+        # Refresco en curso: este ticker pasa al frente de la cola
+        ds.bump_ticker(selected_ticker)
+
         df = mkt_data.get(selected_ticker)
         if df is None:
             return html.Div(f"No data available for ticker {selected_ticker}")
@@ -2,6 +2,7 @@ from dash.dependencies import Input, Output, State
 import dash_html_components as html
 import dash_core_components as dcc
 from src.usa_forecast.plotting.candlestick_plotly import generate_candlestick_with_volume
+from src.usa_forecast.services import download_scheduler as ds
 
 def register_callback_candlestick_chart(app, mkt_data: dict):
     @app.callback(
@@ -14,6 +15,9 @@ def register_callback_candlestick_chart(app, mkt_data: dict):
         if not submit_clicks or not selected_ticker:
             return html.Div("Please select a ticker and press Submit.")
 
+        # Refresco en curso: este ticker pasa al frente de la cola
+        ds.bump_ticker(selected_ticker)
+
         df = mkt_data.get(selected_ticker)
         if df is None or df.empty:
             return html.Div(f"No data available for {selected_ticker}.")
@@ -11,6 +11,8 @@ import dash
 from dash import exceptions
 import numpy as np
 from datetime import datetime
+from src.usa_forecast.services import download_scheduler as ds
+from src.usa_forecast.storage import sql_store as sq
 
 
 def register_callback_market_analysis(app, market_data_dict):
@@ -38,19 +40,27 @@ def register_callback_market_analysis(app, market_data_dict):
             return html.Div("Please select a ticker and try again.",
                             className="text-danger"), {}
 
-        try:
-            # Cargar datos del ticker seleccionado
-            df_dict = store_data.get(selected_ticker)
-            if df_dict is None:
-                return html.Div("No data available for selected ticker.",
-                                className="text-danger"), {}
-
-            df = pd.DataFrame(**df_dict)
-            df.index = pd.to_datetime(df.index)
+        # Refresco en curso: este ticker pasa al frente de la cola
+        ds.bump_ticker(selected_ticker)
 
-            # Filtrar por rango de fechas
-            if start_date and end_date:
-                df = df.loc[start_date:end_date]
+        try:
+            # Con la base SQL sólo se lee el rango pedido
+            sql_store = sq.get_sql_store()
+            df = sql_store.ticker_range(selected_ticker, start_date, end_date) if sql_store is not None else None
+
+            if df is None or df.empty:
+                # Cargar datos del ticker seleccionado
+                df_dict = store_data.get(selected_ticker)
+                if df_dict is None:
+                    return html.Div("No data available for selected ticker.",
+                                    className="text-danger"), {}
+
+                df = pd.DataFrame(**df_dict)
+                df.index = pd.to_datetime(df.index)
+
+                # Filtrar por rango de fechas
+                if start_date and end_date:
+                    df = df.loc[start_date:end_date]
 
             if df.empty:
                 return html.Div("No data available for selected date range.",
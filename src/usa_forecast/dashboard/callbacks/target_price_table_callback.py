@@ -5,6 +5,7 @@ import dash_html_components as html
 import pandas as pd
 import dash
 from src.usa_forecast.services.update_logic import update_with_latest_data
+from src.usa_forecast.storage import summary_store as ss
 from dash_table.Format import Format, Scheme, Symbol
 
 import logging
@@ -24,11 +25,11 @@ def register_callback_actuals(app, configuration, mkt_data):
     def reload_data(n_clicks):
         if n_clicks:
             final_dict, _ = update_with_latest_data(configuration=configuration, mkt_data=mkt_data)
-            period_keys = list(final_dict.keys())
-            options = [{'label': str(k), 'value': str(k)} for k in period_keys]
-            default_value = str(period_keys[-1])
-            store_data = {str(k): df.to_dict(orient='split') for k, df in final_dict.items()}
-            ticker_options = [{'label': t, 'value': t} for t in final_dict[period_keys[-1]].columns]
+            period_keys, inline_periods = ss.period_sources(final_dict)
+            options = [{'label': k, 'value': k} for k in period_keys]
+            default_value = period_keys[-1]
+            store_data = {k: df.to_dict(orient='split') for k, df in inline_periods.items()}
+            ticker_options = [{'label': t, 'value': t} for t in final_dict[list(final_dict.keys())[-1]].columns]
             return options, default_value, store_data, ticker_options
         raise dash.exceptions.PreventUpdate
 
@@ -40,11 +41,14 @@ def register_callback_actuals(app, configuration, mkt_data):
         State('ticker-dropdown1', 'value')
     )
     def render_table(n_clicks, selected_period_str, store_data, selected_tickers):
-        if n_clicks and selected_period_str and store_data:
+        if n_clicks and selected_period_str and store_data is not None:
             df_dict = store_data.get(selected_period_str)
-            if df_dict is None:
+            if df_dict is not None:
+                df = pd.DataFrame(**df_dict)
+            else:
+                df = ss.get_summary_store().read(selected_period_str)
+            if df is None:
                 return html.Div("No data available for the selected period.")
-            df = pd.DataFrame(**df_dict)
             df.reset_index(inplace=True)
             if df.columns[0] == "index":
                 df.rename(columns={"index": "Date"}, inplace=True)
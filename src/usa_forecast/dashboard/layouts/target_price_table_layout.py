@@ -2,14 +2,18 @@ import dash_core_components as dcc
 import dash_html_components as html
 import dash_bootstrap_components as dbc
 
+from src.usa_forecast.storage import summary_store as ss
+
 
 def actuals_layout(periods_dict: dict) -> html.Div:
-    period_options = [{"label": str(k), "value": str(k)} for k in periods_dict.keys()]
+    # Los periodos guardados en el dataset se leen al seleccionarlos, no viajan a la página
+    period_keys, inline_periods = ss.period_sources(periods_dict)
+    period_options = [{"label": k, "value": k} for k in period_keys]
     tickers = list(periods_dict[list(periods_dict.keys())[0]].columns)
     ticker_options = [{"label": t, "value": t} for t in tickers]
 
     layout = html.Div([
-        dcc.Store(id="store", data={str(k): df.to_dict("split") for k, df in periods_dict.items()}),
+        dcc.Store(id="store", data={k: df.to_dict("split") for k, df in inline_periods.items()}),
         html.Div([
             dbc.Row([
                 dbc.Col([
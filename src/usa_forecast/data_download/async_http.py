@@ -0,0 +1,226 @@
+import asyncio
+import ssl
+import typing
+import certifi
+from email.message import Message
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+#%%
+
+DEFAULT_MAX_PER_HOST = 64
+DEFAULT_TIMEOUT = 30.0
+
+
+class AsyncHTTPClient:
+    """
+    Minimal asyncio HTTP/1.1 client with keep-alive connection pooling.
+
+    Only what the FMP downloads need is supported: GET requests, Content-Length,
+    chunked and close-delimited bodies. Connections are pooled per (scheme, host, port)
+    and a semaphore per host bounds the number of requests in flight. A client is bound
+    to the event loop it is used in and must be closed with ``aclose``.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        """
+        Parameters
+        ----------
+        max_per_host : int
+            Maximum number of concurrent requests (and pooled connections) per host.
+        timeout : float
+            Timeout in seconds applied to connecting and to each read.
+        """
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._idle: dict[tuple[str, str, int], list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._host_slots: dict[tuple[str, str, int], asyncio.Semaphore] = {}
+
+    async def _connect(self, key: tuple[str, str, int]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        scheme, host, port = key
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl_context if scheme == "https" else None),
+            timeout=self.timeout
+        )
+
+    async def _readline(self, reader: asyncio.StreamReader) -> bytes:
+        return await asyncio.wait_for(reader.readline(), timeout=self.timeout)
+
+    async def _iter_body(
+        self,
+        reader: asyncio.StreamReader,
+        headers: Message,
+        chunk_size: int
+    ) -> typing.AsyncIterator[bytes]:
+        """
+        Yields the response body according to its framing (chunked, Content-Length or close).
+        """
+        if headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size_line = await self._readline(reader)
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while (await self._readline(reader)) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await asyncio.wait_for(reader.readexactly(size), timeout=self.timeout)
+                await self._readline(reader)
+
+        length = headers.get("Content-Length")
+        if length is not None:
+            remaining = int(length)
+            while remaining > 0:
+                chunk = await asyncio.wait_for(reader.read(min(chunk_size, remaining)), timeout=self.timeout)
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+            return
+
+        while True:
+            chunk = await asyncio.wait_for(reader.read(chunk_size), timeout=self.timeout)
+            if not chunk:
+                return
+            yield chunk
+
+    async def iter_chunks(self, url: str, chunk_size: int = 65536) -> typing.AsyncIterator[bytes]:
+        """
+        Performs a GET request and yields the response body as it is received.
+
+        The connection and its per-host slot stay taken while the body is being read:
+        callers must exhaust the iterator or close it with ``aclose`` (e.g. through
+        ``contextlib.aclosing``).
+
+        Parameters
+        ----------
+        url : str
+            Fully constructed URL to query.
+        chunk_size : int
+            Maximum size in bytes of each yielded chunk.
+
+        Yields
+        ------
+        bytes
+            Consecutive pieces of the response body.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If the server answers with a status code of 400 or above.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        idle = self._idle.setdefault(key, [])
+        slots = self._host_slots.setdefault(key, asyncio.Semaphore(self.max_per_host))
+
+        request = (
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "Connection: keep-alive\r\n"
+            "Accept: application/json\r\n"
+            "\r\n"
+        ).encode("ascii")
+
+        async with slots:
+            # A pooled connection may have been closed by the server while idle,
+            # in that case the request is retried once on a fresh connection.
+            for attempt in range(2):
+                reused = bool(idle)
+                reader, writer = idle.pop() if reused else await self._connect(key)
+
+                try:
+                    writer.write(request)
+                    await writer.drain()
+
+                    status_line = await self._readline(reader)
+                    if not status_line:
+                        raise ConnectionResetError("Connection closed by server")
+                    _, status, *reason = status_line.decode("latin-1").split(" ", 2)
+                    status = int(status)
+
+                    headers = Message()
+                    while True:
+                        line = await self._readline(reader)
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip()] = value.strip()
+                    break
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    # Timeouts and cancellation leave the stream in an unknown state
+                    writer.close()
+                    raise
+
+            completed = False
+            try:
+                if status >= 400:
+                    async for _ in self._iter_body(reader, headers, chunk_size):
+                        pass
+                    completed = True
+                    raise HTTPError(url, status, " ".join(reason).strip(), headers, None)
+
+                async for chunk in self._iter_body(reader, headers, chunk_size):
+                    yield chunk
+                completed = True
+            finally:
+                reusable = (
+                    completed
+                    and ("Content-Length" in headers or headers.get("Transfer-Encoding", "").lower() == "chunked")
+                    and headers.get("Connection", "").lower() != "close"
+                )
+                if reusable:
+                    idle.append((reader, writer))
+                else:
+                    writer.close()
+
+    async def get(self, url: str) -> bytes:
+        """
+        Performs a GET request and returns the raw response body.
+
+        Parameters
+        ----------
+        url : str
+            Fully constructed URL to query.
+
+        Returns
+        -------
+        bytes
+            Response body.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If the server answers with a status code of 400 or above.
+        """
+        return b"".join([chunk async for chunk in self.iter_chunks(url)])
+
+    async def aclose(self) -> None:
+        """
+        Closes every idle pooled connection.
+        """
+        for idle in self._idle.values():
+            while idle:
+                _, writer = idle.pop()
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
@@ -0,0 +1,216 @@
+from src.usa_forecast.exceptions import CallBudgetExceededError
+
+import datetime
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_LEDGER_PATH = "Output/Cache/call_ledger.json"
+
+# Days of history kept in the ledger file
+HISTORY_DAYS = 31
+
+# Share of the daily budget kept for dashboard interactions, bulk runs never plan into it
+BUDGET_RESERVE = 0.05
+
+# Records between two writes of the ledger file
+SAVE_EVERY = 25
+
+STRATEGY_FULL = "full"
+STRATEGY_PRIORITY_ONLY = "priority_only"
+STRATEGY_CACHE_ONLY = "cache_only"
+
+
+class CallLedger:
+    """
+    Persistent count of the API calls made per endpoint and per day.
+
+    Only requests that reach the network are counted, cache hits are free. With a daily
+    budget, ``plan`` tells a run which strategy still fits in what is left of the day:
+
+    full
+        Everything projected fits.
+    priority_only
+        Only the priority part of the run fits (tickers without any data, tickers on
+        screen); the rest is served from what is already on disk.
+    cache_only
+        Nothing is downloaded, intraday refreshes are skipped and the data on disk is used.
+
+    Once the budget is used up, ``check`` raises CallBudgetExceededError before the request.
+    """
+
+    def __init__(self, path: str | None = DEFAULT_LEDGER_PATH, daily_budget: int = 0):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            JSON file where the counts are persisted, None keeps them in memory.
+        daily_budget : int
+            Maximum number of calls per day, 0 for no limit.
+        """
+        self.path = Path(path) if path else None
+        self.daily_budget = daily_budget
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = self._load()
+        self._unsaved = 0
+
+    def _load(self) -> dict[str, dict[str, int]]:
+        if self.path is None or not self.path.is_file():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return {
+                    day: {endpoint: int(count) for endpoint, count in endpoints.items()}
+                    for day, endpoints in json.load(file).items()
+                }
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring call ledger {self.path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        oldest = (datetime.date.today() - datetime.timedelta(days=HISTORY_DAYS)).isoformat()
+        with self._lock:
+            counts = {day: dict(endpoints) for day, endpoints in self._counts.items() if day >= oldest}
+            self._unsaved = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(counts, file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def record(self, endpoint: str, calls: int = 1) -> None:
+        """
+        Counts ``calls`` network requests to ``endpoint`` for today.
+        """
+        today = datetime.date.today().isoformat()
+        with self._lock:
+            endpoints = self._counts.setdefault(today, {})
+            endpoints[endpoint] = endpoints.get(endpoint, 0) + calls
+            self._unsaved += calls
+            pending = self._unsaved >= SAVE_EVERY
+
+        if pending:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Could not save call ledger: {e}")
+
+    def used_today(self, endpoint: str | None = None) -> int:
+        today = datetime.date.today().isoformat()
+        with self._lock:
+            endpoints = self._counts.get(today, {})
+            if endpoint is not None:
+                return endpoints.get(endpoint, 0)
+            return sum(endpoints.values())
+
+    def usage_today(self) -> dict[str, int]:
+        """
+        Calls made today per endpoint.
+        """
+        today = datetime.date.today().isoformat()
+        with self._lock:
+            return dict(self._counts.get(today, {}))
+
+    def remaining(self) -> float:
+        """
+        Calls left today, infinite without a budget.
+        """
+        if self.daily_budget <= 0:
+            return float("inf")
+        return max(0, self.daily_budget - self.used_today())
+
+    def check(self, endpoint: str) -> None:
+        """
+        Raises CallBudgetExceededError when the daily budget is used up.
+        """
+        if self.remaining() <= 0:
+            raise CallBudgetExceededError(
+                f"Daily API call budget of {self.daily_budget} used up, not calling {endpoint}"
+            )
+
+    def plan(self, projected_calls: int, priority_calls: int = 0, description: str = "run") -> str:
+        """
+        Logs today's usage and the projected calls of a run, and returns the strategy that
+        fits in the remaining budget (see the class docstring).
+
+        Parameters
+        ----------
+        projected_calls : int
+            Calls the whole run would make on a cold cache.
+        priority_calls : int
+            Calls of the part of the run that should go ahead when the rest does not fit.
+        description : str
+            Name of the run for the log.
+
+        Returns
+        -------
+        str
+            One of STRATEGY_FULL, STRATEGY_PRIORITY_ONLY or STRATEGY_CACHE_ONLY.
+        """
+        used = self.used_today()
+
+        if self.daily_budget <= 0:
+            logger.info(f"API calls today: {used}. Projected for {description}: {projected_calls}")
+            return STRATEGY_FULL
+
+        # The reserve stays available for dashboard interactions
+        available = self.daily_budget * (1 - BUDGET_RESERVE) - used
+        if projected_calls <= available:
+            strategy = STRATEGY_FULL
+        elif 0 < priority_calls <= available:
+            strategy = STRATEGY_PRIORITY_ONLY
+        else:
+            strategy = STRATEGY_CACHE_ONLY
+
+        by_endpoint = ", ".join(f"{endpoint} {count}" for endpoint, count in sorted(self.usage_today().items()))
+        message = (
+            f"API calls today: {used} of {self.daily_budget}"
+            f"{f' ({by_endpoint})' if by_endpoint else ''}. "
+            f"Projected for {description}: {projected_calls}, strategy: {strategy}"
+        )
+        if strategy == STRATEGY_FULL:
+            logger.info(message)
+        else:
+            logger.warning(message)
+        return strategy
+
+#%%
+
+_ledger_lock = threading.Lock()
+_ledger: CallLedger | None = None
+
+
+def configure_ledger(path: str | None = DEFAULT_LEDGER_PATH, daily_budget: int = 0) -> CallLedger:
+    """
+    Replaces the shared call ledger, saving the counts of the previous one.
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is not None:
+            try:
+                _ledger.save()
+            except OSError as e:
+                logger.warning(f"Could not save call ledger: {e}")
+        _ledger = CallLedger(path=path, daily_budget=daily_budget)
+        return _ledger
+
+
+def get_ledger() -> CallLedger:
+    """
+    Returns the shared call ledger, creating an unlimited one on first use.
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CallLedger()
+        return _ledger
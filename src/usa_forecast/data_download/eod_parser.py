@@ -0,0 +1,246 @@
+import json
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+#%%
+
+# A "key": value pair of a flat JSON object. Values are strings, numbers, booleans or null.
+_PAIR_PATTERN = re.compile(rb'"([^"\\]+)"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+INTEGER_COLUMNS = frozenset({"volume"})
+
+
+def _to_column(name: str, raw_values: list[bytes]) -> np.ndarray:
+    """
+    Converts the raw JSON tokens of one field into a typed array.
+
+    Prices become float64, integer columns (volume) int64 when every value is an integer,
+    null becomes NaN and quoted values become Python strings.
+    """
+    first = next((raw for raw in raw_values if raw != b"null"), b"null")
+    if first.startswith(b'"'):
+        return np.array(
+            [json.loads(raw) if raw.startswith(b'"') else None for raw in raw_values],
+            dtype=object
+        )
+
+    raw = np.array(raw_values, dtype=bytes)
+
+    if name in INTEGER_COLUMNS:
+        try:
+            return raw.astype(np.int64)
+        except ValueError:
+            pass
+
+    nulls = raw == b"null"
+    if nulls.any():
+        raw[nulls] = b"nan"
+    return raw.astype(np.float64)
+
+
+class EodColumnParser:
+    """
+    Incremental parser that turns a FMP price payload (a JSON array of flat objects)
+    into typed column buffers while the response body is still being received.
+
+    Chunks are passed to ``feed`` as they arrive and only the complete objects of the
+    buffered bytes are parsed. Each kept field is pulled out of the buffered region with
+    a single regex scan and converted to a NumPy array in one step; the fields listed in
+    ``skip`` are never converted, and no list of dicts is ever built for the history.
+    Regions whose records do not all share the same fields fall back to a per-record scan.
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        skip: tuple[str, ...] | list[str] = (),
+        date_field: str = "date"
+    ):
+        """
+        Parameters
+        ----------
+        ticker : str
+            Ticker being parsed, used for error messages.
+        skip : tuple[str, ...] | list[str]
+            Fields that are dropped while parsing.
+        date_field : str
+            Field holding the bar date, used as index.
+        """
+        self.ticker = ticker
+        self._skip = frozenset(field.encode() for field in skip)
+        self._date_field = date_field.encode()
+
+        self._pending = bytearray()
+        self._started = False
+        self._is_array = True
+
+        # Fields of the first record, in payload order, and their single-field patterns
+        self._fields: list[bytes] | None = None
+        self._field_patterns: dict[bytes, re.Pattern] = {}
+
+        self._date_chunks: list[np.ndarray] = []
+        self._column_chunks: list[dict[str, np.ndarray]] = []
+
+    def _field_pattern(self, field: bytes) -> re.Pattern:
+        pattern = self._field_patterns.get(field)
+        if pattern is None:
+            pattern = re.compile(rb'"' + re.escape(field) + rb'"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+            self._field_patterns[field] = pattern
+        return pattern
+
+    def _parse_region_fast(self, region: bytes, records: int) -> bool:
+        """
+        Parses a region where every record has exactly the fields of the first record.
+        Returns False, without storing anything, when that does not hold.
+        """
+        if region.count(b'":') != records * len(self._fields):
+            return False
+
+        raw_dates = self._field_pattern(self._date_field).findall(region)
+        if len(raw_dates) != records:
+            return False
+
+        columns = {}
+        for field in self._fields:
+            if field in self._skip or field == self._date_field:
+                continue
+            raw_values = self._field_pattern(field).findall(region)
+            if len(raw_values) != records:
+                return False
+            columns[field.decode()] = _to_column(field.decode(), raw_values)
+
+        self._date_chunks.append(np.array([raw.strip(b'"') for raw in raw_dates], dtype=bytes))
+        self._column_chunks.append(columns)
+        return True
+
+    def _parse_region_slow(self, region: bytes) -> None:
+        dates = []
+        values: dict[str, list[bytes]] = {}
+
+        for record in region.split(b"}"):
+            if b":" not in record:
+                continue
+
+            date = None
+            for match in _PAIR_PATTERN.finditer(record):
+                key, raw = match.group(1), match.group(2)
+                if key in self._skip:
+                    continue
+                if key == self._date_field:
+                    date = raw.strip(b'"')
+                    continue
+                values.setdefault(key.decode(), [b"null"] * len(dates)).append(raw)
+
+            if date is None:
+                raise ValueError(f"Record without '{self._date_field.decode()}' returned from API for {self.ticker}")
+
+            dates.append(date)
+            # Fields missing from this record are filled so every column keeps the same length
+            for column in values.values():
+                if len(column) < len(dates):
+                    column.append(b"null")
+
+        self._date_chunks.append(np.array(dates, dtype=bytes))
+        self._column_chunks.append({name: _to_column(name, raw) for name, raw in values.items()})
+
+    def _parse_region(self, region: bytes) -> None:
+        records = region.count(b"}")
+
+        if self._fields is None:
+            first = region[:region.index(b"}")]
+            self._fields = [match.group(1) for match in _PAIR_PATTERN.finditer(first)]
+
+        if not self._parse_region_fast(region, records):
+            self._parse_region_slow(region)
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Parses every complete object contained in the data received so far.
+
+        Parameters
+        ----------
+        chunk : bytes
+            Next piece of the response body.
+        """
+        self._pending.extend(chunk)
+
+        if not self._started:
+            stripped = self._pending.lstrip()
+            if not stripped:
+                return
+            self._started = True
+            self._is_array = stripped.startswith(b"[")
+            if self._is_array:
+                del self._pending[:len(self._pending) - len(stripped) + 1]
+
+        if not self._is_array:
+            # Error payloads are small objects, they are kept whole for the error message
+            return
+
+        end = self._pending.rfind(b"}")
+        if end == -1:
+            return
+
+        region = bytes(self._pending[:end + 1])
+        del self._pending[:end + 1]
+        self._parse_region(region)
+
+    def close(self) -> None:
+        """
+        Validates that the whole body was a JSON array.
+
+        Raises
+        ------
+        ValueError
+            If the API response is not a list of objects.
+        """
+        if not self._started or not self._is_array or self._pending.strip() != b"]":
+            raise ValueError(f"Unexpected data format returned from API for {self.ticker}")
+
+    def _sorted_columns(self) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        if self._date_chunks:
+            raw_dates = np.concatenate(self._date_chunks)
+        else:
+            raw_dates = np.array([], dtype=bytes)
+        dates = pd.to_datetime(raw_dates.astype(str)).to_numpy()
+        order = np.argsort(dates, kind="stable")
+
+        names = list(dict.fromkeys(name for chunk in self._column_chunks for name in chunk))
+        columns = {}
+        for name in names:
+            parts = []
+            for chunk_dates, chunk in zip(self._date_chunks, self._column_chunks):
+                parts.append(chunk[name] if name in chunk else np.full(len(chunk_dates), np.nan))
+            columns[name] = np.concatenate(parts)[order]
+
+        return dates[order], columns
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Builds the price DataFrame indexed by date, sorted ascending.
+
+        Returns
+        -------
+        pd.DataFrame
+            One column per kept field, empty if the payload had no records.
+        """
+        self.close()
+        dates, columns = self._sorted_columns()
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(dates, name="date"))
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Builds the price table with a ``date`` timestamp column first, sorted ascending.
+
+        Returns
+        -------
+        pa.Table
+            One column per kept field.
+        """
+        self.close()
+        dates, columns = self._sorted_columns()
+        arrays = {"date": pa.array(dates, type=pa.timestamp("ns"))}
+        arrays.update({name: pa.array(values) for name, values in columns.items()})
+        return pa.table(arrays)
@@ -1,12 +1,92 @@
+import asyncio
+import contextlib
+import datetime
 import json
-import certifi
-from urllib.request import urlopen
+import threading
+import typing
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+
+from src.usa_forecast.data_download import call_ledger as cl
+from src.usa_forecast.data_download import http_session as hs
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download import response_cache as rc
+from src.usa_forecast.data_download.async_http import AsyncHTTPClient
+from src.usa_forecast.data_download.eod_parser import EodColumnParser
+from src.usa_forecast.entities.configuration import Configuration
+
+EOD_DROP_COLUMNS = ["change", "changePercent", "vwap", "symbol"]
+
+EOD_ENDPOINT = "historical-price-eod/full"
+ONE_MIN_ENDPOINT = "historical-chart/1min"
+QUOTE_ENDPOINT = "batch-quote"
+
+# Longest range, in years, the EOD endpoint returns whole in one response
+MAX_RANGE_YEARS = 5
+
+# Quote fields mapped to the daily bar columns
+QUOTE_BAR_FIELDS = {"open": "open", "dayHigh": "high", "dayLow": "low", "price": "close", "volume": "volume"}
+QUOTE_TIMEZONE = "America/New_York"
+
+DEFAULT_BASE_URL = "https://financialmodelingprep.com"
+
+_base_url = DEFAULT_BASE_URL
+
+# Pool fetching the date chunks of long histories, separate from the per-ticker pool
+# so a ticker waiting on its chunks never blocks them
+_chunk_executor_lock = threading.Lock()
+_chunk_executor: ThreadPoolExecutor | None = None
+_chunk_workers = 8
+
+def configure(configuration: Configuration) -> None:
+    """
+    Applies the download settings of the configuration to the shared data download layer.
+
+    Parameters
+    ----------
+    configuration : Configuration
+        Loaded configuration entity.
+    """
+    set_base_url(configuration.fmp_base_url)
+    hs.configure_session(
+        pool_size=configuration.http_pool_size,
+        max_per_host=configuration.http_max_per_host,
+        timeout=configuration.request_timeout
+    )
+    rc.configure_cache(
+        mode=configuration.response_cache_mode,
+        intraday_ttl=configuration.intraday_cache_ttl
+    )
+    rl.configure_limiter(
+        rate_per_minute=configuration.rate_limit_per_minute,
+        max_concurrency=configuration.download_concurrency
+    )
+    configure_chunk_executor(max_workers=configuration.download_concurrency)
+    cl.configure_ledger(daily_budget=configuration.daily_call_budget)
+
+def configure_chunk_executor(max_workers: int) -> None:
+    """
+    Sets the number of threads fetching date chunks concurrently (see fetch_eod_history).
+    """
+    global _chunk_executor, _chunk_workers
+    with _chunk_executor_lock:
+        if _chunk_executor is not None:
+            _chunk_executor.shutdown(wait=False)
+            _chunk_executor = None
+        _chunk_workers = max_workers
+
+def _get_chunk_executor() -> ThreadPoolExecutor:
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ThreadPoolExecutor(max_workers=_chunk_workers, thread_name_prefix="fmp-chunk")
+        return _chunk_executor
 
 def get_jsonparsed_data(url: str) -> list[dict]:
     """
-    Parses JSON data from a given URL using SSL certificate validation.
+    Parses JSON data from a given URL through the shared keep-alive session.
 
     Parameters
     ----------
@@ -18,19 +98,206 @@ def get_jsonparsed_data(url: str) -> list[dict]:
     list[dict]
         Parsed JSON content from the API response as a list of dictionaries.
     """
-    response = urlopen(url, cafile=certifi.where())
-    data = response.read().decode("utf-8")
+    data = hs.get_session().get(url).decode("utf-8")
     return json.loads(data)
 
-def fetch_eod_price_data_arrow(ticker: str, start_date: str, end_date: str, api_key: str) -> pa.Table:
-    url = (
-        "https://financialmodelingprep.com/stable/historical-price-eod/full"
+async def get_jsonparsed_data_async(client: AsyncHTTPClient, url: str) -> list[dict]:
+    """
+    Asyncio counterpart of get_jsonparsed_data.
+
+    Parameters
+    ----------
+    client : AsyncHTTPClient
+        Client bound to the running event loop.
+    url : str
+        Fully constructed URL to query the API.
+
+    Returns
+    -------
+    list[dict]
+        Parsed JSON content from the API response as a list of dictionaries.
+    """
+    data = (await client.get(url)).decode("utf-8")
+    return json.loads(data)
+
+def response_chunks(
+    url: str,
+    endpoint: str,
+    symbol: str,
+    start: str | None = None,
+    end: str | None = None
+) -> typing.Iterator[bytes]:
+    """
+    Yields the response body of a request, served from the response cache when possible.
+    Network requests go through the shared rate limiter and are counted in the call
+    ledger, cache hits are not.
+
+    Parameters
+    ----------
+    url : str
+        Fully constructed URL to query on a cache miss.
+    endpoint : str
+        Endpoint name, part of the cache key.
+    symbol : str
+        Symbol(s) requested, part of the cache key.
+    start : str, optional
+        Start date of the requested range, part of the cache key.
+    end : str, optional
+        End date of the requested range, part of the cache key and used for expiry.
+
+    Raises
+    ------
+    ResponseCacheMissError
+        In replay mode, when the response is not cached.
+    CallBudgetExceededError
+        When the daily call budget is used up and the response is not cached.
+    """
+    cache = rc.get_cache()
+    key = cache.make_key(endpoint=endpoint, symbol=symbol, start=start, end=end, namespace=_cache_namespace())
+
+    cached_path = cache.lookup(key=key, end=end)
+    if cached_path is not None:
+        yield from cache.iter_cached(cached_path)
+        return
+
+    ledger = cl.get_ledger()
+    ledger.check(endpoint)
+
+    # Closing this generator closes the response too, releasing its per-host slot
+    with rl.get_limiter().slot() as timer, contextlib.closing(hs.get_session().iter_chunks(url)) as body:
+        ledger.record(endpoint)
+        for chunk in cache.tee(key=key, chunks=body):
+            timer.first_byte()
+            yield chunk
+
+async def response_chunks_async(
+    client: AsyncHTTPClient,
+    url: str,
+    endpoint: str,
+    symbol: str,
+    start: str | None = None,
+    end: str | None = None
+) -> typing.AsyncIterator[bytes]:
+    """
+    Asyncio counterpart of response_chunks.
+    """
+    cache = rc.get_cache()
+    key = cache.make_key(endpoint=endpoint, symbol=symbol, start=start, end=end, namespace=_cache_namespace())
+
+    cached_path = cache.lookup(key=key, end=end)
+    if cached_path is not None:
+        for chunk in cache.iter_cached(cached_path):
+            yield chunk
+        return
+
+    ledger = cl.get_ledger()
+    ledger.check(endpoint)
+
+    async with rl.get_limiter().slot_async() as timer, contextlib.aclosing(client.iter_chunks(url)) as body:
+        ledger.record(endpoint)
+        async for chunk in cache.tee_async(key=key, chunks=body):
+            timer.first_byte()
+            yield chunk
+
+def set_base_url(base_url: str) -> None:
+    """
+    Points every FMP request at ``base_url``, e.g. a local stand-in server (see fmp_standin).
+    """
+    global _base_url
+    _base_url = base_url.rstrip("/")
+
+def get_base_url() -> str:
+    return _base_url
+
+def _cache_namespace() -> str | None:
+    # Responses of the live API keep their original cache keys
+    return None if _base_url == DEFAULT_BASE_URL else _base_url
+
+def build_eod_url(ticker: str, start_date: str, end_date: str, api_key: str) -> str:
+    return (
+        f"{_base_url}/stable/historical-price-eod/full"
         f"?symbol={ticker}&from={start_date}&to={end_date}&apikey={api_key}"
     )
-    data = get_jsonparsed_data(url)
-    if not isinstance(data, list):
-        raise ValueError(f"Unexpected format returned for {ticker}")
-    return pa.Table.from_pylist(data)
+
+def build_1m_url(ticker: str, api_key: str) -> str:
+    return f"{_base_url}/api/v3/historical-chart/1min/{ticker}?apikey={api_key}"
+
+def build_quote_url(tickers: list[str], api_key: str) -> str:
+    return f"{_base_url}/stable/batch-quote?symbols={','.join(tickers)}&apikey={api_key}"
+
+def parse_eod_stream(chunks: typing.Iterable[bytes], ticker: str) -> EodColumnParser:
+    """
+    Feeds a response body, chunk by chunk, into a columnar parser that skips the EOD
+    fields the pipeline drops.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Response body pieces as they are received.
+    ticker : str
+        Ticker the response belongs to, used for error messages.
+
+    Returns
+    -------
+    EodColumnParser
+        Parser holding the typed column buffers.
+
+    Raises
+    ------
+    ValueError
+        If the API response is not a valid list of dictionaries.
+    """
+    parser = EodColumnParser(ticker=ticker, skip=EOD_DROP_COLUMNS)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+    finally:
+        # A body abandoned on a parse error releases its connection now, not on collection
+        if hasattr(chunks, "close"):
+            chunks.close()
+    parser.close()
+    return parser
+
+async def parse_eod_stream_async(chunks: typing.AsyncIterable[bytes], ticker: str) -> EodColumnParser:
+    """
+    Asyncio counterpart of parse_eod_stream.
+    """
+    parser = EodColumnParser(ticker=ticker, skip=EOD_DROP_COLUMNS)
+    try:
+        async for chunk in chunks:
+            parser.feed(chunk)
+    finally:
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+    parser.close()
+    return parser
+
+def fetch_eod_price_data_arrow(ticker: str, start_date: str, end_date: str, api_key: str) -> pa.Table:
+    """
+    Same as fetch_eod_price_data, but the column buffers go straight into a pa.Table
+    with a leading 'date' column, without building a DataFrame.
+    """
+    url = build_eod_url(ticker=ticker, start_date=start_date, end_date=end_date, api_key=api_key)
+    chunks = response_chunks(url=url, endpoint=EOD_ENDPOINT, symbol=ticker, start=start_date, end=end_date)
+    parser = parse_eod_stream(chunks=chunks, ticker=ticker)
+    return parser.to_arrow()
+
+async def fetch_eod_price_data_arrow_async(
+    client: AsyncHTTPClient,
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    api_key: str
+) -> pa.Table:
+    """
+    Asyncio counterpart of fetch_eod_price_data_arrow.
+    """
+    url = build_eod_url(ticker=ticker, start_date=start_date, end_date=end_date, api_key=api_key)
+    chunks = response_chunks_async(
+        client=client, url=url, endpoint=EOD_ENDPOINT, symbol=ticker, start=start_date, end=end_date
+    )
+    parser = await parse_eod_stream_async(chunks=chunks, ticker=ticker)
+    return parser.to_arrow()
 
 def fetch_eod_price_data(
     ticker: str,
@@ -41,6 +308,9 @@ def fetch_eod_price_data(
     """
     Fetches historical end-of-day (EOD) stock price data from Financial Modeling Prep.
 
+    The response is parsed while it streams in, straight into typed column buffers,
+    skipping the fields that are not kept (change, changePercent, vwap and symbol).
+
     Parameters
     ----------
     ticker : str
@@ -55,31 +325,40 @@ def fetch_eod_price_data(
     Returns
     -------
     pd.DataFrame
-        DataFrame with historical EOD data indexed by date.
+        DataFrame with historical EOD data indexed by date, empty if the range has no data.
 
     Raises
     ------
     ValueError
         If the API response is not a valid list of dictionaries.
     """
-    url = (
-        "https://financialmodelingprep.com/stable/historical-price-eod/full"
-        f"?symbol={ticker}&from={start_date}&to={end_date}&apikey={api_key}"
-    )
+    url = build_eod_url(ticker=ticker, start_date=start_date, end_date=end_date, api_key=api_key)
 
-    data = get_jsonparsed_data(url=url)
+    chunks = response_chunks(url=url, endpoint=EOD_ENDPOINT, symbol=ticker, start=start_date, end=end_date)
 
-    if not isinstance(data, list):
-        raise ValueError(f"Unexpected data format returned from API for {ticker}")
+    parser = parse_eod_stream(chunks=chunks, ticker=ticker)
 
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df.set_index("date", inplace=True)
+    return parser.to_frame()
 
-    drop  = ["change", "changePercent", "vwap", "symbol"]
-    df_final = df.drop(drop, axis=1)
+async def fetch_eod_price_data_async(
+    client: AsyncHTTPClient,
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    api_key: str
+) -> pd.DataFrame:
+    """
+    Asyncio counterpart of fetch_eod_price_data, see that function for details.
+    """
+    url = build_eod_url(ticker=ticker, start_date=start_date, end_date=end_date, api_key=api_key)
+
+    chunks = response_chunks_async(
+        client=client, url=url, endpoint=EOD_ENDPOINT, symbol=ticker, start=start_date, end=end_date
+    )
 
-    return df_final.sort_index()
+    parser = await parse_eod_stream_async(chunks=chunks, ticker=ticker)
+
+    return parser.to_frame()
 
 def fetch_eod_last_1m_price_data(ticker: str,
                                  api_key: str) -> pd.DataFrame:
@@ -88,23 +367,271 @@ def fetch_eod_last_1m_price_data(ticker: str,
     :param api_key:
     :return:
     """
-    url_one_min = (
-        f"https://financialmodelingprep.com/api/v3/historical-chart/1min/{ticker}?apikey={api_key}"
+    url_one_min = build_1m_url(ticker=ticker, api_key=api_key)
+
+    chunks = response_chunks(url=url_one_min, endpoint=ONE_MIN_ENDPOINT, symbol=ticker)
+
+    parser = parse_eod_stream(chunks=chunks, ticker=ticker)
+
+    return parser.to_frame().tail(1)
+
+async def fetch_eod_last_1m_price_data_async(client: AsyncHTTPClient,
+                                             ticker: str,
+                                             api_key: str) -> pd.DataFrame:
+    """
+    Asyncio counterpart of fetch_eod_last_1m_price_data.
+    """
+    url_one_min = build_1m_url(ticker=ticker, api_key=api_key)
+
+    chunks = response_chunks_async(client=client, url=url_one_min, endpoint=ONE_MIN_ENDPOINT, symbol=ticker)
+
+    parser = await parse_eod_stream_async(chunks=chunks, ticker=ticker)
+
+    return parser.to_frame().tail(1)
+
+def quotes_to_bars(quotes: list[dict]) -> dict[str, pd.DataFrame]:
+    """
+    Turns FMP quotes into single-row daily bars, indexed by the trading date of the quote.
+
+    Parameters
+    ----------
+    quotes : list[dict]
+        Quote payload as returned by the batch-quote endpoint.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        One DataFrame per symbol with the open, high, low, close and volume of the day.
+    """
+    bars = {}
+    for quote in quotes:
+        if quote.get("price") is None or quote.get("timestamp") is None:
+            continue
+
+        # The quote timestamp is in UTC, the bar belongs to the exchange's trading day
+        day = (
+            pd.Timestamp(quote["timestamp"], unit="s", tz="UTC")
+            .tz_convert(QUOTE_TIMEZONE)
+            .normalize()
+            .tz_localize(None)
+        )
+        values = {
+            column: float(quote[field]) if quote.get(field) is not None else float("nan")
+            for field, column in QUOTE_BAR_FIELDS.items()
+        }
+        if quote.get("volume") is not None:
+            values["volume"] = int(quote["volume"])
+        bars[quote["symbol"]] = pd.DataFrame([values], index=pd.DatetimeIndex([day], name="date"))
+    return bars
+
+def fetch_latest_quotes(tickers: list[str], api_key: str) -> dict[str, pd.DataFrame]:
+    """
+    Fetches the current quote of many tickers in a single request and returns them as
+    single-row daily bars. The cost is one small payload per batch of tickers, instead of
+    the whole intraday history per ticker.
+
+    Parameters
+    ----------
+    tickers : list[str]
+        Ticker symbols of the batch.
+    api_key : str
+        Your API key from Financial Modeling Prep.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Latest bar per ticker, tickers without a quote are missing from the result.
+
+    Raises
+    ------
+    ValueError
+        If the API response is not a list of quotes.
+    """
+    url = build_quote_url(tickers=tickers, api_key=api_key)
+
+    chunks = response_chunks(url=url, endpoint=QUOTE_ENDPOINT, symbol=",".join(tickers))
+
+    quotes = json.loads(b"".join(chunks).decode("utf-8"))
+    if not isinstance(quotes, list):
+        raise ValueError(f"Unexpected data format returned from API for quotes: {quotes}")
+
+    return quotes_to_bars(quotes)
+
+def split_date_range(start_date: str, end_date: str, chunk_years: int) -> list[tuple[str, str]]:
+    """
+    Splits an inclusive date range into consecutive chunks of ``chunk_years`` calendar years.
+
+    Chunk boundaries sit on January 1st of the years divisible by ``chunk_years``, so the
+    same closed chunks (and their cached responses) are reused whatever the start date.
+
+    Parameters
+    ----------
+    start_date : str
+        Start date in 'YYYY-MM-DD' format.
+    end_date : str
+        End date in 'YYYY-MM-DD' format.
+    chunk_years : int
+        Years per chunk, 0 keeps the whole range in a single chunk.
+
+    Returns
+    -------
+    list[tuple[str, str]]
+        (start, end) pairs in ascending order.
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    if chunk_years <= 0 or start > end:
+        return [(start_date, end_date)]
+
+    ranges = []
+    current = start
+    while current <= end:
+        next_boundary = datetime.date((current.year // chunk_years + 1) * chunk_years, 1, 1)
+        chunk_end = min(end, next_boundary - datetime.timedelta(days=1))
+        ranges.append((current.isoformat(), chunk_end.isoformat()))
+        current = chunk_end + datetime.timedelta(days=1)
+    return ranges
+
+def history_chunks(start_date: str, end_date: str, chunk_years: int) -> list[tuple[str, str]]:
+    """
+    Date chunks fetch_eod_history requests: ``chunk_years`` chunks (see split_date_range)
+    for ranges longer than MAX_RANGE_YEARS, which the API would truncate, and the whole
+    range in one request otherwise or when chunking is disabled.
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    if (end - start).days < MAX_RANGE_YEARS * 365:
+        return [(start_date, end_date)]
+    return split_date_range(start_date=start_date, end_date=end_date, chunk_years=chunk_years)
+
+def merge_chunk_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates chunk DataFrames, keeping one row per date (the last chunk wins), sorted.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    merged = pd.concat(frames)
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index(kind="stable")
+
+def merge_chunk_tables(tables: list[pa.Table]) -> pa.Table:
+    """
+    Arrow counterpart of merge_chunk_frames, on tables with a 'date' column.
+    """
+    if len(tables) == 1:
+        return tables[0]
+    merged = pa.concat_tables(tables, promote_options="default")
+
+    # Reversed stable sort puts the last chunk's row first within each date
+    reversed_order = np.arange(merged.num_rows)[::-1]
+    merged = merged.take(pa.array(reversed_order)).sort_by([("date", "ascending")])
+    dates = merged["date"].to_numpy()
+    keep = np.ones(len(dates), dtype=bool)
+    keep[1:] = dates[1:] != dates[:-1]
+    return merged.filter(pa.array(keep))
+
+def is_cached(endpoint: str, symbol: str, start: str | None = None, end: str | None = None) -> bool:
+    """
+    True when a request would be served without a network call: a fresh entry of the
+    response cache, or any request in replay mode.
+    """
+    cache = rc.get_cache()
+    if cache.mode == "replay":
+        return True
+    if cache.mode == "off":
+        return False
+    key = cache.make_key(endpoint=endpoint, symbol=symbol, start=start, end=end, namespace=_cache_namespace())
+    return cache.lookup(key=key, end=end) is not None
+
+def projected_history_calls(ticker: str, start_date: str, end_date: str, chunk_years: int = 0) -> int:
+    """
+    Number of API calls fetch_eod_history would make right now, cached chunks are free.
+    """
+    return sum(
+        not is_cached(endpoint=EOD_ENDPOINT, symbol=ticker, start=start, end=end)
+        for start, end in history_chunks(start_date=start_date, end_date=end_date, chunk_years=chunk_years)
     )
 
-    data_one = get_jsonparsed_data(url=url_one_min)
+def fetch_eod_history(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    api_key: str,
+    chunk_years: int = 0,
+    max_retries: int = 0,
+    as_arrow: bool = False
+) -> pd.DataFrame | pa.Table:
+    """
+    Downloads a long EOD history as concurrent year-sized chunks (see history_chunks).
+
+    Each chunk is fetched, and retried with jittered backoff, on its own, so the latency
+    of a cold start is bounded by the slowest chunk rather than by one whole-range request,
+    and a failed chunk does not re-download the others. The chunks are merged in date
+    order without duplicates.
+
+    Parameters
+    ----------
+    ticker : str
+        The stock ticker symbol (e.g., "AAPL").
+    start_date : str
+        Start date in 'YYYY-MM-DD' format.
+    end_date : str
+        End date in 'YYYY-MM-DD' format.
+    api_key : str
+        Your API key from Financial Modeling Prep.
+    chunk_years : int
+        Years per chunk of ranges the API would truncate, 0 downloads any range in a
+        single request.
+    max_retries : int
+        Retries per chunk on throttling, server, timeout and network errors.
+    as_arrow : bool
+        Returns a pa.Table (see fetch_eod_price_data_arrow) instead of a DataFrame.
+
+    Returns
+    -------
+    pd.DataFrame | pa.Table
+        Historical EOD data sorted by date.
+    """
+    fetch = fetch_eod_price_data_arrow if as_arrow else fetch_eod_price_data
 
-    if not isinstance(data_one, list):
-        raise ValueError(f"Unexpected data format returned from API for {ticker}")
+    def fetch_chunk(chunk: tuple[str, str]) -> pd.DataFrame | pa.Table:
+        return rl.call_with_retries(
+            lambda: fetch(ticker=ticker, start_date=chunk[0], end_date=chunk[1], api_key=api_key),
+            max_retries=max_retries,
+            description=f"{ticker} {chunk[0]}..{chunk[1]}"
+        )
 
-    df = pd.DataFrame(data_one)
-    df["date"] = pd.to_datetime(df["date"])
-    df.set_index("date", inplace=True)
-    df = df.sort_index()
+    chunks = history_chunks(start_date=start_date, end_date=end_date, chunk_years=chunk_years)
+    if len(chunks) == 1:
+        parts = [fetch_chunk(chunks[0])]
+    else:
+        parts = list(_get_chunk_executor().map(fetch_chunk, chunks))
 
-    last_data = df.tail(1)
+    return merge_chunk_tables(parts) if as_arrow else merge_chunk_frames(parts)
+
+async def fetch_eod_history_async(
+    client: AsyncHTTPClient,
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    api_key: str,
+    chunk_years: int = 0,
+    max_retries: int = 0,
+    as_arrow: bool = False
+) -> pd.DataFrame | pa.Table:
+    """
+    Asyncio counterpart of fetch_eod_history, the chunks run concurrently on the event loop.
+    """
+    fetch = fetch_eod_price_data_arrow_async if as_arrow else fetch_eod_price_data_async
 
-    del df
+    async def fetch_chunk(chunk: tuple[str, str]) -> pd.DataFrame | pa.Table:
+        return await rl.call_with_retries_async(
+            lambda: fetch(client=client, ticker=ticker, start_date=chunk[0], end_date=chunk[1], api_key=api_key),
+            max_retries=max_retries,
+            description=f"{ticker} {chunk[0]}..{chunk[1]}"
+        )
 
-    return last_data
+    chunks = history_chunks(start_date=start_date, end_date=end_date, chunk_years=chunk_years)
+    parts = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
 
+    return merge_chunk_tables(list(parts)) if as_arrow else merge_chunk_frames(list(parts))
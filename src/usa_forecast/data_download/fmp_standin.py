@@ -0,0 +1,420 @@
+"""
+Local stand-in for the Financial Modeling Prep API, to benchmark and regression-test the
+download layer offline.
+
+It serves the endpoints used by fmp_mkt_data (``stable/historical-price-eod/full``,
+``api/v3/historical-chart/1min/{symbol}`` and ``stable/batch-quote``) from recorded
+fixtures or from deterministic synthetic data, with configurable latency, jitter,
+429 injection, payload sizes and body framing.
+
+Usage
+-----
+Start it from the project root::
+
+    python -m src.usa_forecast.data_download.fmp_standin --port 8765 --latency 0.05 --throttle-rate 0.02
+
+and set ``fmp_base_url`` to ``http://127.0.0.1:8765`` in the General sheet, or call
+``fmd.set_base_url``. Fixtures are recorded from the live API with ``--record``.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+EOD_PATH = "/stable/historical-price-eod/full"
+ONE_MIN_PATH = "/api/v3/historical-chart/1min/"
+QUOTE_PATH = "/stable/batch-quote"
+
+# Fixture sub-folders, one JSON file per symbol: <fixtures_dir>/eod/AAPL.json
+EOD_FIXTURES = "eod"
+ONE_MIN_FIXTURES = "1min"
+
+DEFAULT_START_DATE = "2000-01-01"
+
+# How response bodies are delimited: Content-Length, chunked transfer encoding, or
+# the server closing the connection
+VALID_FRAMINGS = {"length", "chunked", "close"}
+FRAMING_CHUNK_SIZE = 4096
+
+# First day of the synthetic price walks, every requested range is a slice of the same walk
+SYNTHETIC_ORIGIN = "1970-01-01"
+
+
+def _symbol_seed(symbol: str, seed: int) -> int:
+    return int.from_bytes(hashlib.sha256(f"{seed}:{symbol}".encode()).digest()[:4], "little")
+
+
+def synthetic_eod(symbol: str, start: str, end: str, seed: int = 0, max_bars: int | None = None) -> list[dict]:
+    """
+    Deterministic random-walk EOD bars for the business days between start and end,
+    newest first and with the same fields as the FMP response.
+    """
+    days = np.arange(np.datetime64(start[:10], "D"), np.datetime64(end[:10], "D") + 1)
+    days = days[np.is_busday(days) & (days >= np.datetime64(SYNTHETIC_ORIGIN, "D"))]
+    if max_bars is not None:
+        days = days[-max_bars:]
+
+    if len(days) == 0:
+        return []
+
+    rng = np.random.default_rng(_symbol_seed(symbol, seed))
+    offset = int(np.busday_count(np.datetime64(SYNTHETIC_ORIGIN, "D"), days[0]))
+    all_returns = rng.normal(0.0002, 0.02, offset + len(days))
+    returns = all_returns[offset:]
+    close = 50.0 * np.exp(np.cumsum(all_returns)[offset:])
+    open_ = close / (1 + returns)
+
+    columns = zip(
+        days.astype(str).tolist(),
+        np.round(open_, 4).tolist(),
+        np.round(np.maximum(open_, close) * 1.01, 4).tolist(),
+        np.round(np.minimum(open_, close) * 0.99, 4).tolist(),
+        np.round(close, 4).tolist(),
+        (1_000_000 + np.abs(returns) * 50_000_000).astype(np.int64).tolist(),
+        np.round(close - open_, 4).tolist(),
+        np.round(returns * 100, 4).tolist(),
+        np.round((open_ + close) / 2, 4).tolist(),
+    )
+    bars = [
+        {
+            "symbol": symbol, "date": date, "open": o, "high": h, "low": l, "close": c,
+            "volume": v, "change": ch, "changePercent": cp, "vwap": vw,
+        }
+        for date, o, h, l, c, v, ch, cp, vw in columns
+    ]
+    return bars[::-1]
+
+
+def synthetic_1min(symbol: str, bars: int = 390, seed: int = 0, day: datetime.date | None = None) -> list[dict]:
+    """
+    Deterministic 1-minute bars of one session starting at 09:30, newest first.
+    """
+    day = day or datetime.date.today()
+    rng = np.random.default_rng(_symbol_seed(symbol, seed) + day.toordinal())
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    start = datetime.datetime.combine(day, datetime.time(9, 30))
+
+    records = []
+    for i, price in enumerate(close):
+        records.append({
+            "date": (start + datetime.timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "open": round(price, 4),
+            "low": round(price * 0.999, 4),
+            "high": round(price * 1.001, 4),
+            "close": round(price, 4),
+            "volume": int(1000 + rng.integers(0, 5000)),
+        })
+    return records[::-1]
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 refuses connections under a concurrent download burst
+    request_queue_size = 512
+    daemon_threads = True
+
+
+class FmpStandInServer:
+    """
+    Threaded HTTP server mimicking the FMP endpoints used by the project.
+
+    Recorded fixtures take precedence over synthetic data when ``fixtures_dir`` has a file
+    for the requested symbol. Each response is delayed by ``latency`` seconds plus a uniform
+    jitter, and a ``throttle_rate`` fraction of the requests answer 429 with a Retry-After
+    header. Request and throttle counters are kept in ``stats`` for benchmarks.
+    Bodies are sent with the ``framing`` of the real API (Content-Length) or, to exercise
+    the clients, chunked or delimited by closing the connection.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures_dir: str | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        max_bars: int | None = None,
+        intraday_bars: int = 390,
+        seed: int = 0,
+        framing: str = "length"
+    ):
+        """
+        Parameters
+        ----------
+        host : str
+            Interface to listen on.
+        port : int
+            Port to listen on, 0 picks a free one.
+        fixtures_dir : str, optional
+            Folder with recorded responses (eod/<SYMBOL>.json and 1min/<SYMBOL>.json).
+        latency : float
+            Seconds added before every response.
+        jitter : float
+            Maximum random seconds added to or removed from the latency.
+        throttle_rate : float
+            Fraction (0 to 1) of the requests answered with 429.
+        retry_after : float
+            Retry-After value, in seconds, of the 429 responses.
+        max_bars : int, optional
+            Caps the number of EOD bars per response, None serves the whole requested range.
+        intraday_bars : int
+            Number of synthetic 1-minute bars per response.
+        seed : int
+            Seed of the synthetic data and of the latency/throttling draws.
+        framing : str
+            One of 'length', 'chunked' or 'close'.
+        """
+        if framing not in VALID_FRAMINGS:
+            raise ValueError(f"Invalid framing: {framing}. Expected one of: {', '.join(sorted(VALID_FRAMINGS))}")
+
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_bars = max_bars
+        self.intraday_bars = intraday_bars
+        self.seed = seed
+        self.framing = framing
+
+        self.stats = {"requests": 0, "throttled": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+        self._server = _StandInHTTPServer((host, port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: typing.Any) -> None:
+                logger.debug(f"FMP stand-in: {format % args}")
+
+            def do_GET(self) -> None:
+                status, body, headers = standin.handle(self.path)
+                framing = standin.framing
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if framing == "length":
+                    self.send_header("Content-Length", str(len(body)))
+                elif framing == "chunked":
+                    self.send_header("Transfer-Encoding", "chunked")
+                else:
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+
+                if framing == "chunked":
+                    for start in range(0, len(body), FRAMING_CHUNK_SIZE):
+                        piece = body[start:start + FRAMING_CHUNK_SIZE]
+                        self.wfile.write(f"{len(piece):x}\r\n".encode("ascii") + piece + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.wfile.write(body)
+
+        return Handler
+
+    def _load_fixture(self, kind: str, symbol: str) -> list[dict] | None:
+        if self.fixtures_dir is None:
+            return None
+        path = self.fixtures_dir / kind / f"{symbol}.json"
+        if not path.is_file():
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _eod(self, query: dict[str, list[str]]) -> list[dict]:
+        symbol = query.get("symbol", [""])[0]
+        start = query.get("from", [DEFAULT_START_DATE])[0]
+        end = query.get("to", [datetime.date.today().isoformat()])[0]
+
+        records = self._load_fixture(EOD_FIXTURES, symbol)
+        if records is None:
+            return synthetic_eod(symbol=symbol, start=start, end=end, seed=self.seed, max_bars=self.max_bars)
+
+        records = [record for record in records if start <= record["date"][:10] <= end]
+        return records[:self.max_bars] if self.max_bars is not None else records
+
+    def _one_min(self, symbol: str) -> list[dict]:
+        records = self._load_fixture(ONE_MIN_FIXTURES, symbol)
+        if records is None:
+            return synthetic_1min(symbol=symbol, bars=self.intraday_bars, seed=self.seed)
+        return records
+
+    def _quotes(self, query: dict[str, list[str]]) -> list[dict]:
+        quotes = []
+        for symbol in query.get("symbols", [""])[0].split(","):
+            if not symbol:
+                continue
+            last = self._one_min(symbol)[0]
+            timestamp = pd.Timestamp(last["date"]).tz_localize("America/New_York").timestamp()
+            quotes.append({
+                "symbol": symbol,
+                "price": last["close"],
+                "open": last["open"],
+                "dayHigh": last["high"],
+                "dayLow": last["low"],
+                "volume": last["volume"],
+                "timestamp": int(timestamp),
+            })
+        return quotes
+
+    def handle(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """
+        Builds the (status, body, extra headers) answer for a request path.
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            throttled = self._random.random() < self.throttle_rate
+            if throttled:
+                self.stats["throttled"] += 1
+
+        if delay:
+            time.sleep(delay)
+
+        if throttled:
+            body = json.dumps({"Error Message": "Limit Reach. Please upgrade your plan."}).encode()
+            return 429, body, {"Retry-After": f"{self.retry_after:g}"}
+
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+
+        if parts.path == EOD_PATH:
+            payload = self._eod(query)
+        elif parts.path.startswith(ONE_MIN_PATH):
+            payload = self._one_min(parts.path[len(ONE_MIN_PATH):])
+        elif parts.path == QUOTE_PATH:
+            payload = self._quotes(query)
+        else:
+            return 404, json.dumps({"Error Message": f"Unknown endpoint {parts.path}"}).encode(), {}
+
+        body = json.dumps(payload).encode()
+        with self._lock:
+            self.stats["bytes"] += len(body)
+        return 200, body, {}
+
+    def start(self) -> str:
+        """
+        Serves in a background thread and returns the base URL to pass to fmd.set_base_url.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fmp-standin", daemon=True)
+        self._thread.start()
+        logger.info(f"FMP stand-in listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FmpStandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.stop()
+
+#%%
+
+def record_fixtures(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    api_key: str,
+    fixtures_dir: str
+) -> None:
+    """
+    Records the live EOD and 1-minute responses of the given tickers as stand-in fixtures.
+    """
+    from src.usa_forecast.data_download import fmp_mkt_data as fmd
+
+    for kind in (EOD_FIXTURES, ONE_MIN_FIXTURES):
+        (Path(fixtures_dir) / kind).mkdir(parents=True, exist_ok=True)
+
+    for ticker in tickers:
+        eod = fmd.get_jsonparsed_data(fmd.build_eod_url(ticker, start_date, end_date, api_key))
+        one_min = fmd.get_jsonparsed_data(fmd.build_1m_url(ticker, api_key))
+        for kind, payload in ((EOD_FIXTURES, eod), (ONE_MIN_FIXTURES, one_min)):
+            with open(Path(fixtures_dir) / kind / f"{ticker}.json", "w", encoding="utf-8") as file:
+                json.dump(payload, file)
+        logger.info(f"Recorded fixtures for {ticker}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Financial Modeling Prep API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=None, help="Folder with recorded fixtures.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds on top of the latency.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-bars", type=int, default=None, help="Caps the EOD bars per response.")
+    parser.add_argument("--intraday-bars", type=int, default=390)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--framing", choices=sorted(VALID_FRAMINGS), default="length", help="How bodies are delimited.")
+    parser.add_argument("--record", nargs="+", metavar="TICKER", help="Record fixtures from the live API and exit.")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--start", default=DEFAULT_START_DATE)
+    parser.add_argument("--end", default=datetime.date.today().isoformat())
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.record:
+        if not args.fixtures or not args.api_key:
+            parser.error("--record needs --fixtures and --api-key")
+        record_fixtures(args.record, args.start, args.end, args.api_key, args.fixtures)
+        return
+
+    server = FmpStandInServer(
+        host=args.host,
+        port=args.port,
+        fixtures_dir=args.fixtures,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        max_bars=args.max_bars,
+        intraday_bars=args.intraday_bars,
+        seed=args.seed,
+        framing=args.framing
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import contextlib
+import http.client
+import queue
+import ssl
+import threading
+import typing
+import certifi
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+#%%
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_TIMEOUT = 30.0
+
+
+class PooledHTTPSession:
+    """
+    Thread-safe HTTP client that keeps connections alive and reuses them across requests.
+
+    Connections are pooled per (scheme, host, port). Each host has a semaphore limiting
+    how many requests can be in flight at once, and an idle pool capped at ``pool_size``
+    connections, so the TCP and TLS handshakes are paid once per connection instead of
+    once per request.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        """
+        Parameters
+        ----------
+        pool_size : int
+            Maximum number of idle keep-alive connections kept per host.
+        max_per_host : int
+            Maximum number of concurrent requests per host.
+        timeout : float
+            Socket timeout in seconds for each connection.
+        """
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], queue.LifoQueue] = {}
+        self._host_slots: dict[tuple[str, str, int], threading.BoundedSemaphore] = {}
+
+    def _host_state(self, key: tuple[str, str, int]) -> tuple[queue.LifoQueue, threading.BoundedSemaphore]:
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = queue.LifoQueue(maxsize=self.pool_size)
+                self._host_slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._idle[key], self._host_slots[key]
+
+    def _new_connection(self, key: tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        idle, _ = self._host_state(key)
+        try:
+            idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _open_response(self, url: str) -> typing.Iterator[http.client.HTTPResponse]:
+        """
+        Sends the request and yields the response with its body still unread.
+
+        The per-host slot is held until the context exits, after the body was read or
+        abandoned. The connection goes back to the pool only if the body was fully
+        consumed, otherwise it is closed.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        idle, slots = self._host_state(key)
+
+        with slots:
+            # A pooled connection may have been closed by the server while idle,
+            # in that case the request is retried once on a fresh connection.
+            for attempt in range(2):
+                try:
+                    conn = idle.get_nowait()
+                    reused = True
+                except queue.Empty:
+                    conn = self._new_connection(key)
+                    reused = False
+
+                try:
+                    conn.request("GET", target, headers={"Connection": "keep-alive"})
+                    response = conn.getresponse()
+                    break
+                except (http.client.HTTPException, OSError):
+                    conn.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+
+            try:
+                if response.status >= 400:
+                    response.read()
+                    raise HTTPError(url, response.status, response.reason, response.headers, None)
+                yield response
+            finally:
+                if response.isclosed() and not response.will_close:
+                    self._release(key, conn)
+                else:
+                    conn.close()
+
+    def get(self, url: str) -> bytes:
+        """
+        Performs a GET request and returns the raw response body.
+
+        Parameters
+        ----------
+        url : str
+            Fully constructed URL to query.
+
+        Returns
+        -------
+        bytes
+            Response body.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If the server answers with a status code of 400 or above.
+        """
+        with self._open_response(url) as response:
+            return response.read()
+
+    def iter_chunks(self, url: str, chunk_size: int = 65536) -> typing.Iterator[bytes]:
+        """
+        Performs a GET request and yields the response body as it is received.
+
+        The connection and its per-host slot stay taken while the body is being read:
+        callers must exhaust the iterator or close it (e.g. with ``contextlib.closing``),
+        otherwise the slot is only released when the generator is garbage collected,
+        which an exception traceback referencing it can postpone indefinitely.
+
+        Parameters
+        ----------
+        url : str
+            Fully constructed URL to query.
+        chunk_size : int
+            Maximum size in bytes of each yielded chunk.
+
+        Yields
+        ------
+        bytes
+            Consecutive pieces of the response body.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If the server answers with a status code of 400 or above.
+        """
+        with self._open_response(url) as response:
+            while True:
+                chunk = response.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def close(self) -> None:
+        """
+        Closes every idle pooled connection.
+        """
+        with self._lock:
+            pools = list(self._idle.values())
+        for idle in pools:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+#%%
+
+_session_lock = threading.Lock()
+_session: PooledHTTPSession | None = None
+
+
+def configure_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_per_host: int = DEFAULT_MAX_PER_HOST,
+    timeout: float = DEFAULT_TIMEOUT
+) -> PooledHTTPSession:
+    """
+    Replaces the shared session with one using the given pool settings.
+
+    Parameters
+    ----------
+    pool_size : int
+        Maximum number of idle keep-alive connections kept per host.
+    max_per_host : int
+        Maximum number of concurrent requests per host.
+    timeout : float
+        Socket timeout in seconds.
+
+    Returns
+    -------
+    PooledHTTPSession
+        The new shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = PooledHTTPSession(pool_size=pool_size, max_per_host=max_per_host, timeout=timeout)
+        return _session
+
+
+def get_session() -> PooledHTTPSession:
+    """
+    Returns the shared session, creating it with default settings on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledHTTPSession()
+        return _session
@@ -0,0 +1,309 @@
+import asyncio
+import contextlib
+import http.client
+import logging
+import random
+import threading
+import time
+import typing
+from urllib.error import HTTPError
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_RATE_PER_MINUTE = 300
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TARGET_LATENCY = 2.0
+
+# Seconds the bucket is paused after a 429 without Retry-After header
+DEFAULT_THROTTLE_PAUSE = 5.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every FMP request, combined with an AIMD concurrency limit.
+
+    The bucket caps the request rate at ``rate_per_minute``. On top of it, the number of
+    requests in flight is capped by a limit that grows additively (+1 per limit-worth of
+    fast responses) and is halved on a 429 or when the time to first byte exceeds
+    ``target_latency``. A 429 also pauses the bucket for the Retry-After period.
+    Thread-safe, and usable from asyncio through ``acquire_async``.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1,
+        target_latency: float = DEFAULT_TARGET_LATENCY
+    ):
+        """
+        Parameters
+        ----------
+        rate_per_minute : float
+            Maximum number of requests per minute, 0 disables the token bucket.
+        max_concurrency : int
+            Upper bound of the adaptive concurrency limit.
+        min_concurrency : int
+            Lower bound of the adaptive concurrency limit.
+        target_latency : float
+            Time to first byte, in seconds, above which the limit is decreased.
+        """
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1.0, min(rate_per_minute / 60.0 * 5, float(max_concurrency)))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.target_latency = target_latency
+
+        self._lock = threading.Condition()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._limit = float(max(self.min_concurrency, max_concurrency // 2))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._limit)
+
+    def _refill(self, now: float) -> None:
+        if self.rate_per_second > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def _try_acquire(self) -> float:
+        """
+        Takes a token and a concurrency slot, returning 0, or the seconds to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            if self._in_flight >= int(self._limit):
+                return 0.05
+
+            self._refill(now)
+            if self.rate_per_second > 0:
+                if self._tokens < 1.0:
+                    return (1.0 - self._tokens) / self.rate_per_second
+                self._tokens -= 1.0
+
+            self._in_flight += 1
+            return 0.0
+
+    def acquire(self) -> None:
+        while True:
+            wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            with self._lock:
+                self._lock.wait(timeout=wait)
+
+    async def acquire_async(self) -> None:
+        while True:
+            wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def _decrease(self, now: float) -> None:
+        # A burst of slow or throttled responses counts as a single congestion event
+        if now - self._last_decrease >= self.target_latency:
+            self._limit = max(float(self.min_concurrency), self._limit / 2)
+            self._last_decrease = now
+            logger.debug(f"Rate limiter: concurrency limit decreased to {int(self._limit)}")
+
+    def release(self, latency: float | None, throttled: bool = False, retry_after: float | None = None) -> None:
+        """
+        Frees the slot taken by acquire and feeds the response signal to the AIMD controller.
+
+        Parameters
+        ----------
+        latency : float | None
+            Time to first byte in seconds, None if the request failed before responding.
+        throttled : bool
+            True if the server answered 429.
+        retry_after : float, optional
+            Seconds requested by the server before sending more requests.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if throttled:
+                self._decrease(now)
+                self._paused_until = max(self._paused_until, now + (retry_after or DEFAULT_THROTTLE_PAUSE))
+                self._tokens = 0.0
+            elif latency is not None and latency > self.target_latency:
+                self._decrease(now)
+            elif latency is not None:
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+
+            self._lock.notify_all()
+
+    @staticmethod
+    def _throttle_signal(error: BaseException | None) -> tuple[bool, float | None]:
+        if isinstance(error, HTTPError) and error.code == 429:
+            retry_after = error.headers.get("Retry-After") if error.headers is not None else None
+            try:
+                return True, float(retry_after) if retry_after is not None else None
+            except ValueError:
+                return True, None
+        return False, None
+
+    @contextlib.contextmanager
+    def slot(self) -> typing.Iterator["RequestTimer"]:
+        """
+        Context manager around one request: waits for capacity, then reports the outcome.
+        """
+        self.acquire()
+        timer = RequestTimer()
+        try:
+            yield timer
+        except BaseException as error:
+            throttled, retry_after = self._throttle_signal(error)
+            self.release(latency=timer.latency, throttled=throttled, retry_after=retry_after)
+            raise
+        self.release(latency=timer.latency)
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self) -> typing.AsyncIterator["RequestTimer"]:
+        """
+        Asyncio counterpart of slot.
+        """
+        await self.acquire_async()
+        timer = RequestTimer()
+        try:
+            yield timer
+        except BaseException as error:
+            throttled, retry_after = self._throttle_signal(error)
+            self.release(latency=timer.latency, throttled=throttled, retry_after=retry_after)
+            raise
+        self.release(latency=timer.latency)
+
+
+class RequestTimer:
+    """
+    Measures the time to first byte of a request.
+    """
+
+    def __init__(self):
+        self._start = time.monotonic()
+        self.latency: float | None = None
+
+    def first_byte(self) -> None:
+        if self.latency is None:
+            self.latency = time.monotonic() - self._start
+
+#%%
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    True for throttling, server and transport errors; False for bad payloads and cache misses.
+    """
+    if isinstance(error, HTTPError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (OSError, http.client.HTTPException, asyncio.TimeoutError, TimeoutError))
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """
+    Full-jitter exponential backoff: a random delay in [0, min(max_delay, base_delay * 2**attempt)].
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def call_with_retries(
+    func: typing.Callable[[], typing.Any],
+    max_retries: int,
+    description: str = "request"
+) -> typing.Any:
+    """
+    Calls ``func`` and retries it with jittered exponential backoff on retryable errors.
+
+    Parameters
+    ----------
+    func : Callable[[], Any]
+        Function performing the request.
+    max_retries : int
+        Number of retries after the first attempt.
+    description : str
+        Label used in the log messages.
+
+    Returns
+    -------
+    Any
+        Return value of ``func``.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as error:
+            if attempt >= max_retries or not is_retryable(error):
+                raise
+            delay = backoff_delay(attempt)
+            logger.info(f"Retrying {description} in {delay:.1f}s after error: {error}")
+            time.sleep(delay)
+            attempt += 1
+
+
+async def call_with_retries_async(
+    func: typing.Callable[[], typing.Awaitable[typing.Any]],
+    max_retries: int,
+    description: str = "request"
+) -> typing.Any:
+    """
+    Asyncio counterpart of call_with_retries.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as error:
+            if attempt >= max_retries or not is_retryable(error):
+                raise
+            delay = backoff_delay(attempt)
+            logger.info(f"Retrying {description} in {delay:.1f}s after error: {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+#%%
+
+_limiter_lock = threading.Lock()
+_limiter: AdaptiveRateLimiter | None = None
+
+
+def configure_limiter(
+    rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    target_latency: float = DEFAULT_TARGET_LATENCY
+) -> AdaptiveRateLimiter:
+    """
+    Replaces the shared rate limiter with one using the given settings.
+    """
+    global _limiter
+    with _limiter_lock:
+        _limiter = AdaptiveRateLimiter(
+            rate_per_minute=rate_per_minute,
+            max_concurrency=max_concurrency,
+            target_latency=target_latency
+        )
+        return _limiter
+
+
+def get_limiter() -> AdaptiveRateLimiter:
+    """
+    Returns the shared rate limiter, creating it with default settings on first use.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter()
+        return _limiter
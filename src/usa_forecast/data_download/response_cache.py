@@ -0,0 +1,239 @@
+from src.usa_forecast.exceptions import ResponseCacheMissError
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import typing
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+VALID_CACHE_MODES = {"off", "read_write", "replay"}
+
+DEFAULT_CACHE_DIR = "Output/Cache/http"
+DEFAULT_INTRADAY_TTL = 60.0
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of raw API responses.
+
+    Entries are keyed by a hash of (endpoint, symbol, start, end), never by the full URL,
+    so the API key is not part of the key. Closed historical ranges (ending before the day
+    the entry was written) never expire, anything that can still change (intraday
+    endpoints, ranges reaching the day they were fetched) expires after ``intraday_ttl``
+    seconds.
+
+    Modes
+    -----
+    off
+        The cache is bypassed.
+    read_write
+        Fresh entries are served from disk, misses go to the network and are stored.
+    replay
+        Everything is served from disk regardless of age, a miss raises
+        ResponseCacheMissError and no network call is made.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        mode: str = "read_write",
+        intraday_ttl: float = DEFAULT_INTRADAY_TTL
+    ):
+        """
+        Parameters
+        ----------
+        directory : str
+            Folder where the responses are stored.
+        mode : str
+            One of 'off', 'read_write' or 'replay'.
+        intraday_ttl : float
+            Seconds an entry that can still change is considered fresh.
+        """
+        if mode not in VALID_CACHE_MODES:
+            raise ValueError(f"Invalid cache mode: {mode}. Expected one of: {', '.join(VALID_CACHE_MODES)}")
+
+        self.directory = Path(directory)
+        self.mode = mode
+        self.intraday_ttl = intraday_ttl
+
+    @staticmethod
+    def make_key(
+        endpoint: str,
+        symbol: str,
+        start: str | None = None,
+        end: str | None = None,
+        namespace: str | None = None
+    ) -> str:
+        """
+        Parameters
+        ----------
+        namespace : str, optional
+            Separates responses of another server (e.g. a local stand-in) from the live API ones.
+        """
+        parts = [endpoint, symbol, start, end]
+        if namespace is not None:
+            parts.append(namespace)
+        raw = json.dumps(parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_closed_range(end: str | None, fetched: datetime.date | None = None) -> bool:
+        """
+        True for ranges ending before the day their response was fetched (today by
+        default): the response already held every bar of the range and can never change.
+        A range fetched on or before its end date may have been missing its last bars.
+        """
+        fetched = fetched if fetched is not None else datetime.date.today()
+        return end is not None and datetime.date.fromisoformat(end) < fetched
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def lookup(self, key: str, end: str | None = None) -> Path | None:
+        """
+        Returns the path of a usable cached response, or None.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from make_key.
+        end : str, optional
+            End date of the requested range, None for endpoints without a range.
+
+        Raises
+        ------
+        ResponseCacheMissError
+            In replay mode, when the response is not cached.
+        """
+        if self.mode == "off":
+            return None
+
+        path = self._path(key)
+        exists = path.is_file()
+
+        if self.mode == "replay":
+            if not exists:
+                raise ResponseCacheMissError(f"Response not found in cache (replay mode): {key}")
+            return path
+
+        if not exists:
+            return None
+
+        mtime = path.stat().st_mtime
+        if self.is_closed_range(end, fetched=datetime.date.fromtimestamp(mtime)):
+            return path
+
+        age = time.time() - mtime
+        return path if age <= self.intraday_ttl else None
+
+    def iter_cached(self, path: Path, chunk_size: int = 65536) -> typing.Iterator[bytes]:
+        with open(path, "rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _open_entry(self, key: str) -> tuple[Path, Path, typing.BinaryIO]:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        return path, temp_path, open(temp_path, "wb")
+
+    @staticmethod
+    def _commit_entry(path: Path, temp_path: Path, file: typing.BinaryIO, is_list: bool) -> None:
+        file.close()
+        if is_list:
+            os.replace(temp_path, path)
+        else:
+            # Error payloads (JSON objects instead of lists) are never cached
+            temp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _discard_entry(temp_path: Path, file: typing.BinaryIO) -> None:
+        file.close()
+        temp_path.unlink(missing_ok=True)
+
+    def tee(self, key: str, chunks: typing.Iterable[bytes]) -> typing.Iterator[bytes]:
+        """
+        Yields the network chunks while writing them to the cache. The entry only becomes
+        visible once the body was fully received.
+        """
+        if self.mode == "off":
+            yield from chunks
+            return
+
+        path, temp_path, file = self._open_entry(key)
+        first = b""
+        try:
+            for chunk in chunks:
+                if not first:
+                    first = chunk.lstrip()[:1]
+                file.write(chunk)
+                yield chunk
+        except BaseException:
+            self._discard_entry(temp_path, file)
+            raise
+        self._commit_entry(path, temp_path, file, is_list=first == b"[")
+
+    async def tee_async(self, key: str, chunks: typing.AsyncIterable[bytes]) -> typing.AsyncIterator[bytes]:
+        """
+        Asyncio counterpart of tee.
+        """
+        if self.mode == "off":
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        path, temp_path, file = self._open_entry(key)
+        first = b""
+        try:
+            async for chunk in chunks:
+                if not first:
+                    first = chunk.lstrip()[:1]
+                file.write(chunk)
+                yield chunk
+        except BaseException:
+            self._discard_entry(temp_path, file)
+            raise
+        self._commit_entry(path, temp_path, file, is_list=first == b"[")
+
+#%%
+
+_cache_lock = threading.Lock()
+_cache: ResponseCache | None = None
+
+
+def configure_cache(
+    directory: str = DEFAULT_CACHE_DIR,
+    mode: str = "read_write",
+    intraday_ttl: float = DEFAULT_INTRADAY_TTL
+) -> ResponseCache:
+    """
+    Replaces the shared response cache with one using the given settings.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = ResponseCache(directory=directory, mode=mode, intraday_ttl=intraday_ttl)
+        logger.debug(f"Response cache in '{mode}' mode at {directory}")
+        return _cache
+
+
+def get_cache() -> ResponseCache:
+    """
+    Returns the shared response cache, creating it with default settings on first use.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
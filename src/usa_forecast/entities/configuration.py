@@ -5,6 +5,15 @@ import dataclasses
 
 VALID_SUMMARY_MODES = {"latest", "daily", "frequency", "custom"}
 VALID_SUMMARY_FREQUENCIES = {"weekly", "monthly", "quarterly", "semiannual", "annual"}
+VALID_DOWNLOAD_ENGINES = {"threads", "asyncio"}
+VALID_RESPONSE_CACHE_MODES = {"off", "read_write", "replay"}
+VALID_COMPUTE_ENGINES = {"pandas", "arrow", "panel"}
+VALID_LATEST_PRICE_SOURCES = {"quote", "1min"}
+VALID_STORAGE_FORMATS = {"csv", "parquet", "feather"}
+VALID_SUMMARY_STORAGES = {"dataset", "csv"}
+VALID_SUMMARY_PARTITIONS = {"year", "month"}
+VALID_PRECISIONS = {"float64", "float32"}
+VALID_STORAGE_COMPRESSIONS = {"zstd", "lz4", "none"}
 
 @dataclasses.dataclass(frozen=True, slots=True)
 class Configuration:
@@ -21,6 +30,34 @@ class Configuration:
     summary_frequency: str
     summary_start_date: datetime.date
     summary_end_date: datetime.date
+    http_pool_size: int = 16
+    http_max_per_host: int = 8
+    download_engine: str = "threads"
+    download_concurrency: int = 8
+    request_timeout: float = 30.0
+    incremental_download: str = "True"
+    response_cache_mode: str = "read_write"
+    intraday_cache_ttl: float = 60.0
+    rate_limit_per_minute: float = 300.0
+    max_retries: int = 3
+    compute_engine: str = "pandas"
+    latest_price_source: str = "1min"
+    quote_batch_size: int = 100
+    fmp_base_url: str = "https://financialmodelingprep.com"
+    chunk_years: int = 0
+    daily_call_budget: int = 0
+    storage_format: str = "parquet"
+    panel_store: str = "False"
+    summary_storage: str = "dataset"
+    summary_partition: str = "year"
+    background_writes: str = "True"
+    precision: str = "float64"
+    storage_compression: str = "zstd"
+    sql_store: str = "False"
+    lazy_targets: str = "False"
+    warm_restart: str = "True"
+    compaction_days: int = 0
+    retention_days: int = 0
 
     def __post_init__(self):
         if (
@@ -68,3 +105,108 @@ class Configuration:
             raise ConfigurationError(
                 f"Invalid Configuration.summary_mode. Expected one of: {', '.join(VALID_SUMMARY_MODES)}"
             )
+
+        if not isinstance(self.http_pool_size, int) or self.http_pool_size <= 0:
+            raise ConfigurationError("Configuration.http_pool_size must be a positive integer.")
+
+        if not isinstance(self.http_max_per_host, int) or self.http_max_per_host <= 0:
+            raise ConfigurationError("Configuration.http_max_per_host must be a positive integer.")
+
+        if not isinstance(self.download_engine, str) or self.download_engine.lower() not in VALID_DOWNLOAD_ENGINES:
+            raise ConfigurationError(
+                f"Invalid Configuration.download_engine. Expected one of: {', '.join(VALID_DOWNLOAD_ENGINES)}"
+            )
+
+        if not isinstance(self.download_concurrency, int) or self.download_concurrency <= 0:
+            raise ConfigurationError("Configuration.download_concurrency must be a positive integer.")
+
+        if not isinstance(self.request_timeout, (int, float)) or self.request_timeout <= 0:
+            raise ConfigurationError("Configuration.request_timeout must be a positive number of seconds.")
+
+        if not isinstance(self.incremental_download, str) or self.incremental_download not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.incremental_download: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.response_cache_mode, str) or self.response_cache_mode not in VALID_RESPONSE_CACHE_MODES:
+            raise ConfigurationError(
+                f"Invalid Configuration.response_cache_mode. Expected one of: {', '.join(VALID_RESPONSE_CACHE_MODES)}"
+            )
+
+        if not isinstance(self.intraday_cache_ttl, (int, float)) or self.intraday_cache_ttl < 0:
+            raise ConfigurationError("Configuration.intraday_cache_ttl must be a non-negative number of seconds.")
+
+        if not isinstance(self.rate_limit_per_minute, (int, float)) or self.rate_limit_per_minute < 0:
+            raise ConfigurationError("Configuration.rate_limit_per_minute must be a non-negative number (0 disables it).")
+
+        if not isinstance(self.max_retries, int) or self.max_retries < 0:
+            raise ConfigurationError("Configuration.max_retries must be a non-negative integer.")
+
+        if not isinstance(self.compute_engine, str) or self.compute_engine.lower() not in VALID_COMPUTE_ENGINES:
+            raise ConfigurationError(
+                f"Invalid Configuration.compute_engine. Expected one of: {', '.join(VALID_COMPUTE_ENGINES)}"
+            )
+
+        if (
+            not isinstance(self.latest_price_source, str)
+            or self.latest_price_source.lower() not in VALID_LATEST_PRICE_SOURCES
+        ):
+            raise ConfigurationError(
+                f"Invalid Configuration.latest_price_source. Expected one of: {', '.join(VALID_LATEST_PRICE_SOURCES)}"
+            )
+
+        if not isinstance(self.quote_batch_size, int) or self.quote_batch_size <= 0:
+            raise ConfigurationError("Configuration.quote_batch_size must be a positive integer.")
+
+        if not isinstance(self.fmp_base_url, str) or not self.fmp_base_url.startswith(("http://", "https://")):
+            raise ConfigurationError("Configuration.fmp_base_url must be an http:// or https:// URL.")
+
+        if not isinstance(self.chunk_years, int) or self.chunk_years < 0:
+            raise ConfigurationError("Configuration.chunk_years must be a non-negative integer (0 disables it).")
+
+        if not isinstance(self.daily_call_budget, int) or self.daily_call_budget < 0:
+            raise ConfigurationError("Configuration.daily_call_budget must be a non-negative integer (0 disables it).")
+
+        if not isinstance(self.storage_format, str) or self.storage_format.lower() not in VALID_STORAGE_FORMATS:
+            raise ConfigurationError(
+                f"Invalid Configuration.storage_format. Expected one of: {', '.join(VALID_STORAGE_FORMATS)}"
+            )
+
+        if not isinstance(self.panel_store, str) or self.panel_store not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.panel_store: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.summary_storage, str) or self.summary_storage.lower() not in VALID_SUMMARY_STORAGES:
+            raise ConfigurationError(
+                f"Invalid Configuration.summary_storage. Expected one of: {', '.join(VALID_SUMMARY_STORAGES)}"
+            )
+
+        if not isinstance(self.summary_partition, str) or self.summary_partition.lower() not in VALID_SUMMARY_PARTITIONS:
+            raise ConfigurationError(
+                f"Invalid Configuration.summary_partition. Expected one of: {', '.join(VALID_SUMMARY_PARTITIONS)}"
+            )
+
+        if not isinstance(self.background_writes, str) or self.background_writes not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.background_writes: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.precision, str) or self.precision.lower() not in VALID_PRECISIONS:
+            raise ConfigurationError(
+                f"Invalid Configuration.precision. Expected one of: {', '.join(VALID_PRECISIONS)}"
+            )
+
+        if not isinstance(self.storage_compression, str) or self.storage_compression.lower() not in VALID_STORAGE_COMPRESSIONS:
+            raise ConfigurationError(
+                f"Invalid Configuration.storage_compression. Expected one of: {', '.join(VALID_STORAGE_COMPRESSIONS)}"
+            )
+
+        if not isinstance(self.sql_store, str) or self.sql_store not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.sql_store: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.lazy_targets, str) or self.lazy_targets not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.lazy_targets: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.warm_restart, str) or self.warm_restart not in {"True", "False"}:
+            raise ConfigurationError("Incorrect Configuration.warm_restart: expecting a string 'True' or 'False'")
+
+        if not isinstance(self.compaction_days, int) or self.compaction_days < 0:
+            raise ConfigurationError("Configuration.compaction_days must be a non-negative integer (0 disables it).")
+
+        if not isinstance(self.retention_days, int) or self.retention_days < 0:
+            raise ConfigurationError("Configuration.retention_days must be a non-negative integer (0 disables it).")
@@ -13,6 +13,18 @@ class InjectedDependencyError(ExplanatoryDataAnalysisError):
 class MissingCSVReadError(ExplanatoryDataAnalysisError):
     pass
 
+
+class ResponseCacheMissError(ExplanatoryDataAnalysisError):
+    pass
+
+
+class CallBudgetExceededError(ExplanatoryDataAnalysisError):
+    pass
+
+
+class BackgroundWriteError(ExplanatoryDataAnalysisError):
+    pass
+
 class ConfigurationError(Exception):
     pass
 
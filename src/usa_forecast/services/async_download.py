@@ -0,0 +1,436 @@
+#Modules
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download.async_http import AsyncHTTPClient
+from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.services import incremental_update as iu
+from src.usa_forecast.services import download_scheduler as ds
+
+#Libraries
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+import typing
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+async def run_ticker_tasks(
+    task_factory: typing.Callable[[AsyncHTTPClient, str], typing.Awaitable[typing.Any]],
+    tickers: typing.Iterable[str],
+    concurrency: int,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+    max_retries: int = 0,
+    scheduler: ds.DownloadScheduler | None = None
+) -> dict[str, typing.Any]:
+    """
+    Runs one coroutine per ticker with bounded concurrency, retrying failed tickers with
+    jittered backoff.
+
+    With a scheduler, ``concurrency`` workers take the tickers from it, highest priority
+    first, so a ticker bumped from the dashboard starts as soon as a worker is free.
+
+    The timeout applies to each connect and read of a request rather than to the whole
+    ticker, so time spent queued in the shared rate limiter does not count against it.
+
+    Parameters
+    ----------
+    task_factory : Callable[[AsyncHTTPClient, str], Awaitable]
+        Builds the coroutine for a ticker from the shared client and the ticker symbol.
+    tickers : Iterable[str]
+        Tickers to process.
+    concurrency : int
+        Maximum number of tickers in flight at once.
+    timeout : float
+        Seconds allowed per connect or read before the request is abandoned.
+    cancel_event : threading.Event, optional
+        When set from another thread, every pending ticker is cancelled.
+    max_retries : int
+        Retries per ticker on throttling, server, timeout and network errors.
+    scheduler : DownloadScheduler, optional
+        Queue already holding ``tickers``. Their fetch latencies are recorded into it.
+
+    Returns
+    -------
+    dict[str, Any]
+        Result per ticker, None for tickers that failed after every retry or were cancelled.
+    """
+    tickers = list(tickers)
+    client = AsyncHTTPClient(max_per_host=concurrency, timeout=timeout)
+    slots = asyncio.Semaphore(concurrency)
+    results: dict[str, typing.Any] = {}
+
+    async def run_one(ticker: str) -> None:
+        start = time.perf_counter()
+        try:
+            results[ticker] = await rl.call_with_retries_async(
+                lambda: task_factory(client, ticker),
+                max_retries=max_retries,
+                description=ticker
+            )
+            if scheduler is not None:
+                scheduler.record_latency(ticker, time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout processing ticker {ticker} after {timeout}s")
+            results[ticker] = None
+        except Exception as e:
+            logger.warning(f"Error processing ticker {ticker}: {e}")
+            results[ticker] = None
+
+    async def run_limited(ticker: str) -> None:
+        async with slots:
+            await run_one(ticker)
+
+    async def run_scheduled() -> None:
+        while (ticker := scheduler.pop()) is not None:
+            await run_one(ticker)
+
+    if scheduler is None:
+        tasks = [asyncio.create_task(run_limited(ticker)) for ticker in tickers]
+    else:
+        tasks = [asyncio.create_task(run_scheduled()) for _ in range(max(1, min(concurrency, len(tickers))))]
+
+    async def watch_cancel() -> None:
+        while not cancel_event.is_set():
+            await asyncio.sleep(0.1)
+        logger.warning("Download cancelled, dropping pending tickers.")
+        for task in tasks:
+            task.cancel()
+
+    watcher = asyncio.create_task(watch_cancel()) if cancel_event is not None else None
+
+    try:
+        with scheduler if scheduler is not None else contextlib.nullcontext():
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        for task in tasks:
+            task.cancel()
+        await client.aclose()
+
+    # Cancelled tickers never stored a result
+    for ticker in tickers:
+        results.setdefault(ticker, None)
+
+    failed = [ticker for ticker in tickers if results[ticker] is None]
+    if failed:
+        logger.warning(f"{len(failed)} tickers failed after {max_retries} retries: {', '.join(failed)}")
+
+    return results
+
+async def process_ticker_async(
+    client: AsyncHTTPClient,
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    fmp_api_key: str,
+    window_shift: tuple[int, ...],
+    compute_engine: str = "pandas",
+    chunk_years: int = 0,
+    max_retries: int = 0
+) -> pd.DataFrame | pa.Table:
+    """
+    Asyncio counterpart of usa_forecast_code.process_ticker: downloads the ticker, in date
+    chunks retried on their own, and adds the lag and 52-week low columns. Errors propagate
+    to run_ticker_tasks.
+    """
+    if compute_engine == "arrow":
+        table = await fmd.fetch_eod_history_async(
+            client=client,
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            api_key=fmp_api_key,
+            chunk_years=chunk_years,
+            max_retries=max_retries,
+            as_arrow=True
+        )
+        table = la.add_lagged_return_columns_arrow(table=table, column="close", lags=window_shift)
+        table = pc.add_52_week_low_column_arrow(table=table, low_column="low", output_column="52_week_low")
+        logger.info(f"Done for {ticker}")
+        return table
+
+    data = await fmd.fetch_eod_history_async(
+        client=client,
+        ticker=ticker,
+        start_date=start_date,
+        end_date=end_date,
+        api_key=fmp_api_key,
+        chunk_years=chunk_years,
+        max_retries=max_retries
+    )
+
+    df_lagged = la.add_lagged_return_columns(
+        df=data,
+        column="close",
+        lags=window_shift
+    )
+
+    df_final = pc.add_52_week_low_column(
+        df=df_lagged,
+        column="low",
+        window_days=252,
+        output_column="52_week_low"
+    )
+
+    logger.info(f"Done for {ticker}")
+    return df_final
+
+async def process_ticker_delta_async(
+    client: AsyncHTTPClient,
+    ticker: str,
+    cached: pd.DataFrame,
+    end_date: str,
+    fmp_api_key: str,
+    window_shift: tuple[int, ...]
+) -> pd.DataFrame:
+    """
+    Asyncio counterpart of usa_forecast_code.process_ticker_delta.
+    """
+    new_data = await fmd.fetch_eod_price_data_async(
+        client=client,
+        ticker=ticker,
+        start_date=iu.delta_start_date(cached),
+        end_date=end_date,
+        api_key=fmp_api_key
+    )
+
+    df_final = iu.append_delta(cached=cached, new_data=new_data, window_shift=window_shift)
+
+    logger.info(f"Done for {ticker} (+{len(df_final) - len(cached)} rows)")
+    return df_final
+
+def download_tickers(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    fmp_api_key: str,
+    window_shift: tuple[int, ...],
+    concurrency: int,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+    max_retries: int = 0,
+    compute_engine: str = "pandas",
+    chunk_years: int = 0
+) -> dict[str, pd.DataFrame | pa.Table | None]:
+    """
+    Downloads and enriches every ticker on an event loop, with the same per-ticker result
+    contract as process_ticker: the enriched DataFrame, or None when the ticker failed.
+
+    Parameters
+    ----------
+    tickers : list[str]
+        Tickers to download.
+    start_date : str
+        Start date in 'YYYY-MM-DD' format.
+    end_date : str
+        End date in 'YYYY-MM-DD' format.
+    fmp_api_key : str
+        Financial Modeling Prep API key.
+    window_shift : tuple[int, ...]
+        Lags to compute.
+    concurrency : int
+        Maximum number of requests in flight.
+    timeout : float
+        Seconds allowed per connect or read.
+    cancel_event : threading.Event, optional
+        Event that cancels the pending downloads when set.
+    max_retries : int
+        Retries per failed date chunk.
+    compute_engine : str
+        'pandas', or 'arrow' to return Arrow tables.
+    chunk_years : int
+        Years per concurrently downloaded date chunk, 0 for a single request.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame | pa.Table | None]
+        Enriched DataFrame (or table) per ticker.
+    """
+    def task_factory(client: AsyncHTTPClient, ticker: str):
+        return process_ticker_async(
+            client=client,
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            fmp_api_key=fmp_api_key,
+            window_shift=window_shift,
+            compute_engine=compute_engine,
+            chunk_years=chunk_years,
+            max_retries=max_retries
+        )
+
+    return asyncio.run(run_ticker_tasks(
+        task_factory=task_factory,
+        tickers=tickers,
+        concurrency=concurrency,
+        timeout=timeout,
+        cancel_event=cancel_event
+    ))
+
+def download_deltas(
+    cached_data: dict[str, pd.DataFrame],
+    end_date: str,
+    fmp_api_key: str,
+    window_shift: tuple[int, ...],
+    concurrency: int,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+    max_retries: int = 0
+) -> dict[str, pd.DataFrame | None]:
+    """
+    Downloads only the missing tail of every cached ticker on an event loop.
+
+    Parameters
+    ----------
+    cached_data : dict[str, pd.DataFrame]
+        Cached, already enriched data per ticker.
+    end_date : str
+        End date in 'YYYY-MM-DD' format.
+    fmp_api_key : str
+        Financial Modeling Prep API key.
+    window_shift : tuple[int, ...]
+        Lags to compute.
+    concurrency : int
+        Maximum number of requests in flight.
+    timeout : float
+        Seconds allowed per connect or read.
+    cancel_event : threading.Event, optional
+        Event that cancels the pending downloads when set.
+    max_retries : int
+        Retries per failed ticker.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame | None]
+        Extended DataFrame per ticker, None when the ticker failed.
+    """
+    def task_factory(client: AsyncHTTPClient, ticker: str):
+        return process_ticker_delta_async(
+            client=client,
+            ticker=ticker,
+            cached=cached_data[ticker],
+            end_date=end_date,
+            fmp_api_key=fmp_api_key,
+            window_shift=window_shift
+        )
+
+    return asyncio.run(run_ticker_tasks(
+        task_factory=task_factory,
+        tickers=list(cached_data.keys()),
+        concurrency=concurrency,
+        timeout=timeout,
+        cancel_event=cancel_event,
+        max_retries=max_retries
+    ))
+
+def download_scheduled(
+    scheduler: ds.DownloadScheduler,
+    tickers: list[str],
+    cached_data: dict[str, pd.DataFrame],
+    start_date: str,
+    end_date: str,
+    fmp_api_key: str,
+    window_shift: tuple[int, ...],
+    concurrency: int,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+    max_retries: int = 0,
+    compute_engine: str = "pandas",
+    chunk_years: int = 0
+) -> dict[str, pd.DataFrame | pa.Table | None]:
+    """
+    Runs the full downloads and the deltas of one refresh on a single event loop, in the
+    order given by ``scheduler``. Tickers in ``cached_data`` only download their missing
+    tail, like download_deltas; the rest are downloaded like download_tickers.
+
+    Parameters
+    ----------
+    scheduler : DownloadScheduler
+        Queue already holding ``tickers`` and the keys of ``cached_data``.
+    tickers : list[str]
+        Tickers to download in full.
+    cached_data : dict[str, pd.DataFrame]
+        Cached, already enriched data of the tickers to extend.
+    start_date, end_date, fmp_api_key, window_shift, concurrency, timeout, cancel_event,
+    max_retries, compute_engine, chunk_years
+        As in download_tickers.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame | pa.Table | None]
+        Result per ticker, None when the ticker failed.
+    """
+    def task_factory(client: AsyncHTTPClient, ticker: str):
+        if ticker in cached_data:
+            return rl.call_with_retries_async(
+                lambda: process_ticker_delta_async(
+                    client=client,
+                    ticker=ticker,
+                    cached=cached_data[ticker],
+                    end_date=end_date,
+                    fmp_api_key=fmp_api_key,
+                    window_shift=window_shift
+                ),
+                max_retries=max_retries,
+                description=ticker
+            )
+        return process_ticker_async(
+            client=client,
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            fmp_api_key=fmp_api_key,
+            window_shift=window_shift,
+            compute_engine=compute_engine,
+            chunk_years=chunk_years,
+            max_retries=max_retries
+        )
+
+    return asyncio.run(run_ticker_tasks(
+        task_factory=task_factory,
+        tickers=list(tickers) + list(cached_data.keys()),
+        concurrency=concurrency,
+        timeout=timeout,
+        cancel_event=cancel_event,
+        scheduler=scheduler
+    ))
+
+def fetch_latest_bars(
+    tickers: list[str],
+    api_key: str,
+    concurrency: int,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+    max_retries: int = 0,
+    scheduler: ds.DownloadScheduler | None = None
+) -> dict[str, pd.DataFrame | None]:
+    """
+    Fetches the latest 1-minute bar of every ticker on an event loop, in the order of
+    ``scheduler`` when one is given.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame | None]
+        Single-row DataFrame per ticker, None when the ticker failed.
+    """
+    def task_factory(client: AsyncHTTPClient, ticker: str):
+        return fmd.fetch_eod_last_1m_price_data_async(client=client, ticker=ticker, api_key=api_key)
+
+    return asyncio.run(run_ticker_tasks(
+        task_factory=task_factory,
+        tickers=tickers,
+        concurrency=concurrency,
+        timeout=timeout,
+        cancel_event=cancel_event,
+        max_retries=max_retries,
+        scheduler=scheduler
+    ))
@@ -0,0 +1,244 @@
+#Libraries
+import collections
+import datetime
+import heapq
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_LATENCY_PATH = "Output/Cache/fetch_latency.json"
+
+# Priority given to a ticker bumped from the dashboard
+BUMP_PRIORITY = 100
+
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.3
+
+# Dashboard selections remembered for the next runs
+MAX_REQUESTED = 20
+
+_registry_lock = threading.Lock()
+_active_schedulers: set["DownloadScheduler"] = set()
+_requested: collections.OrderedDict[str, int] = collections.OrderedDict()
+
+
+def staleness_days(last_date: typing.Any, today: datetime.date | None = None) -> float:
+    """
+    Days between the last cached bar and today, infinite when there is no cached data.
+    """
+    if last_date is None:
+        return float("inf")
+    today = today or datetime.date.today()
+    return float((today - pd.Timestamp(last_date).date()).days)
+
+
+class DownloadScheduler:
+    """
+    Thread-safe priority queue deciding which ticker is downloaded next.
+
+    Tickers are served by explicit priority first (dashboard bumps), then by staleness
+    (days since the last cached bar, never-downloaded tickers first), then by historical
+    fetch latency, slowest first so long downloads do not end up as the tail of the run,
+    and finally in submission order. ``bump`` can move a queued ticker to the front from
+    any thread while workers are popping.
+    """
+
+    def __init__(self, latency_path: str | None = DEFAULT_LATENCY_PATH):
+        """
+        Parameters
+        ----------
+        latency_path : str, optional
+            JSON file where the per-ticker fetch latencies are persisted, None keeps them in memory.
+        """
+        self.latency_path = Path(latency_path) if latency_path else None
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, float, float, int, str]] = []
+        self._entries: dict[str, tuple[float, float, float, int, str]] = {}
+        self._counter = itertools.count()
+        self._latencies: dict[str, float] = self._load_latencies()
+
+    def _load_latencies(self) -> dict[str, float]:
+        if self.latency_path is None or not self.latency_path.is_file():
+            return {}
+        try:
+            with open(self.latency_path, "r", encoding="utf-8") as file:
+                return {ticker: float(value) for ticker, value in json.load(file).items()}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring fetch latency file {self.latency_path}: {e}")
+            return {}
+
+    def save_latencies(self) -> None:
+        if self.latency_path is None:
+            return
+        self.latency_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            latencies = dict(self._latencies)
+        with open(self.latency_path, "w", encoding="utf-8") as file:
+            json.dump(latencies, file, indent=0, sort_keys=True)
+
+    def record_latency(self, ticker: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._latencies.get(ticker)
+            self._latencies[ticker] = (
+                seconds if previous is None else LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * previous
+            )
+
+    def _push_locked(self, ticker: str, priority: int, staleness: float) -> None:
+        entry = (-priority, -staleness, -self._latencies.get(ticker, 0.0), next(self._counter), ticker)
+        self._entries[ticker] = entry
+        heapq.heappush(self._heap, entry)
+
+    def push(self, ticker: str, staleness: float = float("inf"), priority: int = 0) -> None:
+        """
+        Queues a ticker.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker symbol.
+        staleness : float
+            Days since the last cached bar (see staleness_days).
+        priority : int
+            Explicit priority, higher first. Tickers selected in the dashboard get BUMP_PRIORITY.
+        """
+        with _registry_lock:
+            priority = max(priority, _requested.get(ticker, 0))
+        with self._lock:
+            self._push_locked(ticker, priority, staleness)
+
+    def bump(self, ticker: str, priority: int = BUMP_PRIORITY) -> bool:
+        """
+        Raises the priority of a queued ticker. Returns False if it is not queued.
+        """
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or -entry[0] >= priority:
+                return entry is not None
+            # The old heap entry is left behind and skipped by pop
+            self._push_locked(ticker, priority, -entry[1])
+            return True
+
+    def pop(self) -> str | None:
+        """
+        Removes and returns the next ticker to download, None when the queue is empty.
+        """
+        with self._lock:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                ticker = entry[-1]
+                if self._entries.get(ticker) is entry:
+                    del self._entries[ticker]
+                    return ticker
+            return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __enter__(self) -> "DownloadScheduler":
+        with _registry_lock:
+            _active_schedulers.add(self)
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        with _registry_lock:
+            _active_schedulers.discard(self)
+        try:
+            self.save_latencies()
+        except OSError as e:
+            logger.warning(f"Could not save fetch latencies: {e}")
+
+#%%
+
+def bump_ticker(ticker: str, priority: int = BUMP_PRIORITY) -> None:
+    """
+    Hook for the dashboard: moves ``ticker`` to the front of every running download and
+    remembers it so the next runs also start with it.
+    """
+    with _registry_lock:
+        _requested[ticker] = priority
+        _requested.move_to_end(ticker)
+        while len(_requested) > MAX_REQUESTED:
+            _requested.popitem(last=False)
+        schedulers = list(_active_schedulers)
+
+    for scheduler in schedulers:
+        if scheduler.bump(ticker, priority):
+            logger.info(f"[{ticker}] Moved to the front of the download queue.")
+
+
+def requested_tickers() -> list[str]:
+    """
+    Tickers recently selected in the dashboard, most recent first.
+    """
+    with _registry_lock:
+        return list(reversed(_requested))
+
+
+def prioritized(tickers: typing.Iterable[str]) -> list[str]:
+    """
+    Orders tickers with the dashboard selections first, most recent first, then the rest
+    in their original order. Used where work is batched instead of queued.
+    """
+    tickers = list(tickers)
+    rank = {ticker: i for i, ticker in enumerate(requested_tickers())}
+    return sorted(tickers, key=lambda ticker: rank.get(ticker, len(rank)))
+
+
+def run_threaded(
+    scheduler: DownloadScheduler,
+    func: typing.Callable[[str], typing.Any],
+    max_workers: int
+) -> typing.Iterator[tuple[str, typing.Any]]:
+    """
+    Runs ``func`` for every queued ticker on ``max_workers`` threads, always taking the
+    highest priority ticker next, and yields (ticker, result) as they complete.
+    The fetch latency of each ticker is recorded and persisted at the end.
+
+    Parameters
+    ----------
+    scheduler : DownloadScheduler
+        Queue with the tickers to process.
+    func : Callable[[str], Any]
+        Work for one ticker. Exceptions are logged and yield None.
+    max_workers : int
+        Number of worker threads.
+    """
+    done: queue.Queue = queue.Queue()
+
+    def worker() -> None:
+        while (ticker := scheduler.pop()) is not None:
+            start = time.perf_counter()
+            try:
+                result = func(ticker)
+                scheduler.record_latency(ticker, time.perf_counter() - start)
+            except Exception as e:
+                logger.warning(f"Error processing ticker {ticker}: {e}")
+                result = None
+            done.put((ticker, result))
+        done.put(None)
+
+    workers = max(1, min(max_workers, len(scheduler)))
+    with scheduler, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as executor:
+        for _ in range(workers):
+            executor.submit(worker)
+
+        finished = 0
+        while finished < workers:
+            item = done.get()
+            if item is None:
+                finished += 1
+                continue
+            yield item
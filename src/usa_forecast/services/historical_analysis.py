@@ -1,3 +1,6 @@
+#Modules
+from src.usa_forecast.calculations import lazy_targets as lt
+
 #Libraries
 import pandas as pd
 
@@ -81,8 +84,15 @@ def extract_snapshot(
     """
     snapshot = {}
 
-    for ticker, df in data_dict.items():
-        if snapshot_date in df.index:
+    # Con resultados perezosos sólo se calcula la fila pedida
+    items = data_dict.frames.items() if isinstance(data_dict, lt.LazyResults) else data_dict.items()
+
+    for ticker, df in items:
+        if isinstance(df, lt.LazyTargetFrame):
+            row = df.snapshot(snapshot_date)
+            if row is not None:
+                snapshot[ticker] = row
+        elif snapshot_date in df.index:
             snapshot[ticker] = df.loc[[snapshot_date]]
         else:
             valid_dates = df.index[df.index <= snapshot_date]
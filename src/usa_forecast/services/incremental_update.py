@@ -0,0 +1,127 @@
+#Modules
+from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.storage import ticker_store as ts
+
+#Libraries
+import logging
+import pandas as pd
+from datetime import date
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+def load_cached_for_delta(
+    ticker: str,
+    start_date: date,
+    lags: tuple[int, ...]
+) -> pd.DataFrame | None:
+    """
+    Loads the stored data of a ticker if it can be extended with a delta download.
+
+    The file is usable when it starts on or before ``start_date`` and already has the lag
+    and 52-week low columns, so only the missing tail needs to be fetched. This is checked
+    on the store manifest first, so unusable files are never read.
+
+    Parameters
+    ----------
+    ticker : str
+        Ticker symbol, looked up in the shared ticker store.
+    start_date : date
+        Required start date for the analysis.
+    lags : tuple[int, ...]
+        Tuple of lag values (e.g., (5, 10, 15)).
+
+    Returns
+    -------
+    pd.DataFrame | None
+        The cached data, or None if there is no usable cache.
+    """
+    store = ts.get_store()
+    required_columns = {f"P{lag}" for lag in lags} | {"52_week_low"}
+
+    try:
+        coverage = store.read_coverage(ticker)
+        if coverage is None:
+            return None
+
+        first_date, _, columns = coverage
+        if not required_columns.issubset(columns) or first_date.date() > pd.to_datetime(start_date).date():
+            return None
+
+        df = store.read(ticker)
+    except Exception as e:
+        logger.error(f"Error in {store.path(ticker)}: {e}")
+        return None
+
+    if df is None or df.empty:
+        return None
+
+    return df.sort_index()
+
+def delta_start_date(cached: pd.DataFrame) -> str:
+    """
+    Start of the delta download, in 'YYYY-MM-DD' format: the last cached date itself, so a
+    partial intraday bar stored by the latest price refresh is replaced by its final bar.
+    """
+    return cached.index.max().date().isoformat()
+
+def append_delta(
+    cached: pd.DataFrame,
+    new_data: pd.DataFrame,
+    window_shift: tuple[int, ...]
+) -> pd.DataFrame:
+    """
+    Merges freshly downloaded rows into the cached data and recomputes only the rows whose
+    lag and 52-week low windows include them.
+
+    Downloaded rows win over cached rows of the same date, so the bars of the overlap
+    (the last cached date onwards) overwrite what was stored for them.
+
+    Parameters
+    ----------
+    cached : pd.DataFrame
+        Cached, already enriched ticker data.
+    new_data : pd.DataFrame
+        Downloaded EOD rows from the last cached date on.
+    window_shift : tuple[int, ...]
+        Lags to compute.
+
+    Returns
+    -------
+    pd.DataFrame
+        Combined data with the downloaded rows enriched. The cached data itself when the
+        download holds nothing new.
+    """
+    if new_data.empty:
+        return cached
+
+    new_data = new_data.sort_index()
+    overlap = cached.reindex(index=new_data.index, columns=new_data.columns)
+    if overlap.astype("float64").equals(new_data.astype("float64")):
+        return cached
+
+    df = pd.concat([cached, new_data])
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    # Con precision float32 el cache trae columnas float32; el recálculo se hace en float64
+    df = df.astype({name: "float64" for name, dtype in df.dtypes.items() if dtype == "float32"})
+
+    tail_rows = int((df.index >= new_data.index.min()).sum())
+
+    df = la.add_lagged_return_columns(
+        df=df,
+        column="close",
+        lags=window_shift,
+        tail_rows=tail_rows
+    )
+
+    df = pc.add_52_week_low_column(
+        df=df,
+        column="low",
+        window_days=252,
+        output_column="52_week_low",
+        tail_rows=tail_rows
+    )
+
+    return df
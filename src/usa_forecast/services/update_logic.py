@@ -2,87 +2,262 @@
 import pandas as pd
 import logging
 from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download import call_ledger as cl
 from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.calculations import precision as pr
 from src.usa_forecast.services import historical_analysis as ha
 from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.services import async_download as ad
+from src.usa_forecast.services import download_scheduler as ds
+from src.usa_forecast.storage import ticker_store as ts
+from src.usa_forecast.storage import panel_store as ps
+from src.usa_forecast.storage import summary_store as ss
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import sql_store as sq
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.storage import output_archive as oa
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 logger = logging.getLogger('myAppLogger')
 
+def apply_latest_bar(
+    df: pd.DataFrame,
+    latest_minute: pd.DataFrame,
+    configuration
+) -> pd.DataFrame:
+    """
+    Appends (or replaces today's row with) the latest bar and recomputes the derived columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Daily data of the ticker.
+    latest_minute : pd.DataFrame
+        Single-row DataFrame with the latest bar.
+    configuration : Configuration
+        Loaded configuration entity.
+
+    Returns
+    -------
+    pd.DataFrame
+        Updated daily data with lags, 52-week low and price targets.
+    """
+    last_minute_date = latest_minute.index[-1].date()
+    df.index = pd.to_datetime(df.index)
+
+    if df.index[-1].date() == last_minute_date:
+        df = pd.concat([df.iloc[:-1], latest_minute])
+    else:
+        df = pd.concat([df, latest_minute])
+
+    df = df[~df.index.duplicated(keep="last")]
+    df = df.sort_index()
+
+    df = la.add_lagged_return_columns(
+        df=df,
+        column="close",
+        lags=configuration.window_shift
+    )
+
+    df = pc.add_52_week_low_column(
+        df=df,
+        column="low",
+        window_days=252,
+        output_column="52_week_low"
+    )
+
+    df = pc.calculate_price_targets(
+        df=df,
+        column="close",
+        lags=configuration.window_shift,
+        lookback=lt.LOOKBACK
+    )
+
+    return df
+
+def fetch_latest_quote_bars(
+    configuration,
+    tickers: list[str]
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetches the latest bar of every ticker through the batch quote endpoint,
+    ``quote_batch_size`` symbols per request.
+
+    Parameters
+    ----------
+    configuration : Configuration
+        Loaded configuration entity.
+    tickers : list[str]
+        Tickers to refresh.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Single-row DataFrame per ticker, tickers whose batch failed are missing.
+    """
+    batch_size = configuration.quote_batch_size
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    latest_bars: dict[str, pd.DataFrame] = {}
+
+    def fetch_batch(batch: list[str]) -> dict[str, pd.DataFrame]:
+        return rl.call_with_retries(
+            lambda: fmd.fetch_latest_quotes(tickers=batch, api_key=configuration.fmp_api_key),
+            max_retries=configuration.max_retries,
+            description=f"quotes {batch[0]}..{batch[-1]}"
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, min(configuration.download_concurrency, len(batches)))) as executor:
+        futures = {executor.submit(fetch_batch, batch): batch for batch in batches}
+
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                latest_bars.update(future.result())
+            except Exception as e:
+                logger.warning(f"Error fetching quotes for {', '.join(batch)}: {e}")
+
+    return latest_bars
+
+def fetch_latest_bars(
+    source: str,
+    tickers: list[str],
+    mkt_data: dict[str, pd.DataFrame],
+    configuration
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetches the latest bar of the given tickers from the configured source.
+
+    With 'quote' the bars come from the batch quote endpoint (see fetch_latest_quote_bars);
+    with '1min' from the latest bar of each ticker's 1-minute history, the most outdated
+    tickers first, on an event loop or a thread pool as per ``download_engine``.
+
+    Parameters
+    ----------
+    source : str
+        Latest price source, 'quote' or '1min'.
+    tickers : list[str]
+        Tickers to refresh.
+    mkt_data : dict[str, pd.DataFrame]
+        Current daily data by ticker, to order the 1-minute requests by staleness.
+    configuration : Configuration
+        Loaded configuration entity.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Single-row DataFrame per ticker, tickers that failed are missing.
+    """
+    if not tickers:
+        return {}
+
+    if source == "quote":
+        # Batches holding the tickers on screen go out first
+        return fetch_latest_quote_bars(configuration=configuration, tickers=ds.prioritized(tickers))
+
+    scheduler = ds.DownloadScheduler()
+    for ticker in tickers:
+        df = mkt_data[ticker]
+        scheduler.push(ticker, staleness=ds.staleness_days(df.index[-1]) if len(df) else float("inf"))
+
+    if configuration.download_engine.lower() == "asyncio":
+        latest_bars = ad.fetch_latest_bars(
+            tickers=tickers,
+            api_key=configuration.fmp_api_key,
+            concurrency=configuration.download_concurrency,
+            timeout=configuration.request_timeout,
+            max_retries=configuration.max_retries,
+            scheduler=scheduler
+        )
+    else:
+        def fetch_latest_minute(ticker: str) -> pd.DataFrame | None:
+            try:
+                return rl.call_with_retries(
+                    lambda: fmd.fetch_eod_last_1m_price_data(ticker=ticker, api_key=configuration.fmp_api_key),
+                    max_retries=configuration.max_retries,
+                    description=ticker
+                )
+            except Exception as e:
+                logger.warning(f"[{ticker}] Error fetching 1m data: {e}")
+                return None
+
+        latest_bars = dict(ds.run_threaded(
+            scheduler=scheduler,
+            func=fetch_latest_minute,
+            max_workers=configuration.download_concurrency
+        ))
+
+    return {ticker: bar for ticker, bar in latest_bars.items() if bar is not None}
+
 def update_with_latest_data(
     configuration,
     mkt_data: dict[str, pd.DataFrame]
 ) -> tuple[dict[str, pd.DataFrame], dict[str, pd.DataFrame]]:
     """
-    Updates the current market data with the latest 1-minute data (if available) for today's date.
+    Updates the current market data with the latest price (if available) for today's date.
+
+    With latest_price_source='quote' the prices come from the batch quote endpoint, a few
+    requests for all tickers; with '1min' the latest bar of each ticker's 1-minute history
+    is used.
+
+    With a daily call budget, only the tickers selected in the dashboard are refreshed when
+    the whole refresh does not fit in what is left of the day, and nothing once the
+    budget is nearly used up.
 
     Returns:
         final_dict: snapshots por fecha
         updated_results: data diaria actualizada por ticker
     """
+    # Las escrituras de la corrida anterior terminan antes de reescribir los mismos archivos
+    bw.flush()
+
     updated_results: dict[str, pd.DataFrame] = {}
 
-    def update_ticker(ticker: str, df: pd.DataFrame) -> tuple[str, pd.DataFrame | None]:
-        try:
-            latest_minute = fmd.fetch_eod_last_1m_price_data(
-                ticker=ticker,
-                api_key=configuration.fmp_api_key
-            )
-
-            last_minute_date = latest_minute.index[-1].date()
-            df.index = pd.to_datetime(df.index)
-
-            if df.index[-1].date() == last_minute_date:
-                df = pd.concat([df.iloc[:-1], latest_minute])
-            else:
-                df = pd.concat([df, latest_minute])
-
-            df = df[~df.index.duplicated(keep="last")]
-            df = df.sort_index()
-
-            df = la.add_lagged_return_columns(
-                df=df,
-                column="close",
-                lags=configuration.window_shift
-            )
-
-            df = pc.add_52_week_low_column(
-                df=df,
-                column="low",
-                window_days=252,
-                output_column="52_week_low"
-            )
-
-            df = pc.calculate_price_targets(
-                df=df,
-                column="close",
-                lags=configuration.window_shift,
-                lookback=100
-            )
-
-            df.to_csv(f"Output/Tickers/{ticker}.csv")
-            return ticker, df
+    source = configuration.latest_price_source.lower()
+    tickers = list(mkt_data.keys())
+    priority = [ticker for ticker in ds.requested_tickers() if ticker in mkt_data]
 
-        except Exception as e:
-            logger.warning(f"[{ticker}] Error updating with 1m data: {e}")
-            return ticker, df  # fallback con datos anteriores
+    def projected_calls(count: int) -> int:
+        return -(-count // configuration.quote_batch_size) if source == "quote" else count
 
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {
-            executor.submit(update_ticker, ticker, df): ticker
-            for ticker, df in mkt_data.items()
-        }
+    strategy = cl.get_ledger().plan(
+        projected_calls=projected_calls(len(tickers)),
+        priority_calls=projected_calls(len(priority)),
+        description="latest prices refresh"
+    )
+    if strategy == cl.STRATEGY_PRIORITY_ONLY:
+        tickers = priority
+    elif strategy == cl.STRATEGY_CACHE_ONLY:
+        tickers = []
 
-        for future in as_completed(futures):
-            ticker, updated_df = future.result()
+    latest_bars = fetch_latest_bars(source=source, tickers=tickers, mkt_data=mkt_data, configuration=configuration)
+
+    for ticker, df in mkt_data.items():
+        latest_minute = latest_bars.get(ticker)
+        if latest_minute is None:
+            updated_results[ticker] = df  # fallback con datos anteriores
+            continue
+        try:
+            updated_df = apply_latest_bar(df=df, latest_minute=latest_minute, configuration=configuration)
+            bw.get_writer().submit(ticker, ts.get_store().write, ticker, updated_df)
             updated_results[ticker] = updated_df
+        except Exception as e:
+            logger.warning(f"[{ticker}] Error updating with latest data: {e}")
+            updated_results[ticker] = df
+
+    cl.get_ledger().save()
+    bw.get_writer().submit("ticker manifest", ts.get_store().save_manifest)
 
     final_results = pc.process_all_tickers(
         data_dict=updated_results,
         column="close",
         lags=configuration.window_shift,
-        lookback=100
+        lookback=lt.LOOKBACK,
+        compute_engine=configuration.compute_engine.lower(),
+        lazy=configuration.lazy_targets == "True"
     )
+    final_results = pr.compact_results(final_results, precision=configuration.precision.lower())
 
     all_dates = final_results[next(iter(final_results))].index
     dates_to_process = ha.generate_summary_dates(all_dates=all_dates, configuration=configuration)
@@ -92,15 +267,30 @@ def update_with_latest_data(
     for date in dates_to_process:
         snapshot = ha.extract_snapshot(data_dict=final_results, snapshot_date=date)
         summary = pc.build_summary_dataframe(data_dict=snapshot)
-        summary.to_csv(f"Output/Historical_Summaries/{date.date()}.csv")
         final_dict[date.date()] = summary
 
+    if configuration.summary_storage.lower() == "dataset":
+        # Sólo se reescriben las particiones que cambiaron
+        ss.get_summary_store().write(final_dict)
+    else:
+        bw.get_writer().submit("summary files", oa.get_summary_archive().write, dict(final_dict))
+
     latest_date = max(df.index.max() for df in final_results.values())
     latest_snapshot = ha.extract_snapshot(data_dict=final_results, snapshot_date=latest_date)
     latest_summary_df = pc.build_summary_dataframe(data_dict=latest_snapshot)
-    latest_summary_df.to_csv("Output/summary_latest.csv")
+    bw.get_writer().submit("Output/summary_latest.csv", of.write_csv, "Output/summary_latest.csv", latest_summary_df)
     final_dict[latest_date.date()] = latest_summary_df
 
+    if configuration.panel_store == "True":
+        bw.get_writer().submit("panel", ps.write_panel, final_results)
+
+    sql_store = sq.get_sql_store()
+    if sql_store is not None:
+        bw.get_writer().submit("sql store", sql_store.write_results, final_results)
+        bw.get_writer().submit("sql summaries", sql_store.write_summaries, final_dict)
+
+    bw.get_writer().submit("output manifest", of.get_outputs().save)
+
     logger.info("Latest market data and summaries updated.")
 
     return final_dict, updated_results
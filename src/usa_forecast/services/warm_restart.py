@@ -0,0 +1,243 @@
+#Modules
+from src.usa_forecast import usa_forecast_code as fc
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.storage import ticker_store as ts
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.entities.configuration import Configuration
+
+#Libraries
+import dataclasses
+import datetime
+import hashlib
+import json
+import logging
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+# Bumped whenever the snapshot layout or the meaning of its contents changes
+SNAPSHOT_VERSION = 1
+
+DEFAULT_STATE_DIR = "Output/Cache/warm_state"
+STATE_FILE = "state.json"
+
+
+def inputs_hash(configuration: Configuration) -> str | None:
+    """
+    Hash of everything the computed state depends on: the configuration, the target
+    lookback and, for every ticker, the manifest entry of its stored file (content hash,
+    delta segments, rows and dates). Only answered from the store manifest, without
+    reading the data.
+
+    Returns
+    -------
+    str | None
+        None when some ticker is not stored up to the configured dates, so ``main`` would
+        download it and no snapshot can stand in for the run.
+    """
+    store = ts.get_store()
+    tickers = {}
+    for ticker in configuration.tickers:
+        if not fc.is_data_up_to_date(
+            ticker=ticker,
+            start_date=pd.Timestamp(configuration.start_date),
+            end_date=pd.Timestamp(configuration.end_date),
+            lags=configuration.window_shift,
+            stay_update=configuration.stay_update
+        ):
+            return None
+        entry = store.describe(ticker)
+        tickers[ticker] = [entry.content_hash, entry.segments, entry.rows, entry.first_date, entry.last_date]
+
+    raw = {
+        "version": SNAPSHOT_VERSION,
+        "configuration": dataclasses.asdict(configuration),
+        "storage_format": store.storage_format,
+        "lookback": lt.LOOKBACK,
+        "tickers": tickers,
+    }
+    return hashlib.sha256(json.dumps(raw, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _encode_key(key) -> list[str]:
+    if isinstance(key, pd.Timestamp):
+        return ["timestamp", key.isoformat()]
+    if isinstance(key, datetime.date):
+        return ["date", key.isoformat()]
+    return ["str", str(key)]
+
+
+def _decode_key(kind: str, value: str):
+    if kind == "timestamp":
+        return pd.Timestamp(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+def _frame_bytes(df: pd.DataFrame) -> pa.Buffer:
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def save_state(
+    configuration: Configuration,
+    state: dict[str, dict],
+    directory: str = DEFAULT_STATE_DIR
+) -> bool:
+    """
+    Persists the computed state of the process so the next start with the same inputs can
+    load it instead of recomputing it.
+
+    Each group (``final_dict``, ``mkt_data``, ...) goes to one uncompressed Arrow IPC file
+    holding a stream per DataFrame; ``state.json`` records the inputs hash and where each
+    DataFrame starts. The state file is replaced last, so an interrupted save leaves the
+    previous snapshot in use. Of lazy results only the stored columns are saved.
+
+    Must run after the writes of the run (for example on the background writer): the
+    inputs hash is taken from the ticker files as they are then.
+
+    Parameters
+    ----------
+    configuration : Configuration
+        Configuration the state was computed with.
+    state : dict[str, dict]
+        DataFrames keyed by date, timestamp or ticker, per group name.
+    directory : str
+        Folder of the snapshot.
+
+    Returns
+    -------
+    bool
+        True if the snapshot was written.
+    """
+    inputs = inputs_hash(configuration)
+    if inputs is None:
+        logger.info("Warm restart snapshot not saved: the stored data does not cover the configuration.")
+        return False
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    token = uuid.uuid4().hex
+    groups = {}
+    try:
+        for name, frames in state.items():
+            lazy = isinstance(frames, lt.LazyResults)
+            if lazy:
+                frames = {ticker: frame.base for ticker, frame in frames.frames.items()}
+
+            file_name = f"{name}.{token}.arrow"
+            items = []
+            offset = 0
+            with open(directory / file_name, "wb") as file:
+                for key, df in frames.items():
+                    data = _frame_bytes(df)
+                    file.write(data)
+                    items.append(_encode_key(key) + [offset, data.size])
+                    offset += data.size
+            groups[name] = {"file": file_name, "lazy": lazy, "items": items}
+
+        raw = {
+            "version": SNAPSHOT_VERSION,
+            "inputs": inputs,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "groups": groups,
+        }
+        of.atomic_write_bytes(directory / STATE_FILE, json.dumps(raw, indent=1).encode("utf-8"))
+    except (OSError, pa.ArrowException, TypeError, ValueError) as e:
+        logger.warning(f"Could not save the warm restart snapshot: {e}")
+        for path in directory.glob(f"*.{token}.arrow"):
+            path.unlink(missing_ok=True)
+        return False
+
+    # Archivos de snapshots anteriores
+    for path in directory.glob("*.arrow"):
+        if token not in path.name:
+            path.unlink(missing_ok=True)
+
+    logger.info(f"Warm restart snapshot saved to {directory}")
+    return True
+
+
+def load_state(
+    configuration: Configuration,
+    directory: str = DEFAULT_STATE_DIR,
+    groups: tuple[str, ...] = ()
+) -> dict[str, dict] | None:
+    """
+    Loads the snapshot written by save_state if it was computed from the same inputs:
+    same snapshot version, same configuration and same stored ticker data. The stored
+    data is looked up in the store set up by ``fc.configure_runtime``.
+
+    Parameters
+    ----------
+    configuration : Configuration
+        Configuration of the current run.
+    directory : str
+        Folder the snapshot was saved to.
+    groups : tuple[str, ...]
+        Groups the caller reads from the state; a snapshot missing any of them is not used.
+
+    Returns
+    -------
+    dict[str, dict] | None
+        The groups as they were saved (lazy results as LazyResults again), or None on any
+        mismatch or unreadable snapshot, meaning the state has to be computed.
+    """
+    directory = Path(directory)
+    state_path = directory / STATE_FILE
+    if not state_path.is_file():
+        return None
+
+    try:
+        with open(state_path, "r", encoding="utf-8") as file:
+            raw = json.load(file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring warm restart snapshot {state_path}: {e}")
+        return None
+
+    if raw.get("version") != SNAPSHOT_VERSION:
+        logger.info("Warm restart snapshot is from another version, recomputing.")
+        return None
+
+    if raw.get("inputs") != inputs_hash(configuration):
+        logger.info("Configuration or ticker data changed since the warm restart snapshot, recomputing.")
+        return None
+
+    missing = [name for name in groups if name not in raw.get("groups", {})]
+    if missing:
+        logger.info(f"Warm restart snapshot lacks {', '.join(missing)}, recomputing.")
+        return None
+
+    state = {}
+    try:
+        for name, group in raw["groups"].items():
+            frames = {}
+            with pa.memory_map(str(directory / group["file"])) as source:
+                buffer = source.read_buffer()
+                for kind, key, offset, size in group["items"]:
+                    table = pa.ipc.open_stream(buffer.slice(offset, size)).read_all()
+                    frames[_decode_key(kind, key)] = table.to_pandas()
+                del buffer
+
+            if group["lazy"]:
+                frames = lt.LazyResults({
+                    ticker: lt.LazyTargetFrame(base, lags=configuration.window_shift, lookback=lt.LOOKBACK)
+                    for ticker, base in frames.items()
+                })
+            state[name] = frames
+    except (OSError, KeyError, ValueError, pa.ArrowException) as e:
+        logger.warning(f"Ignoring warm restart snapshot {state_path}: {e}")
+        return None
+
+    logger.info(f"Warm restart snapshot of {raw.get('created')} loaded.")
+    return state
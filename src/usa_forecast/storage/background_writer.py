@@ -0,0 +1,185 @@
+#Modules
+from src.usa_forecast.exceptions import BackgroundWriteError
+
+#Libraries
+import atexit
+import logging
+import queue
+import threading
+import typing
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+# Writes waiting in the queue before submit blocks the producer
+MAX_PENDING = 256
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Runs output writes on a dedicated thread, in submission order, so the pipeline can
+    go on computing (or the dashboard can start) while files are flushed.
+
+    The queue is bounded: when MAX_PENDING writes are waiting, ``submit`` blocks until the
+    writer catches up, which keeps memory bounded when producing faster than the disk.
+    Callers must not modify a frame after submitting it.
+
+    Failed writes are logged when they happen and kept until the next ``flush``, which
+    waits for every submitted write and returns them (or raises BackgroundWriteError).
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING, enabled: bool = True):
+        """
+        Parameters
+        ----------
+        max_pending : int
+            Capacity of the queue.
+        enabled : bool
+            False runs every write synchronously inside ``submit``.
+        """
+        self.enabled = enabled
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._errors: list[tuple[str, Exception]] = []
+        self._errors_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="background-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self, description: str, func: typing.Callable, args: tuple, kwargs: dict) -> None:
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Background write failed ({description}): {e}")
+            with self._errors_lock:
+                self._errors.append((description, e))
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._run(*item)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, description: str, func: typing.Callable, *args: typing.Any, **kwargs: typing.Any) -> None:
+        """
+        Queues ``func(*args, **kwargs)``.
+
+        Parameters
+        ----------
+        description : str
+            What is written, for the error report (a ticker, a file name).
+        func : Callable
+            The write.
+        """
+        if not self.enabled:
+            self._run(description, func, args, kwargs)
+            return
+        self._start()
+        self._queue.put((description, func, args, kwargs))
+
+    @property
+    def pending(self) -> int:
+        """
+        Writes submitted and not finished yet.
+        """
+        return self._queue.unfinished_tasks
+
+    def flush(self, raise_errors: bool = False) -> list[tuple[str, Exception]]:
+        """
+        Barrier: waits until every write submitted so far is done.
+
+        Parameters
+        ----------
+        raise_errors : bool
+            Raise BackgroundWriteError if a write failed instead of returning the failures.
+
+        Returns
+        -------
+        list[tuple[str, Exception]]
+            Writes that failed since the previous flush, with their error.
+        """
+        self._queue.join()
+        with self._errors_lock:
+            errors, self._errors = self._errors, []
+
+        if errors and raise_errors:
+            raise BackgroundWriteError(
+                f"{len(errors)} background writes failed: " + ", ".join(description for description, _ in errors)
+            )
+        return errors
+
+    def close(self) -> list[tuple[str, Exception]]:
+        """
+        Flushes and stops the writer thread. A later ``submit`` starts a new one.
+        """
+        errors = self.flush()
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+        return errors
+
+#%%
+
+_writer_lock = threading.Lock()
+_writer: BackgroundWriter | None = None
+
+
+def configure_writer(max_pending: int = MAX_PENDING, enabled: bool = True) -> BackgroundWriter:
+    """
+    Replaces the shared writer, after flushing the writes pending in the previous one.
+    """
+    global _writer
+    with _writer_lock:
+        previous, _writer = _writer, BackgroundWriter(max_pending=max_pending, enabled=enabled)
+        writer = _writer
+    if previous is not None:
+        report_errors(previous.close())
+    return writer
+
+
+def get_writer() -> BackgroundWriter:
+    """
+    Returns the shared writer, creating it with default settings on first use.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter()
+        return _writer
+
+
+def report_errors(errors: list[tuple[str, Exception]]) -> None:
+    if errors:
+        logger.warning(
+            f"{len(errors)} outputs could not be written: {', '.join(description for description, _ in errors)}"
+        )
+
+
+def flush() -> list[tuple[str, Exception]]:
+    """
+    Waits for the writes pending in the shared writer and logs the ones that failed.
+    """
+    errors = get_writer().flush()
+    report_errors(errors)
+    return errors
+
+
+@atexit.register
+def _close_at_exit() -> None:
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        report_errors(writer.close())
@@ -0,0 +1,159 @@
+#Libraries
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+MANIFEST_FILE = "manifest.json"
+
+# Entries changed between two writes of the manifest file
+SAVE_EVERY = 50
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    """
+    What is known about a stored ticker file without opening it. The dates, rows and
+    columns describe the ticker data including its delta segments; the hash, size and
+    mtime describe the base file.
+    """
+    file_name: str
+    storage_format: str
+    first_date: str | None
+    last_date: str | None
+    rows: int
+    columns: tuple[str, ...]
+    content_hash: str
+    size: int
+    mtime_ns: int
+    segments: int = 0
+
+    def matches(self, path: Path) -> bool:
+        """
+        True if ``path`` is still the file this entry describes (same size and mtime).
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_entry(
+    path: Path,
+    storage_format: str,
+    dates: pd.Index,
+    columns: list[str],
+    segments: int = 0,
+    content_hash: str | None = None
+) -> ManifestEntry:
+    """
+    Describes a just written (or just read) ticker file. ``content_hash`` can be passed
+    when the base file did not change, to skip hashing it again.
+    """
+    stat = path.stat()
+    return ManifestEntry(
+        file_name=path.name,
+        storage_format=storage_format,
+        first_date=dates.min().date().isoformat() if len(dates) else None,
+        last_date=dates.max().date().isoformat() if len(dates) else None,
+        rows=len(dates),
+        columns=tuple(columns),
+        content_hash=content_hash or file_hash(path),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        segments=segments
+    )
+
+
+class Manifest:
+    """
+    Sidecar index of a ticker folder: date coverage, columns, row count and content hash
+    of every ticker file, kept in ``manifest.json`` next to the files.
+
+    Entries are checked against the size and modification time of their file, so a file
+    changed behind the manifest's back (another tool, a run killed before saving) is
+    simply described again instead of trusted.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.path = Path(directory) / MANIFEST_FILE
+        self._lock = threading.Lock()
+        self._entries: dict[str, ManifestEntry] = self._load()
+        self._saved = dict(self._entries)
+        self._unsaved = 0
+
+    def _load(self) -> dict[str, ManifestEntry]:
+        if not self.path.is_file():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                raw = json.load(file)
+            return {
+                ticker: ManifestEntry(**{**entry, "columns": tuple(entry["columns"])})
+                for ticker, entry in raw.items()
+            }
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring ticker manifest {self.path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        with self._lock:
+            self._unsaved = 0
+            if self._entries == self._saved and self.path.is_file():
+                return
+            snapshot = dict(self._entries)
+            raw = {ticker: dataclasses.asdict(entry) for ticker, entry in sorted(snapshot.items())}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(raw, file, indent=1)
+        os.replace(temp_path, self.path)
+        with self._lock:
+            self._saved = snapshot
+
+    def get(self, ticker: str, path: Path) -> ManifestEntry | None:
+        """
+        Entry of ``ticker`` if it still describes the file at ``path``.
+        """
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry is None or entry.file_name != path.name or not entry.matches(path):
+            return None
+        return entry
+
+    def put(self, ticker: str, entry: ManifestEntry) -> None:
+        with self._lock:
+            self._entries[ticker] = entry
+            self._unsaved += 1
+            pending = self._unsaved >= SAVE_EVERY
+
+        if pending:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Could not save ticker manifest: {e}")
+
+    def remove(self, ticker: str) -> None:
+        with self._lock:
+            if self._entries.pop(ticker, None) is not None:
+                self._unsaved += 1
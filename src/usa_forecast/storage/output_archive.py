@@ -0,0 +1,288 @@
+#Modules
+from src.usa_forecast.storage import summary_store as ss
+from src.usa_forecast.storage import output_files as of
+
+#Libraries
+import datetime
+import logging
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_SUMMARY_CSV_DIR = "Output/Historical_Summaries"
+DEFAULT_DAILY_DIR = "Output/Daily_Price_Target_Analysis"
+DEFAULT_DAILY_ARCHIVE_DIR = "Output/Daily_Price_Target_Analysis/archive"
+
+
+def _to_date(value) -> datetime.date:
+    return pd.Timestamp(value).date()
+
+
+def _file_date(path: Path) -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(path.stem)
+    except ValueError:
+        return None
+
+
+class OutputArchive:
+    """
+    A folder of per-date CSV files (``YYYY-MM-DD.csv``) backed by a compacted archive, a
+    SummaryStore dataset partitioned by year or month and compressed.
+
+    Recent dates are kept as CSV files; ``compact`` merges the files older than
+    ``compaction_days`` into the archive and deletes them, and ``apply_retention`` drops
+    every date older than ``retention_days`` from both. ``write`` follows the same policy,
+    so old dates never come back as files. ``read`` and ``dates`` look at the files and the
+    archive alike: callers do not need to know whether a date was compacted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        archive: ss.SummaryStore,
+        transpose: bool = False,
+        compaction_days: int = 0,
+        retention_days: int = 0
+    ):
+        """
+        Parameters
+        ----------
+        directory : str
+            Folder of the per-date CSV files.
+        archive : SummaryStore
+            Dataset the old dates are compacted into.
+        transpose : bool
+            The frames have tickers as rows (the archive stores tickers as columns).
+        compaction_days : int
+            Age in days after which a date is moved to the archive. 0 never compacts.
+        retention_days : int
+            Age in days after which a date is deleted. 0 keeps everything.
+        """
+        self.directory = Path(directory)
+        self.archive = archive
+        self.transpose = transpose
+        self.compaction_days = compaction_days
+        self.retention_days = retention_days
+
+    def _cutoff(self, days: int, today: datetime.date | None = None) -> datetime.date | None:
+        if not days:
+            return None
+        return (today or datetime.date.today()) - datetime.timedelta(days=days)
+
+    def compact_before(self, today: datetime.date | None = None) -> datetime.date | None:
+        return self._cutoff(self.compaction_days, today)
+
+    def keep_from(self, today: datetime.date | None = None) -> datetime.date | None:
+        return self._cutoff(self.retention_days, today)
+
+    def csv_path(self, date) -> Path:
+        return self.directory / f"{_to_date(date).isoformat()}.csv"
+
+    def _csv_files(self) -> dict[datetime.date, Path]:
+        if not self.directory.is_dir():
+            return {}
+        files = {}
+        for path in self.directory.glob("*.csv"):
+            date = _file_date(path)
+            if date is not None:
+                files[date] = path
+        return files
+
+    def _transposed(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.T if self.transpose else df
+
+    def write(self, frames: dict, today: datetime.date | None = None) -> None:
+        """
+        Stores the frames of some dates: CSV files for the recent ones, the archive for the
+        ones past the compaction age, nothing for the ones past the retention age.
+
+        Parameters
+        ----------
+        frames : dict
+            DataFrame per date (date, Timestamp or ISO string).
+        """
+        compact_before, keep_from = self.compact_before(today), self.keep_from(today)
+        archived = {}
+        for date, df in frames.items():
+            day = _to_date(date)
+            if keep_from is not None and day < keep_from:
+                continue
+            if compact_before is not None and day < compact_before:
+                if not df.empty:
+                    archived[day] = self._transposed(df)
+                continue
+            of.write_csv(self.csv_path(day), df)
+
+        if archived:
+            self.archive.write(archived)
+
+    def compact(self, before: datetime.date) -> int:
+        """
+        Moves the CSV files dated before ``before`` into the archive. The files are deleted
+        only once the archive holds their dates.
+
+        Returns
+        -------
+        int
+            Number of files compacted.
+        """
+        files = {date: path for date, path in self._csv_files().items() if date < before}
+        if not files:
+            return 0
+
+        frames = {}
+        for date, path in sorted(files.items()):
+            try:
+                df = pd.read_csv(path, index_col=0)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping {path} in the compaction: {e}")
+                files.pop(date)
+                continue
+            if not df.empty:
+                frames[date] = self._transposed(df)
+
+        self.archive.write(frames)
+        for path in files.values():
+            path.unlink(missing_ok=True)
+
+        logger.info(f"{len(files)} files of {self.directory} compacted into {self.archive.directory}.")
+        return len(files)
+
+    def apply_retention(self, before: datetime.date) -> int:
+        """
+        Deletes every date before ``before``, as CSV file or in the archive.
+
+        Returns
+        -------
+        int
+            Number of dates deleted.
+        """
+        removed = 0
+        for date, path in self._csv_files().items():
+            if date < before:
+                path.unlink(missing_ok=True)
+                removed += 1
+        removed += self.archive.delete_before(before)
+
+        if removed:
+            logger.info(f"{removed} dates before {before} deleted from {self.directory}.")
+        return removed
+
+    def run(self, today: datetime.date | None = None) -> None:
+        """
+        Compaction and retention with the configured ages.
+        """
+        compact_before, keep_from = self.compact_before(today), self.keep_from(today)
+        if keep_from is not None:
+            self.apply_retention(keep_from)
+        if compact_before is not None:
+            self.compact(compact_before)
+
+    def dates(self, start=None, end=None) -> list[datetime.date]:
+        """
+        Dates available, as CSV file or in the archive, ascending.
+        """
+        start = _to_date(start) if start is not None else None
+        end = _to_date(end) if end is not None else None
+        files = {
+            date for date in self._csv_files()
+            if (start is None or date >= start) and (end is None or date <= end)
+        }
+        return sorted(files | set(self.archive.dates(start, end)))
+
+    def read(self, date) -> pd.DataFrame | None:
+        """
+        Frame of one date, from its CSV file or from the archive. None if it is in neither.
+        """
+        path = self.csv_path(date)
+        if path.is_file():
+            return pd.read_csv(path, index_col=0)
+        df = self.archive.read(date)
+        if df is None:
+            return None
+        return self._transposed(df)
+
+    def read_many(self, start=None, end=None) -> dict[datetime.date, pd.DataFrame]:
+        """
+        Frames between two dates (both included) keyed by date.
+        """
+        frames = {
+            date: self._transposed(df)
+            for date, df in self.archive.read_many(start, end).items()
+        }
+        for date in self.dates(start, end):
+            path = self.csv_path(date)
+            if path.is_file():
+                frames[date] = pd.read_csv(path, index_col=0)
+        return dict(sorted(frames.items()))
+
+#%%
+
+_archives_lock = threading.Lock()
+_summary_archive: OutputArchive | None = None
+_daily_archive: OutputArchive | None = None
+
+
+def configure_archives(
+    partition: str = "year",
+    compression: str = ss.DEFAULT_COMPRESSION,
+    compaction_days: int = 0,
+    retention_days: int = 0
+) -> tuple[OutputArchive, OutputArchive]:
+    """
+    Replaces the shared archives of the historical summaries (compacted into the shared
+    summary store) and of the daily price target analysis.
+    """
+    global _summary_archive, _daily_archive
+    with _archives_lock:
+        _summary_archive = OutputArchive(
+            DEFAULT_SUMMARY_CSV_DIR,
+            ss.get_summary_store(),
+            compaction_days=compaction_days,
+            retention_days=retention_days
+        )
+        _daily_archive = OutputArchive(
+            DEFAULT_DAILY_DIR,
+            ss.SummaryStore(DEFAULT_DAILY_ARCHIVE_DIR, partition=partition, compression=compression),
+            transpose=True,
+            compaction_days=compaction_days,
+            retention_days=retention_days
+        )
+        return _summary_archive, _daily_archive
+
+
+def get_summary_archive() -> OutputArchive:
+    """
+    Returns the shared archive of the historical summaries, creating it with default
+    settings (no compaction or retention) on first use.
+    """
+    with _archives_lock:
+        archive = _summary_archive
+    return archive if archive is not None else configure_archives()[0]
+
+
+def get_daily_archive() -> OutputArchive:
+    """
+    Returns the shared archive of the daily price target analysis, creating it with
+    default settings (no compaction or retention) on first use.
+    """
+    with _archives_lock:
+        archive = _daily_archive
+    return archive if archive is not None else configure_archives()[1]
+
+
+def run_compaction() -> None:
+    """
+    Compaction and retention of both archives, with the ages they were configured with.
+    """
+    for archive in (get_summary_archive(), get_daily_archive()):
+        try:
+            archive.run()
+        except OSError as e:
+            logger.warning(f"Compaction of {archive.directory} failed: {e}")
@@ -0,0 +1,193 @@
+#Modules
+from src.usa_forecast.storage import manifest as mf
+
+#Libraries
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_MANIFEST_PATH = "Output/output_manifest.json"
+
+# Entries changed between two writes of the manifest file
+SAVE_EVERY = 50
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class OutputEntry:
+    """
+    Content hash of an output file as last written, with the size and mtime that tell
+    whether the file is still that one.
+    """
+    content_hash: str
+    size: int
+    mtime_ns: int
+
+    def matches(self, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+def atomic_write_bytes(path: str | Path, data: bytes | memoryview) -> None:
+    """
+    Writes ``data`` to a temporary file next to ``path`` and renames it over ``path``, so
+    readers see either the old file or the new one, never a truncated one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+class OutputFiles:
+    """
+    Output layer for the files that are rewritten as a whole on every run (summary CSVs,
+    daily analysis CSVs, reports, the panel).
+
+    Each write is serialized in memory first and its SHA-256 compared with the hash
+    recorded for that path in ``output_manifest.json``. Identical content is not written
+    again; anything else is written atomically. A file without a valid entry (changed by
+    another tool, or the manifest was not saved) of the same size is hashed from disk
+    instead, which only reads it.
+    """
+
+    def __init__(self, manifest_path: str | Path = DEFAULT_MANIFEST_PATH):
+        self.manifest_path = Path(manifest_path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, OutputEntry] = self._load()
+        self._saved = dict(self._entries)
+        self._unsaved = 0
+        self.written = 0
+        self.skipped = 0
+
+    def _load(self) -> dict[str, OutputEntry]:
+        if not self.manifest_path.is_file():
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                raw = json.load(file)
+            return {path: OutputEntry(**entry) for path, entry in raw.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring output manifest {self.manifest_path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        with self._lock:
+            self._unsaved = 0
+            if self._entries == self._saved and self.manifest_path.is_file():
+                return
+            snapshot = dict(self._entries)
+            raw = {path: dataclasses.asdict(entry) for path, entry in sorted(snapshot.items())}
+        atomic_write_bytes(self.manifest_path, json.dumps(raw, indent=1).encode("utf-8"))
+        with self._lock:
+            self._saved = snapshot
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return os.path.normpath(path).replace(os.sep, "/")
+
+    def _unchanged(self, path: Path, content_hash: str, size: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        if entry is not None and entry.matches(path):
+            return entry.content_hash == content_hash
+
+        try:
+            if path.stat().st_size != size:
+                return False
+            same = mf.file_hash(path) == content_hash
+        except OSError:
+            return False
+        if same:
+            self._record(path, content_hash)
+        return same
+
+    def _record(self, path: Path, content_hash: str) -> None:
+        stat = path.stat()
+        with self._lock:
+            self._entries[self._key(path)] = OutputEntry(content_hash, stat.st_size, stat.st_mtime_ns)
+            self._unsaved += 1
+            pending = self._unsaved >= SAVE_EVERY
+
+        if pending:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Could not save output manifest: {e}")
+
+    def write_bytes(self, path: str | Path, data: bytes | memoryview) -> bool:
+        """
+        Writes ``data`` to ``path`` unless the file already holds exactly these bytes.
+
+        Returns
+        -------
+        bool
+            True if the file was written, False if it was skipped.
+        """
+        path = Path(path)
+        content_hash = hashlib.sha256(data).hexdigest()
+        if self._unchanged(path, content_hash, len(data)):
+            with self._lock:
+                self.skipped += 1
+            logger.debug(f"{path} unchanged, not written.")
+            return False
+
+        atomic_write_bytes(path, data)
+        self._record(path, content_hash)
+        with self._lock:
+            self.written += 1
+        return True
+
+    def write_csv(self, path: str | Path, df: pd.DataFrame, **kwargs) -> bool:
+        """
+        ``df.to_csv(path, **kwargs)`` through write_bytes.
+        """
+        return self.write_bytes(path, df.to_csv(**kwargs).encode("utf-8"))
+
+#%%
+
+_outputs_lock = threading.Lock()
+_outputs: OutputFiles | None = None
+
+
+def configure_outputs(manifest_path: str | Path = DEFAULT_MANIFEST_PATH) -> OutputFiles:
+    """
+    Replaces the shared output layer with one keeping its manifest at ``manifest_path``.
+    """
+    global _outputs
+    with _outputs_lock:
+        _outputs = OutputFiles(manifest_path=manifest_path)
+        return _outputs
+
+
+def get_outputs() -> OutputFiles:
+    """
+    Returns the shared output layer, creating it with default settings on first use.
+    """
+    global _outputs
+    with _outputs_lock:
+        if _outputs is None:
+            _outputs = OutputFiles()
+        return _outputs
+
+
+def write_csv(path: str | Path, df: pd.DataFrame, **kwargs) -> bool:
+    return get_outputs().write_csv(path, df, **kwargs)
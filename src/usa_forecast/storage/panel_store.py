@@ -0,0 +1,261 @@
+#Modules
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.storage import output_files as of
+
+#Libraries
+import collections.abc
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_PANEL_PATH = "Output/Tickers/panel.arrow"
+
+# Characters of the content hash in the name of each panel version
+VERSION_LENGTH = 16
+
+# Schema metadata key holding the row range of each ticker
+OFFSETS_KEY = b"usa_forecast.offsets"
+
+
+class Panel(collections.abc.Mapping):
+    """
+    Read-only view over a memory-mapped panel file, usable like the ``mkt_data`` dict.
+
+    Each ticker is a contiguous slice of the rows. ``table(ticker)`` is a zero-copy Arrow
+    slice; ``panel[ticker]`` wraps the same pages in a DataFrame without copying the
+    float columns, so those DataFrames are read-only: copy one before writing into it.
+    """
+
+    def __init__(self, table: pa.Table, offsets: dict[str, tuple[int, int]]):
+        self._table = table
+        self._offsets = offsets
+
+    @property
+    def columns(self) -> list[str]:
+        return [name for name in self._table.column_names if name != "date"]
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        table = self.table(ticker)
+        dates = table.column("date").to_numpy()
+        df = table.remove_column(0).to_pandas(split_blocks=True)
+        df.index = pd.DatetimeIndex(dates, name="date")
+        return df
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def table(self, ticker: str) -> pa.Table:
+        start, length = self._offsets[ticker]
+        return self._table.slice(start, length)
+
+    def coverage(self, ticker: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """
+        First and last date of a ticker, None if it is missing or empty.
+        """
+        if ticker not in self._offsets:
+            return None
+        start, length = self._offsets[ticker]
+        if length == 0:
+            return None
+        dates = self._table.column("date")
+        return pd.Timestamp(dates[start].as_py()), pd.Timestamp(dates[start + length - 1].as_py())
+
+
+class PanelStore:
+    """
+    All tickers in one Arrow IPC file: the rows of every ticker one after the other,
+    sorted by date, with a 'date' column, the union of the data columns and the row
+    range of each ticker in the schema metadata.
+
+    The file is uncompressed so ``open`` can memory-map it: a warm start costs one mmap
+    whatever the number of tickers, only the pages actually used are read from disk, and
+    several processes opening the same file share them through the page cache.
+
+    A mapped file cannot be replaced on Windows, and the DataFrames served from a panel
+    keep its mapping alive. So each panel is written once under a versioned name
+    (``panel.<hash>.arrow`` for ``path`` = ``panel.arrow``) and a small pointer file
+    (``panel.current.json``) names the current one. ``write`` switches the pointer and
+    deletes the versions it can; a version still mapped stays until a later write.
+    """
+
+    def __init__(self, path: str = DEFAULT_PANEL_PATH):
+        self.path = Path(path)
+
+    @property
+    def pointer_path(self) -> Path:
+        return self.path.with_name(f"{self.path.stem}.current.json")
+
+    def version_path(self, version: str) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{version}{self.path.suffix}")
+
+    def current_path(self) -> Path | None:
+        """
+        Panel file the pointer names, None if there is no pointer or it is unreadable.
+        """
+        try:
+            with open(self.pointer_path, "r", encoding="utf-8") as file:
+                version = json.load(file)["version"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring panel pointer {self.pointer_path}: {e}")
+            return None
+        return self.version_path(version)
+
+    def exists(self) -> bool:
+        path = self.current_path()
+        return path is not None and path.is_file()
+
+    def _remove_old_versions(self, current: Path) -> None:
+        # Los paneles anteriores (y el panel.arrow sin versión); uno aún mapeado se queda
+        for path in [self.path, *self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}")]:
+            if path == current or not path.is_file():
+                continue
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.debug(f"Old panel {path} not removed yet: {e}")
+
+    @staticmethod
+    def _ticker_columns(data: pd.DataFrame | pa.Table, columns: list[str]) -> tuple[np.ndarray, list[pa.Array]]:
+        if isinstance(data, pa.Table):
+            dates = data.column("date").to_numpy()
+            values = {name: data.column(name) for name in data.column_names if name != "date"}
+        else:
+            dates = pd.DatetimeIndex(data.index).to_numpy()
+            values = {name: data[name].to_numpy() for name in data.columns}
+
+        arrays = []
+        for name in columns:
+            column = values.get(name)
+            if column is None:
+                arrays.append(pa.array(np.full(len(dates), np.nan)))
+            elif isinstance(column, pa.ChunkedArray):
+                arrays.append(column.combine_chunks())
+            else:
+                # NaN stays NaN instead of becoming null, so reads can be zero-copy
+                arrays.append(pa.array(column))
+        return dates, arrays
+
+    def write(self, data: dict[str, pd.DataFrame | pa.Table]) -> None:
+        """
+        Writes every ticker into a new panel version and points to it, so a panel still
+        mapped is never replaced in place. Nothing is written when the new panel is byte
+        for byte the current one.
+
+        Parameters
+        ----------
+        data : dict[str, pd.DataFrame | pa.Table | LazyTargetFrame]
+            DataFrames indexed by date, or tables with a 'date' column, per ticker. Of a
+            LazyTargetFrame only the stored columns are written.
+        """
+        data = {ticker: frame.base if isinstance(frame, lt.LazyTargetFrame) else frame for ticker, frame in data.items()}
+        columns: list[str] = []
+        for frame in data.values():
+            names = frame.column_names if isinstance(frame, pa.Table) else list(frame.columns)
+            columns.extend(name for name in names if name != "date" and name not in columns)
+
+        batches = []
+        offsets: dict[str, tuple[int, int]] = {}
+        row = 0
+        for ticker, frame in data.items():
+            dates, arrays = self._ticker_columns(frame, columns)
+            date_array = pa.array(dates.astype("datetime64[ns]"), type=pa.timestamp("ns"))
+            batches.append(pa.RecordBatch.from_arrays([date_array] + arrays, names=["date"] + columns))
+            offsets[ticker] = (row, len(dates))
+            row += len(dates)
+
+        if batches:
+            # A column stored as int by a ticker and as float by another (or missing) becomes float
+            schema = pa.unify_schemas([batch.schema for batch in batches], promote_options="permissive")
+        else:
+            schema = pa.schema([("date", pa.timestamp("ns"))])
+        schema = schema.with_metadata({OFFSETS_KEY: json.dumps(offsets).encode("utf-8")})
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch.cast(schema.remove_metadata()))
+
+        data = memoryview(sink.getvalue())
+        version = hashlib.sha256(data).hexdigest()[:VERSION_LENGTH]
+        path = self.version_path(version)
+        # Sin reescribir un panel idéntico (corridas sin datos nuevos)
+        if path == self.current_path() and path.is_file():
+            return
+
+        # Un nombre nuevo nunca está mapeado; el puntero se lee y se cierra, nunca se mapea
+        of.atomic_write_bytes(path, data)
+        of.atomic_write_bytes(self.pointer_path, json.dumps({"version": version}).encode("utf-8"))
+        self._remove_old_versions(path)
+        logger.debug(f"Panel of {len(offsets)} tickers and {row} rows written to {path}")
+
+    def open(self) -> Panel | None:
+        """
+        Memory-maps the current panel file. Returns None if there is no panel or it is
+        unreadable.
+        """
+        path = self.current_path()
+        if path is None or not path.is_file():
+            return None
+        try:
+            source = pa.memory_map(str(path))
+            table = pa.ipc.open_file(source).read_all()
+            offsets = json.loads(table.schema.metadata[OFFSETS_KEY])
+        except (OSError, pa.ArrowInvalid, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring panel file {path}: {e}")
+            return None
+
+        return Panel(
+            table=table.replace_schema_metadata(None),
+            offsets={ticker: (start, length) for ticker, (start, length) in offsets.items()}
+        )
+
+#%%
+
+_panel_lock = threading.Lock()
+_panel_store: PanelStore | None = None
+
+
+def configure_panel_store(path: str = DEFAULT_PANEL_PATH) -> PanelStore:
+    """
+    Replaces the shared panel store with one at ``path``.
+    """
+    global _panel_store
+    with _panel_lock:
+        _panel_store = PanelStore(path=path)
+        return _panel_store
+
+
+def get_panel_store() -> PanelStore:
+    """
+    Returns the shared panel store, creating it at the default path on first use.
+    """
+    global _panel_store
+    with _panel_lock:
+        if _panel_store is None:
+            _panel_store = PanelStore()
+        return _panel_store
+
+
+def write_panel(results: dict[str, pd.DataFrame | pa.Table]) -> None:
+    """
+    Writes ``results`` as the new version of the shared panel.
+    """
+    try:
+        get_panel_store().write(results)
+    except OSError as e:
+        logger.warning(f"Could not write the panel file: {e}")
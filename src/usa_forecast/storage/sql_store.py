@@ -0,0 +1,347 @@
+#Modules
+from src.usa_forecast.calculations import precision as pr
+from src.usa_forecast.calculations import lazy_targets as lt
+
+#Libraries
+import datetime
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+DEFAULT_SQL_PATH = "Output/usa_forecast.sqlite"
+
+BARS_TABLE = "bars"
+TARGETS_TABLE = "targets"
+SUMMARIES_TABLE = "summaries"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {BARS_TABLE} (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {BARS_TABLE}_date ON {BARS_TABLE} (date, ticker);
+
+CREATE TABLE IF NOT EXISTS {TARGETS_TABLE} (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {TARGETS_TABLE}_date ON {TARGETS_TABLE} (date, ticker);
+
+CREATE TABLE IF NOT EXISTS {SUMMARIES_TABLE} (
+    date TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (date, metric, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {SUMMARIES_TABLE}_ticker ON {SUMMARIES_TABLE} (ticker, date);
+"""
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _iso(value) -> str:
+    return pd.Timestamp(value).date().isoformat()
+
+
+class SqlStore:
+    """
+    Local SQLite database with the bars, the derived targets and the summaries of every
+    ticker, for range and cross-sectional queries without loading whole DataFrames.
+
+    ``bars`` (open, high, low, close, volume) and ``targets`` (every derived column) have
+    one row per ticker and date, keyed by (ticker, date) and indexed by (date, ticker);
+    new derived columns are added as they appear. ``summaries`` has one row per date,
+    metric and ticker, keyed by (date, metric, ticker). Dates are ISO 'YYYY-MM-DD' text.
+
+    Writes only touch the rows that changed: each row carries a hash of its values and
+    only new or different rows are upserted, dates no longer present are deleted.
+
+    Each thread gets its own connection; the database runs in WAL mode so the dashboard
+    can query while the pipeline writes.
+    """
+
+    def __init__(self, path: str = DEFAULT_SQL_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._columns: dict[str, list[str]] = {}
+
+        with self._write_lock:
+            connection = self._connection()
+            connection.executescript(SCHEMA)
+            connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _table_columns(self, table: str) -> list[str]:
+        if table not in self._columns:
+            rows = self._connection().execute(f"PRAGMA table_info({table})").fetchall()
+            self._columns[table] = [row[1] for row in rows]
+        return self._columns[table]
+
+    def _ensure_columns(self, table: str, df: pd.DataFrame) -> None:
+        existing = set(self._table_columns(table))
+        for name, dtype in df.dtypes.items():
+            if name in existing:
+                continue
+            sql_type = "INTEGER" if pd.api.types.is_integer_dtype(dtype) else "REAL"
+            self._connection().execute(f"ALTER TABLE {table} ADD COLUMN {_quote(name)} {sql_type}")
+            self._columns[table].append(name)
+
+    def _upsert_rows(self, table: str, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Brings the rows of ``ticker`` in ``table`` in line with ``df``. Returns the rows written.
+        """
+        connection = self._connection()
+        self._ensure_columns(table, df)
+
+        dates = [date.isoformat() for date in pd.DatetimeIndex(df.index).date]
+        hashes = pd.util.hash_pandas_object(df, index=True).to_numpy().view(np.int64).tolist()
+
+        stored = dict(connection.execute(f"SELECT date, row_hash FROM {table} WHERE ticker = ?", (ticker,)).fetchall())
+        changed = [i for i, (date, row_hash) in enumerate(zip(dates, hashes)) if stored.get(date) != row_hash]
+        removed = stored.keys() - set(dates)
+
+        if removed:
+            connection.executemany(
+                f"DELETE FROM {table} WHERE ticker = ? AND date = ?",
+                [(ticker, date) for date in removed]
+            )
+        if changed:
+            columns = ["ticker", "date", "row_hash"] + list(df.columns)
+            values = [df[name].to_numpy()[changed].tolist() for name in df.columns]
+            rows = zip(
+                [ticker] * len(changed),
+                [dates[i] for i in changed],
+                [hashes[i] for i in changed],
+                *values
+            )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(_quote(name) for name in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+        return len(changed) + len(removed)
+
+    def write_ticker(self, ticker: str, df: pd.DataFrame | lt.LazyTargetFrame) -> int:
+        """
+        Stores the bars and targets of a ticker. Returns the number of rows written.
+        """
+        df = lt.ensure_frame(df)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        bar_columns = [name for name in df.columns if name in pr.RAW_COLUMNS]
+        target_columns = [name for name in df.columns if name not in pr.RAW_COLUMNS]
+
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                written = self._upsert_rows(BARS_TABLE, ticker, df[bar_columns])
+                written += self._upsert_rows(TARGETS_TABLE, ticker, df[target_columns])
+        return written
+
+    def write_results(self, results: dict[str, pd.DataFrame]) -> None:
+        written = sum(self.write_ticker(ticker, df) for ticker, df in results.items())
+        logger.debug(f"SQL store: {written} ticker rows written for {len(results)} tickers.")
+
+    def write_summaries(self, summaries: dict) -> None:
+        """
+        Stores summaries (metrics as rows, tickers as columns) keyed by date, replacing
+        the dates already stored.
+        """
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                for date, summary in summaries.items():
+                    iso_date = _iso(date)
+                    long = summary.stack(future_stack=True)
+                    connection.execute(f"DELETE FROM {SUMMARIES_TABLE} WHERE date = ?", (iso_date,))
+                    connection.executemany(
+                        f"INSERT INTO {SUMMARIES_TABLE} (date, metric, ticker, value) VALUES (?, ?, ?, ?)",
+                        [
+                            (iso_date, str(metric), str(ticker), None if pd.isna(value) else float(value))
+                            for (metric, ticker), value in long.items()
+                        ]
+                    )
+
+    def query(self, sql: str, params: tuple | dict = ()) -> pd.DataFrame:
+        """
+        Runs a read query and returns its result.
+        """
+        return pd.read_sql_query(sql, self._connection(), params=params)
+
+    def _select_columns(self, columns: list[str] | None) -> str:
+        if columns is None:
+            names = (
+                [f"b.{_quote(name)}" for name in self._table_columns(BARS_TABLE)[3:]]
+                + [f"t.{_quote(name)}" for name in self._table_columns(TARGETS_TABLE)[3:]]
+            )
+        else:
+            bars = set(self._table_columns(BARS_TABLE))
+            names = [f"{'b' if name in bars else 't'}.{_quote(name)}" for name in columns]
+        return ", ".join(names)
+
+    def ticker_range(
+        self,
+        ticker: str,
+        start=None,
+        end=None,
+        columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Bars and targets of a ticker between two dates (both included), like
+        ``mkt_data[ticker].loc[start:end]``.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker symbol.
+        start, end : date-like, optional
+            Bounds of the range, open when omitted.
+        columns : list[str], optional
+            Only return these columns.
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexed by date; empty if there is no data in the range.
+        """
+        sql = (
+            f"SELECT b.date, {self._select_columns(columns)} FROM {BARS_TABLE} b "
+            f"LEFT JOIN {TARGETS_TABLE} t ON t.ticker = b.ticker AND t.date = b.date "
+            f"WHERE b.ticker = ? AND b.date >= ? AND b.date <= ? ORDER BY b.date"
+        )
+        df = self.query(sql, (
+            ticker,
+            _iso(start) if start is not None else "0000-01-01",
+            _iso(end) if end is not None else "9999-12-31"
+        ))
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("date")), name="date")
+        return df
+
+    def cross_section(
+        self,
+        date,
+        columns: list[str] | None = None,
+        tickers: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Row of every ticker on ``date``, or on its last date before it (like
+        historical_analysis.extract_snapshot).
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexed by ticker, with the date of each row in a 'date' column.
+        """
+        params: list = [_iso(date)]
+        ticker_filter = ""
+        if tickers is not None:
+            ticker_filter = f"AND ticker IN ({', '.join('?' * len(tickers))})"
+            params.extend(tickers)
+
+        sql = (
+            f"WITH latest AS (SELECT ticker, MAX(date) AS date FROM {BARS_TABLE} "
+            f"WHERE date <= ? {ticker_filter} GROUP BY ticker) "
+            f"SELECT b.ticker, b.date, {self._select_columns(columns)} FROM latest l "
+            f"JOIN {BARS_TABLE} b ON b.ticker = l.ticker AND b.date = l.date "
+            f"LEFT JOIN {TARGETS_TABLE} t ON t.ticker = b.ticker AND t.date = b.date ORDER BY b.ticker"
+        )
+        df = self.query(sql, tuple(params)).set_index("ticker")
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def summary(self, date) -> pd.DataFrame | None:
+        """
+        Summary of one date, metrics as rows and tickers as columns. None if not stored.
+        """
+        long = self.query(
+            f"SELECT metric, ticker, value FROM {SUMMARIES_TABLE} WHERE date = ?",
+            (_iso(date),)
+        )
+        if long.empty:
+            return None
+        summary = long.pivot(index="metric", columns="ticker", values="value")
+        summary.index.name = None
+        summary.columns.name = None
+        return summary
+
+    def summary_range(
+        self,
+        start=None,
+        end=None,
+        metrics: list[str] | None = None,
+        tickers: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Long-format summaries between two dates: 'date', 'metric', 'ticker', 'value'.
+        """
+        conditions = ["date >= ?", "date <= ?"]
+        params: list = [
+            _iso(start) if start is not None else "0000-01-01",
+            _iso(end) if end is not None else "9999-12-31"
+        ]
+        for name, values in (("metric", metrics), ("ticker", tickers)):
+            if values is not None:
+                conditions.append(f"{name} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        df = self.query(
+            f"SELECT date, metric, ticker, value FROM {SUMMARIES_TABLE} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY date, metric, ticker",
+            tuple(params)
+        )
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def tickers(self) -> list[str]:
+        return [row[0] for row in self._connection().execute(f"SELECT DISTINCT ticker FROM {BARS_TABLE} ORDER BY ticker")]
+
+    def last_date(self, ticker: str) -> datetime.date | None:
+        row = self._connection().execute(f"SELECT MAX(date) FROM {BARS_TABLE} WHERE ticker = ?", (ticker,)).fetchone()
+        return datetime.date.fromisoformat(row[0]) if row and row[0] else None
+
+#%%
+
+_sql_lock = threading.Lock()
+_sql_store: SqlStore | None = None
+
+
+def configure_sql_store(path: str | None = DEFAULT_SQL_PATH) -> SqlStore | None:
+    """
+    Opens the shared SQL store at ``path``; None disables it.
+    """
+    global _sql_store
+    with _sql_lock:
+        _sql_store = SqlStore(path=path) if path else None
+        return _sql_store
+
+
+def get_sql_store() -> SqlStore | None:
+    """
+    Returns the shared SQL store, None when it is not enabled (see configure_sql_store).
+    """
+    with _sql_lock:
+        return _sql_store
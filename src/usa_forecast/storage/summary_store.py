@@ -0,0 +1,342 @@
+#Libraries
+import datetime
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pac
+import pyarrow.parquet as pq
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+VALID_PARTITIONS = {"year", "month"}
+
+DEFAULT_SUMMARIES_DIR = "Output/Historical_Summaries/dataset"
+DEFAULT_COMPRESSION = "zstd"
+
+PART_FILE = "part.parquet"
+
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("metric", pa.string()),
+    ("ticker", pa.string()),
+    ("value", pa.float64()),
+])
+
+
+def _to_date(value) -> datetime.date:
+    return pd.Timestamp(value).date()
+
+
+def _same_rows(table: pa.Table, other: pa.Table) -> bool:
+    """
+    Whether two tables hold the same rows in the same order, missing values (NaN) included.
+    """
+    return table.num_rows == other.num_rows and table.to_pandas().equals(other.to_pandas())
+
+
+def summaries_to_table(summaries: dict) -> pa.Table:
+    """
+    Converts summaries (metrics as rows, tickers as columns) keyed by date into one long
+    table with a row per date, metric and ticker. Metrics and tickers keep their order.
+    """
+    tables = []
+    for date, summary in summaries.items():
+        metrics = np.repeat(summary.index.astype(str).to_numpy(), summary.shape[1])
+        tickers = np.tile(summary.columns.astype(str).to_numpy(), summary.shape[0])
+        values = summary.to_numpy(dtype="float64", na_value=np.nan).ravel()
+        tables.append(pa.table({
+            "date": pa.array(np.full(len(values), np.datetime64(_to_date(date), "D"))),
+            "metric": pa.array(metrics, type=pa.string()),
+            "ticker": pa.array(tickers, type=pa.string()),
+            "value": pa.array(values),
+        }, schema=SCHEMA))
+
+    return pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+
+
+def table_to_summary(table: pa.Table) -> pd.DataFrame:
+    """
+    Inverse of summaries_to_table for the rows of a single date.
+    """
+    long = table.select(["metric", "ticker", "value"]).to_pandas()
+    summary = long.pivot(index="metric", columns="ticker", values="value")
+    summary = summary.reindex(index=pd.unique(long["metric"]), columns=pd.unique(long["ticker"]))
+    summary.index.name = None
+    summary.columns.name = None
+    return summary
+
+
+class SummaryStore:
+    """
+    Historical summaries of every analysis date in one Parquet dataset, partitioned by year
+    or by month (``year=2024/part.parquet`` or ``month=2024-01/part.parquet``), in long
+    format: one row per date, metric and ticker.
+
+    Writes upsert: the dates written replace the same dates already stored and the other
+    dates are kept, and only the partitions whose content changed are rewritten. Reads by
+    date or date range only open the partitions overlapping it.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_SUMMARIES_DIR,
+        partition: str = "year",
+        compression: str = DEFAULT_COMPRESSION
+    ):
+        """
+        Parameters
+        ----------
+        directory : str
+            Root folder of the dataset.
+        partition : str
+            'year' or 'month'.
+        compression : str
+            Codec of the parquet files.
+        """
+        if partition not in VALID_PARTITIONS:
+            raise ValueError(f"Invalid partition: {partition}. Expected one of: {', '.join(VALID_PARTITIONS)}")
+
+        self.directory = Path(directory)
+        self.partition = partition
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def _partition_key(self, date: datetime.date) -> str:
+        return f"year={date.year}" if self.partition == "year" else f"month={date.year}-{date.month:02d}"
+
+    def _partition_bounds(self, key: str) -> tuple[datetime.date, datetime.date]:
+        name, value = key.split("=", 1)
+        if name == "year":
+            return datetime.date(int(value), 1, 1), datetime.date(int(value), 12, 31)
+        start = pd.Timestamp(f"{value}-01")
+        return start.date(), (start + pd.offsets.MonthEnd(0)).date()
+
+    def _partition_paths(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None
+    ) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+
+        paths = []
+        for path in sorted(self.directory.glob(f"*=*/{PART_FILE}")):
+            try:
+                first, last = self._partition_bounds(path.parent.name)
+            except ValueError:
+                continue
+            if (start is None or last >= start) and (end is None or first <= end):
+                paths.append(path)
+        return paths
+
+    @staticmethod
+    def _date_filter(table: pa.Table, start: datetime.date | None, end: datetime.date | None) -> pa.Table:
+        mask = None
+        if start is not None:
+            mask = pac.greater_equal(table["date"], pa.scalar(start, pa.date32()))
+        if end is not None:
+            upper = pac.less_equal(table["date"], pa.scalar(end, pa.date32()))
+            mask = upper if mask is None else pac.and_(mask, upper)
+        return table if mask is None else table.filter(mask)
+
+    def write(self, summaries: dict) -> None:
+        """
+        Stores the summaries of some dates, replacing those dates if they were stored.
+
+        Parameters
+        ----------
+        summaries : dict
+            Summary DataFrame (metrics as rows, tickers as columns) per date.
+        """
+        by_partition: dict[str, dict] = {}
+        for date, summary in summaries.items():
+            by_partition.setdefault(self._partition_key(_to_date(date)), {})[date] = summary
+
+        written = 0
+        with self._lock:
+            for key, partition_summaries in by_partition.items():
+                path = self.directory / key / PART_FILE
+                new = summaries_to_table(partition_summaries)
+
+                old = pq.read_table(path, schema=SCHEMA) if path.exists() else SCHEMA.empty_table()
+                kept = old.filter(pac.invert(pac.is_in(old["date"], value_set=pac.unique(new["date"]))))
+                merged = pa.concat_tables([kept, new])
+                # Stable sort: the metric and ticker order of each date is kept
+                merged = merged.take(pac.array_sort_indices(merged["date"]))
+                if _same_rows(merged, old):
+                    continue
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+                try:
+                    pq.write_table(merged, temp_path, compression=self.compression)
+                    os.replace(temp_path, path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                written += 1
+
+        logger.debug(f"{len(summaries)} summaries stored, {written} of {len(by_partition)} partitions rewritten.")
+
+    def delete_before(self, date) -> int:
+        """
+        Removes every summary dated before ``date``. Partitions entirely before it are
+        deleted whole; the one containing it is rewritten without those dates.
+
+        Returns
+        -------
+        int
+            Number of dates removed.
+        """
+        date = _to_date(date)
+        removed = 0
+        with self._lock:
+            for path in self._partition_paths(end=date - datetime.timedelta(days=1)):
+                _, last = self._partition_bounds(path.parent.name)
+                if last < date:
+                    removed += len(pac.unique(pq.read_table(path, columns=["date"])["date"]))
+                    path.unlink()
+                    try:
+                        path.parent.rmdir()
+                    except OSError:
+                        pass
+                    continue
+
+                old = pq.read_table(path, schema=SCHEMA)
+                kept = self._date_filter(old, date, None)
+                if kept.num_rows == old.num_rows:
+                    continue
+                removed += len(pac.unique(old["date"])) - len(pac.unique(kept["date"]))
+                temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+                try:
+                    pq.write_table(kept, temp_path, compression=self.compression)
+                    os.replace(temp_path, path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+
+        logger.debug(f"{removed} summary dates before {date} removed from {self.directory}.")
+        return removed
+
+    def read_range(
+        self,
+        start=None,
+        end=None,
+        tickers: list[str] | None = None,
+        metrics: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Long-format summaries between two dates (both included).
+
+        Parameters
+        ----------
+        start, end : date-like, optional
+            Bounds of the range, open when omitted.
+        tickers, metrics : list[str], optional
+            Only return these tickers or metrics.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns 'date', 'metric', 'ticker' and 'value', sorted by date.
+        """
+        start = _to_date(start) if start is not None else None
+        end = _to_date(end) if end is not None else None
+
+        tables = []
+        for path in self._partition_paths(start, end):
+            table = self._date_filter(pq.read_table(path, schema=SCHEMA), start, end)
+            if tickers is not None:
+                table = table.filter(pac.is_in(table["ticker"], value_set=pa.array(tickers, pa.string())))
+            if metrics is not None:
+                table = table.filter(pac.is_in(table["metric"], value_set=pa.array(metrics, pa.string())))
+            tables.append(table)
+
+        table = pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+        df = table.to_pandas()
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def read(self, date) -> pd.DataFrame | None:
+        """
+        Summary of one date, as built by build_summary_dataframe. None if it is not stored.
+        """
+        date = _to_date(date)
+        paths = self._partition_paths(date, date)
+        if not paths:
+            return None
+        table = self._date_filter(pq.read_table(paths[0], schema=SCHEMA), date, date)
+        if table.num_rows == 0:
+            return None
+        return table_to_summary(table)
+
+    def read_many(self, start=None, end=None) -> dict[datetime.date, pd.DataFrame]:
+        """
+        Summaries between two dates (both included) keyed by date, like the ``final_dict`` of main.
+        """
+        df = self.read_range(start, end)
+        return {
+            date.date(): table_to_summary(pa.Table.from_pandas(group, preserve_index=False))
+            for date, group in df.groupby("date", sort=True)
+        }
+
+    def dates(self, start=None, end=None) -> list[datetime.date]:
+        """
+        Stored dates, ascending. Only the 'date' column of the partitions is read.
+        """
+        start = _to_date(start) if start is not None else None
+        end = _to_date(end) if end is not None else None
+
+        dates: set[datetime.date] = set()
+        for path in self._partition_paths(start, end):
+            table = self._date_filter(pq.read_table(path, columns=["date"]), start, end)
+            dates.update(pac.unique(table["date"]).to_pylist())
+        return sorted(dates)
+
+#%%
+
+_summary_lock = threading.Lock()
+_summary_store: SummaryStore | None = None
+
+
+def configure_summary_store(
+    directory: str = DEFAULT_SUMMARIES_DIR,
+    partition: str = "year",
+    compression: str = DEFAULT_COMPRESSION
+) -> SummaryStore:
+    """
+    Replaces the shared summary store with one using the given settings.
+    """
+    global _summary_store
+    with _summary_lock:
+        _summary_store = SummaryStore(directory=directory, partition=partition, compression=compression)
+        return _summary_store
+
+
+def get_summary_store() -> SummaryStore:
+    """
+    Returns the shared summary store, creating it with default settings on first use.
+    """
+    global _summary_store
+    with _summary_lock:
+        if _summary_store is None:
+            _summary_store = SummaryStore()
+        return _summary_store
+
+
+def period_sources(periods_dict: dict) -> tuple[list[str], dict[str, pd.DataFrame]]:
+    """
+    For the period dropdowns: every period available, from the dataset and from
+    ``periods_dict``, ascending, and the summaries of ``periods_dict`` that are not in the
+    dataset (the ones that have to be shipped to the page). The rest are read on selection
+    with ``get_summary_store().read``.
+    """
+    stored = {str(date) for date in get_summary_store().dates()}
+    inline = {str(date): df for date, df in periods_dict.items() if str(date) not in stored}
+    return sorted(stored | set(inline)), inline
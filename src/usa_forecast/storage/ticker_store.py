@@ -0,0 +1,426 @@
+#Modules
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.calculations import precision as pr
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.storage import manifest as mf
+
+#Libraries
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+logger = logging.getLogger('myAppLogger')
+
+#%%
+
+VALID_STORAGE_FORMATS = {"csv", "parquet", "feather"}
+VALID_COMPRESSIONS = {"zstd", "lz4", "none"}
+
+DEFAULT_TICKERS_DIR = "Output/Tickers"
+DEFAULT_COMPRESSION = "zstd"
+
+FILE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+# Subfolder holding the delta segments of every ticker
+SEGMENTS_DIR = "_deltas"
+
+# Segments a ticker may accumulate before its next write compacts them into the base file
+MAX_SEGMENTS = 20
+
+# Share of changed rows above which a write rewrites the base file instead of appending
+MAX_SEGMENT_RATIO = 0.25
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    One 64-bit hash per row, covering the date and every value, indexed by date.
+    The dates are hashed in nanoseconds, whatever unit the index was read or built with.
+    """
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.unit != "ns":
+        df = df.set_axis(df.index.as_unit("ns"))
+    return pd.util.hash_pandas_object(df, index=True)
+
+
+class TickerStore:
+    """
+    On-disk store of the enriched daily data of each ticker, one file per ticker.
+
+    The 'parquet' and 'feather' formats keep the dates as a typed timestamp column and
+    every other column with its dtype, compressed, and can read a subset of the columns
+    without decoding the rest. 'csv' keeps the previous layout.
+
+    Writes only persist what changed since the data was last read or written: new and
+    modified rows go to a small delta segment next to the base file (in ``_deltas``),
+    and reads merge the segments over the base file, the latest value of a date winning.
+    Unchanged data is not written at all. Once a ticker has MAX_SEGMENTS segments, or a
+    write changes too many rows, the base file is rewritten and its segments removed.
+
+    Files written in another format by a previous run (the CSVs of older versions) are
+    converted the first time the ticker is accessed, and the old file is removed.
+
+    The date coverage, columns, row count and hash of every file are kept in a manifest
+    (see manifest.Manifest), so ``describe`` answers freshness checks without opening
+    the files.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_TICKERS_DIR,
+        storage_format: str = "parquet",
+        compression: str = DEFAULT_COMPRESSION,
+        precision: str = "float64"
+    ):
+        """
+        Parameters
+        ----------
+        directory : str
+            Folder holding one file per ticker.
+        storage_format : str
+            One of 'csv', 'parquet' or 'feather'.
+        compression : str
+            Codec of the parquet and feather files: 'zstd', 'lz4' or 'none'.
+        precision : str
+            Precision policy applied before writing (see precision.compact_frame).
+        """
+        if storage_format not in VALID_STORAGE_FORMATS:
+            raise ValueError(
+                f"Invalid storage format: {storage_format}. Expected one of: {', '.join(VALID_STORAGE_FORMATS)}"
+            )
+        if compression not in VALID_COMPRESSIONS:
+            raise ValueError(
+                f"Invalid compression: {compression}. Expected one of: {', '.join(VALID_COMPRESSIONS)}"
+            )
+
+        self.directory = Path(directory)
+        self.storage_format = storage_format
+        self.compression = compression
+        self.precision = precision
+        self.manifest = mf.Manifest(self.directory)
+        self._migration_lock = threading.Lock()
+        self._hashes_lock = threading.Lock()
+        # Row hashes of what is on disk, per ticker, for the tickers read or written by this process
+        self._known_hashes: dict[str, tuple[tuple[str, ...], pd.Series]] = {}
+
+    def path(self, ticker: str, storage_format: str | None = None) -> Path:
+        return self.directory / f"{ticker}{FILE_EXTENSIONS[storage_format or self.storage_format]}"
+
+    def segment_path(self, ticker: str, number: int, storage_format: str | None = None) -> Path:
+        return self.directory / SEGMENTS_DIR / f"{ticker}.{number:03d}{FILE_EXTENSIONS[storage_format or self.storage_format]}"
+
+    def _segment_paths(self, ticker: str, storage_format: str | None = None) -> list[Path]:
+        paths = []
+        while (path := self.segment_path(ticker, len(paths) + 1, storage_format)).exists():
+            paths.append(path)
+        return paths
+
+    def _migrate(self, ticker: str) -> None:
+        """
+        Converts the file of a ticker written in another format, if there is one.
+        """
+        if self.path(ticker).exists():
+            return
+
+        with self._migration_lock:
+            for storage_format in sorted(VALID_STORAGE_FORMATS - {self.storage_format}):
+                old_path = self.path(ticker, storage_format)
+                if not old_path.exists() or self.path(ticker).exists():
+                    continue
+                try:
+                    old_segments = self._segment_paths(ticker, storage_format)
+                    df = self._read_files([old_path] + old_segments, storage_format)
+                    self.write(ticker, df)
+                    for path in [old_path] + old_segments:
+                        path.unlink()
+                    logger.info(f"[{ticker}] Migrated {old_path.name} to {self.storage_format}.")
+                except Exception as e:
+                    logger.warning(f"[{ticker}] Could not migrate {old_path}: {e}")
+                return
+
+    def exists(self, ticker: str) -> bool:
+        self._migrate(ticker)
+        return self.path(ticker).exists()
+
+    @staticmethod
+    def _read_file(path: Path, storage_format: str, columns: list[str] | None = None) -> pd.DataFrame:
+        if storage_format == "csv":
+            usecols = None if columns is None else lambda name: name in columns or name in {"date", "Unnamed: 0"}
+            df = pd.read_csv(path, index_col=0, parse_dates=True, usecols=usecols)
+            df.index = pd.to_datetime(df.index)
+            return df
+
+        read_columns = None if columns is None else ["date"] + [column for column in columns if column != "date"]
+        if storage_format == "parquet":
+            table = pq.read_table(path, columns=read_columns)
+        else:
+            table = feather.read_table(path, columns=read_columns, memory_map=True)
+        return pc.table_to_frame(table)
+
+    def _read_files(self, paths: list[Path], storage_format: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Reads a base file and its segments, the last value of each date winning.
+        """
+        df = self._read_file(paths[0], storage_format, columns=columns)
+        if len(paths) == 1:
+            return df
+
+        df = pd.concat([df] + [self._read_file(path, storage_format, columns=columns) for path in paths[1:]])
+        return df[~df.index.duplicated(keep="last")].sort_index()
+
+    def _ticker_paths(self, ticker: str) -> list[Path]:
+        path = self.path(ticker)
+        entry = self.manifest.get(ticker, path)
+        if entry is not None and self._segments_match(ticker, entry.segments):
+            return [path] + [self.segment_path(ticker, number) for number in range(1, entry.segments + 1)]
+        return [path] + self._segment_paths(ticker)
+
+    def _segments_match(self, ticker: str, segments: int) -> bool:
+        return (
+            (segments == 0 or self.segment_path(ticker, segments).exists())
+            and not self.segment_path(ticker, segments + 1).exists()
+        )
+
+    def _valid_entry(self, ticker: str) -> mf.ManifestEntry | None:
+        entry = self.manifest.get(ticker, self.path(ticker))
+        if entry is None or not self._segments_match(ticker, entry.segments):
+            return None
+        return entry
+
+    def read(self, ticker: str, columns: list[str] | None = None) -> pd.DataFrame | None:
+        """
+        Loads the data of a ticker.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker symbol.
+        columns : list[str], optional
+            Only load these columns (the dates are always loaded as the index).
+
+        Returns
+        -------
+        pd.DataFrame | None
+            Data indexed by date, None if the ticker is not stored.
+        """
+        if not self.exists(ticker):
+            return None
+
+        paths = self._ticker_paths(ticker)
+        df = self._read_files(paths, self.storage_format, columns=columns)
+
+        if columns is None:
+            with self._hashes_lock:
+                self._known_hashes[ticker] = (tuple(df.columns), row_hashes(df))
+            if self._valid_entry(ticker) is None:
+                self.manifest.put(ticker, mf.build_entry(
+                    paths[0], self.storage_format, df.index, list(df.columns), segments=len(paths) - 1
+                ))
+
+        return df
+
+    def describe(self, ticker: str) -> mf.ManifestEntry | None:
+        """
+        Manifest entry of a stored ticker, None if it is not stored. Files without a valid
+        entry are described from their dates and schema only, and the entry is recorded.
+        """
+        if not self.exists(ticker):
+            return None
+
+        entry = self._valid_entry(ticker)
+        if entry is not None:
+            return entry
+
+        path = self.path(ticker)
+        if self.storage_format == "csv":
+            columns = list(pd.read_csv(path, index_col=0, nrows=0).columns)
+        elif self.storage_format == "parquet":
+            columns = [name for name in pq.read_schema(path).names if name != "date"]
+        else:
+            with pa.memory_map(str(path)) as source:
+                columns = [name for name in pa.ipc.open_file(source).schema.names if name != "date"]
+
+        paths = [path] + self._segment_paths(ticker)
+        dates = self._read_files(paths, self.storage_format, columns=[]).index
+        entry = mf.build_entry(path, self.storage_format, dates, columns, segments=len(paths) - 1)
+        self.manifest.put(ticker, entry)
+        return entry
+
+    def read_coverage(self, ticker: str) -> tuple[pd.Timestamp, pd.Timestamp, list[str]] | None:
+        """
+        First date, last date and columns of a stored ticker, from the manifest.
+
+        Returns
+        -------
+        tuple[pd.Timestamp, pd.Timestamp, list[str]] | None
+            None if the ticker is not stored or has no rows.
+        """
+        entry = self.describe(ticker)
+        if entry is None or entry.rows == 0:
+            return None
+        return pd.Timestamp(entry.first_date), pd.Timestamp(entry.last_date), list(entry.columns)
+
+    def save_manifest(self) -> None:
+        try:
+            self.manifest.save()
+        except OSError as e:
+            logger.warning(f"Could not save ticker manifest: {e}")
+
+    def _write_file(self, path: Path, df: pd.DataFrame) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+        try:
+            if self.storage_format == "csv":
+                df.to_csv(temp_path)
+            else:
+                table = pc.frame_to_table(df)
+                if self.storage_format == "parquet":
+                    pq.write_table(table, temp_path, compression=self.compression)
+                else:
+                    compression = "uncompressed" if self.compression == "none" else self.compression
+                    feather.write_feather(table, temp_path, compression=compression)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def _changed_rows(self, ticker: str, df: pd.DataFrame, hashes: pd.Series) -> pd.Series | None:
+        """
+        Mask of the rows of ``df`` that differ from what is on disk, or None when the
+        difference cannot be written as a segment (unknown content, other columns,
+        removed dates).
+        """
+        if self._valid_entry(ticker) is None:
+            return None
+
+        with self._hashes_lock:
+            known = self._known_hashes.get(ticker)
+        if known is None:
+            # Loaded from the panel or by another process: reading is cheaper than rewriting
+            self.read(ticker)
+            with self._hashes_lock:
+                known = self._known_hashes.get(ticker)
+
+        known_columns, known_hashes = known
+        if known_columns != tuple(df.columns) or not known_hashes.index.isin(hashes.index).all():
+            return None
+
+        stored = known_hashes.reindex(hashes.index)
+        return stored.isna() | (stored.to_numpy() != hashes.to_numpy())
+
+    def write(self, ticker: str, data: pd.DataFrame | pa.Table, compact: bool = False) -> None:
+        """
+        Persists the data of a ticker, writing only the rows that changed since it was
+        last read or written (see the class docstring). Every file is replaced atomically.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker symbol.
+        data : pd.DataFrame | pa.Table | LazyTargetFrame
+            DataFrame indexed by date, or table with a 'date' column. Of a LazyTargetFrame
+            only the stored columns are written.
+        compact : bool
+            Rewrite the base file and drop the segments even if an append would do.
+        """
+        if isinstance(data, lt.LazyTargetFrame):
+            data = data.base
+        df = pc.table_to_frame(data) if isinstance(data, pa.Table) else data
+        df = pr.compact_frame(df.sort_index(), self.precision)
+        hashes = row_hashes(df)
+        path = self.path(ticker)
+
+        changed = None if compact else self._changed_rows(ticker, df, hashes)
+        if changed is not None and not changed.any():
+            return
+
+        entry = self._valid_entry(ticker) if changed is not None else None
+        if (
+            entry is not None
+            and entry.segments < MAX_SEGMENTS
+            and changed.sum() <= MAX_SEGMENT_RATIO * len(df)
+        ):
+            segments = entry.segments + 1
+            self._write_file(self.segment_path(ticker, segments), df[changed.to_numpy()])
+            new_entry = mf.build_entry(
+                path, self.storage_format, df.index, list(df.columns),
+                segments=segments, content_hash=entry.content_hash
+            )
+        else:
+            self._write_file(path, df)
+            for segment in self._segment_paths(ticker):
+                segment.unlink(missing_ok=True)
+            new_entry = mf.build_entry(path, self.storage_format, df.index, list(df.columns))
+
+        with self._hashes_lock:
+            self._known_hashes[ticker] = (tuple(df.columns), hashes)
+        self.manifest.put(ticker, new_entry)
+
+    def write_many(self, results: dict[str, pd.DataFrame | pa.Table]) -> None:
+        for ticker, data in results.items():
+            self.write(ticker, data)
+
+    def compact(self, ticker: str) -> None:
+        """
+        Merges the segments of a ticker into its base file.
+        """
+        if len(self._ticker_paths(ticker)) > 1:
+            self.write(ticker, self.read(ticker), compact=True)
+
+    def compact_all(self) -> None:
+        """
+        Merges the segments of every ticker that has any into its base file.
+        """
+        segments_dir = self.directory / SEGMENTS_DIR
+        if not segments_dir.is_dir():
+            return
+        extension = FILE_EXTENSIONS[self.storage_format]
+        tickers = {
+            path.name[:-len(extension)].rsplit(".", 1)[0]
+            for path in segments_dir.glob(f"*{extension}")
+        }
+        for ticker in sorted(tickers):
+            self.compact(ticker)
+        self.save_manifest()
+
+#%%
+
+_store_lock = threading.Lock()
+_store: TickerStore | None = None
+
+
+def configure_store(
+    directory: str = DEFAULT_TICKERS_DIR,
+    storage_format: str = "parquet",
+    compression: str = DEFAULT_COMPRESSION,
+    precision: str = "float64"
+) -> TickerStore:
+    """
+    Replaces the shared ticker store with one using the given settings.
+    """
+    global _store
+    with _store_lock:
+        _store = TickerStore(
+            directory=directory,
+            storage_format=storage_format,
+            compression=compression,
+            precision=precision
+        )
+        logger.debug(f"Ticker store in '{storage_format}' format at {directory}")
+        return _store
+
+
+def get_store() -> TickerStore:
+    """
+    Returns the shared ticker store, creating it with default settings on first use.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TickerStore()
+        return _store
@@ -1,16 +1,29 @@
 #Modules
 from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download import call_ledger as cl
 from src.usa_forecast.calculations import lags_adding as la
 from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.calculations import precision as pr
+from src.usa_forecast.calculations import lazy_targets as lt
 from src.usa_forecast.aux_functions import save_read_csv_excel as sr
 from src.usa_forecast.services import historical_analysis as ha
+from src.usa_forecast.services import async_download as ad
+from src.usa_forecast.services import incremental_update as iu
+from src.usa_forecast.services import download_scheduler as ds
+from src.usa_forecast.storage import ticker_store as ts
+from src.usa_forecast.storage import panel_store as ps
+from src.usa_forecast.storage import summary_store as ss
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import sql_store as sq
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.storage import output_archive as oa
 from src.usa_forecast.entities.configuration import Configuration
 
 #Libraries
 import logging
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import os
+import pyarrow as pa
 from datetime import date
 
 logger = logging.getLogger('myAppLogger')
@@ -18,19 +31,21 @@ logger = logging.getLogger('myAppLogger')
 #%%
 
 def is_data_up_to_date(
-    file_path: str,
+    ticker: str,
     start_date: date,
     end_date: date,
     lags: tuple[int, ...],
-    stay_update: str
+    stay_update: str,
+    panel: ps.Panel | None = None
 ) -> bool:
     """
-    Checks if the local file exists and is valid for use without re-downloading data.
+    Checks if the stored ticker data is valid for use without re-downloading data.
+    Answered from the store manifest (or the panel), without reading the data.
 
     Parameters
     ----------
-    file_path : str
-        Path to the local ticker CSV file.
+    ticker : str
+        Ticker symbol, looked up in the shared ticker store.
     start_date : date
         Required start date for the analysis.
     end_date : date
@@ -39,22 +54,31 @@ def is_data_up_to_date(
         Tuple of lag values (e.g., (5, 10, 15)).
     stay_update : str
         String indicating whether to use local data if available ("True" or "False").
+    panel : Panel, optional
+        When given, the ticker is looked up in the panel instead of the ticker store.
 
     Returns
     -------
     bool
-        True if file exists, contains required date range and columns. False otherwise.
+        True if the ticker is stored, contains required date range and columns. False otherwise.
     """
-    if stay_update != "True" or not os.path.exists(file_path):
+    if stay_update != "True":
         return False
 
+    store = ts.get_store()
+
     try:
-        # logger.info(f"Reading data from {file_path}")
-        df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-        df.index = pd.to_datetime(df.index)
+        if panel is not None:
+            dates = panel.coverage(ticker)
+            coverage = None if dates is None else (*dates, panel.columns)
+        else:
+            coverage = store.read_coverage(ticker)
+        if coverage is None:
+            return False
 
-        file_min_date = df.index.min().date()
-        file_max_date = df.index.max().date()
+        file_min_date, file_max_date, columns = coverage
+        file_min_date = file_min_date.date()
+        file_max_date = file_max_date.date()
 
         start_date = pd.to_datetime(start_date).date()
         end_date = pd.to_datetime(end_date).date()
@@ -64,35 +88,61 @@ def is_data_up_to_date(
         has_dates = file_min_date <= start_date and file_max_date >= end_date
 
         required_columns = {f"P{lag}" for lag in lags} | {"52_week_low"}
-        has_columns = required_columns.issubset(df.columns)
+        has_columns = required_columns.issubset(columns)
 
         return has_dates and has_columns
 
     except Exception as e:
-        logger.error(f"Error in {file_path}: {e}")
+        logger.error(f"Error in {store.path(ticker)}: {e}")
         return False
 
 def process_ticker(ticker: str,
                    start_date: str,
                    end_date: str,
                    fmp_api_key: str,
-                   window_shift: tuple[int, ...]
-                   ) -> tuple[str, pd.DataFrame | None]:
+                   window_shift: tuple[int, ...],
+                   max_retries: int = 0,
+                   compute_engine: str = "pandas",
+                   chunk_years: int = 0
+                   ) -> tuple[str, pd.DataFrame | pa.Table | None]:
     """
     :param ticker:
     :param start_date:
     :param end_date:
     :param fmp_api_key:
     :param window_shift:
+    :param max_retries: retries with jittered backoff on 429, 5xx, timeout and network errors, per date chunk
+    :param compute_engine: "pandas", or "arrow" to fetch and compute on a pa.Table, which is returned as is
+    :param chunk_years: years per concurrently downloaded date chunk, 0 for a single request
     :return:
     """
 
     try:
-        data = fmd.fetch_eod_price_data(
+        if compute_engine == "arrow":
+            table = fmd.fetch_eod_history(
+                ticker=ticker,
+                start_date=start_date,
+                end_date=end_date,
+                api_key=fmp_api_key,
+                chunk_years=chunk_years,
+                max_retries=max_retries,
+                as_arrow=True
+            )
+
+            table = la.add_lagged_return_columns_arrow(table=table, column="close", lags=window_shift)
+
+            table = pc.add_52_week_low_column_arrow(table=table, low_column="low", output_column="52_week_low")
+
+            logger.info(f"Done for {ticker}")
+            return ticker, table
+
+        data = fmd.fetch_eod_history(
             ticker=ticker,
             start_date=start_date,
             end_date=end_date,
-            api_key=fmp_api_key
+            api_key=fmp_api_key,
+            chunk_years=chunk_years,
+            max_retries=max_retries
         )
 
         df_lagged = la.add_lagged_return_columns(
@@ -115,75 +165,315 @@ def process_ticker(ticker: str,
         logger.warning(f"Error processing ticker {ticker}: {e}")
         return ticker, None
 
+def process_ticker_delta(ticker: str,
+                         cached: pd.DataFrame,
+                         end_date: str,
+                         fmp_api_key: str,
+                         window_shift: tuple[int, ...],
+                         max_retries: int = 0
+                         ) -> tuple[str, pd.DataFrame | None]:
+    """
+    Downloads the days from the last cached date on and merges them into the cached data,
+    the downloaded bars replacing the stored ones of the same date.
+
+    Parameters
+    ----------
+    ticker : str
+        The stock ticker symbol.
+    cached : pd.DataFrame
+        Cached, already enriched data of the ticker.
+    end_date : str
+        End date in 'YYYY-MM-DD' format.
+    fmp_api_key : str
+        Financial Modeling Prep API key.
+    window_shift : tuple[int, ...]
+        Lags to compute.
+    max_retries : int
+        Retries with jittered backoff on 429, 5xx, timeout and network errors.
+
+    Returns
+    -------
+    tuple[str, pd.DataFrame | None]
+        The ticker and its extended data, or None if the delta could not be downloaded.
+    """
+    try:
+        new_data = rl.call_with_retries(
+            lambda: fmd.fetch_eod_price_data(
+                ticker=ticker,
+                start_date=iu.delta_start_date(cached),
+                end_date=end_date,
+                api_key=fmp_api_key
+            ),
+            max_retries=max_retries,
+            description=ticker
+        )
+
+        df_final = iu.append_delta(cached=cached, new_data=new_data, window_shift=window_shift)
+
+        logger.info(f"Done for {ticker} (+{len(df_final) - len(cached)} rows)")
+        return ticker, df_final
+
+    except Exception as e:
+        logger.warning(f"Error processing ticker delta {ticker}: {e}")
+        return ticker, None
+
+def configure_runtime(configuration: Configuration) -> None:
+    """
+    Sets up the shared download settings, background writer, output layer and stores
+    from the configuration. Run before anything reads or writes them: by main, and by a
+    warm restart that skips main.
+    """
+    fmd.configure(configuration=configuration)
+    # Espera las escrituras pendientes de la corrida anterior antes de leer los archivos
+    bw.configure_writer(enabled=configuration.background_writes == "True")
+    of.configure_outputs()
+    ts.configure_store(
+        storage_format=configuration.storage_format.lower(),
+        compression=configuration.storage_compression.lower(),
+        precision=configuration.precision.lower()
+    )
+    ss.configure_summary_store(
+        partition=configuration.summary_partition.lower(),
+        compression=configuration.storage_compression.lower()
+    )
+    oa.configure_archives(
+        partition=configuration.summary_partition.lower(),
+        compression=configuration.storage_compression.lower(),
+        compaction_days=configuration.compaction_days,
+        retention_days=configuration.retention_days
+    )
+    if configuration.sql_store == "True":
+        sq.configure_sql_store()
+    else:
+        sq.configure_sql_store(None)
+
 def main(configuration: Configuration) -> tuple[dict[str, pd.DataFrame | None], dict[str, pd.DataFrame] | None]:
+    configure_runtime(configuration=configuration)
+    writer = bw.get_writer()
+    outputs = of.get_outputs()
+    store = ts.get_store()
+    summary_store = ss.get_summary_store()
+    summary_archive = oa.get_summary_archive()
+    sql_store = sq.get_sql_store()
+
     start_date_str = configuration.start_date.isoformat()
     end_date_str = configuration.end_date.isoformat()
 
-    results: dict[str, pd.DataFrame] = {}
+    compute_engine = configuration.compute_engine.lower()
+    # Sólo OHLCV y lags en disco y memoria; los objetivos se calculan al usarlos
+    lazy = configuration.lazy_targets == "True"
+
+    results: dict[str, pd.DataFrame | pa.Table] = {}
     tickers_to_download = []
+    cached_for_delta: dict[str, pd.DataFrame] = {}
+
+    def store_result(ticker: str, df: pd.DataFrame | pa.Table | None) -> None:
+        if df is not None:
+            results[ticker] = df
+            # Arrow tables are written once, already converted, by the final export
+            if isinstance(df, pd.DataFrame):
+                writer.submit(ticker, store.write, ticker, df)
+        elif ticker in cached_for_delta:
+            results[ticker] = cached_for_delta[ticker]  # fallback con datos anteriores
+
+    # Un solo mmap para todo el universo en vez de un archivo por ticker
+    panel = ps.get_panel_store().open() if configuration.panel_store == "True" else None
 
     for ticker in configuration.tickers:
-        file_path = f"Output/Tickers/{ticker}.csv"
+        if panel is not None and is_data_up_to_date(
+            ticker=ticker,
+            start_date=pd.Timestamp(configuration.start_date),
+            end_date=pd.Timestamp(configuration.end_date),
+            lags=configuration.window_shift,
+            stay_update=configuration.stay_update,
+            panel=panel
+        ):
+            results[ticker] = panel.table(ticker) if compute_engine == "arrow" else panel[ticker]
+            logger.info(f"[{ticker}] Loaded from panel.")
+            continue
 
         if is_data_up_to_date(
-            file_path=file_path,
+            ticker=ticker,
             start_date=pd.Timestamp(configuration.start_date),
             end_date=pd.Timestamp(configuration.end_date),
             lags=configuration.window_shift,
             stay_update=configuration.stay_update
         ):
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            df = store.read(ticker)
             results[ticker] = df
             logger.info(f"[{ticker}] Loaded from local file.")
-        else:
-            tickers_to_download.append(ticker)
+            continue
+
+        if configuration.stay_update == "True" and configuration.incremental_download == "True":
+            cached = iu.load_cached_for_delta(
+                ticker=ticker,
+                start_date=configuration.start_date,
+                lags=configuration.window_shift
+            )
+            if cached is not None:
+                cached_for_delta[ticker] = cached
+                continue
+
+        tickers_to_download.append(ticker)
+
+    # Calls each ticker would make, responses still in the cache are free
+    full_calls = {
+        ticker: fmd.projected_history_calls(ticker, start_date_str, end_date_str, configuration.chunk_years)
+        for ticker in tickers_to_download
+    }
+    delta_calls = {
+        ticker: fmd.projected_history_calls(ticker, iu.delta_start_date(cached), end_date_str)
+        for ticker, cached in cached_for_delta.items()
+    }
+    ledger = cl.get_ledger()
+    strategy = ledger.plan(
+        projected_calls=sum(full_calls.values()) + sum(delta_calls.values()),
+        priority_calls=sum(full_calls.values()),
+        description="download"
+    )
+
+    if strategy != cl.STRATEGY_FULL:
+        # Presupuesto casi agotado: se usan los datos locales aunque estén desfasados
+        stale = [ticker for ticker, calls in delta_calls.items() if calls]
+        if stale:
+            logger.warning(f"Serving {', '.join(stale)} from local files without their latest days.")
+        for ticker in stale:
+            results[ticker] = cached_for_delta.pop(ticker)
+    if strategy == cl.STRATEGY_CACHE_ONLY:
+        skipped = [ticker for ticker, calls in full_calls.items() if calls]
+        if skipped:
+            logger.warning(f"Skipping download of {', '.join(skipped)}: daily call budget nearly used up.")
+        tickers_to_download = [ticker for ticker, calls in full_calls.items() if not calls]
+
+    # Tickers without any cached data first, then the most outdated ones
+    scheduler = ds.DownloadScheduler()
+    for ticker in tickers_to_download:
+        scheduler.push(ticker)
+    for ticker, cached in cached_for_delta.items():
+        scheduler.push(ticker, staleness=ds.staleness_days(cached.index[-1]))
+
+    if configuration.download_engine.lower() == "asyncio":
+        downloaded = ad.download_scheduled(
+            scheduler=scheduler,
+            tickers=tickers_to_download,
+            cached_data=cached_for_delta,
+            start_date=start_date_str,
+            end_date=end_date_str,
+            fmp_api_key=configuration.fmp_api_key,
+            window_shift=configuration.window_shift,
+            concurrency=configuration.download_concurrency,
+            timeout=configuration.request_timeout,
+            max_retries=configuration.max_retries,
+            compute_engine=compute_engine,
+            chunk_years=configuration.chunk_years
+        )
 
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {
-            executor.submit(
-                process_ticker,
+        for ticker, df in downloaded.items():
+            store_result(ticker=ticker, df=df)
+    else:
+        def download(ticker: str) -> pd.DataFrame | pa.Table | None:
+            if ticker in cached_for_delta:
+                return process_ticker_delta(
+                    ticker,
+                    cached_for_delta[ticker],
+                    end_date_str,
+                    configuration.fmp_api_key,
+                    configuration.window_shift,
+                    configuration.max_retries
+                )[1]
+            return process_ticker(
                 ticker,
                 start_date_str,
                 end_date_str,
                 configuration.fmp_api_key,
-                configuration.window_shift
-            ): ticker for ticker in tickers_to_download
-        }
+                configuration.window_shift,
+                configuration.max_retries,
+                compute_engine,
+                configuration.chunk_years
+            )[1]
+
+        for ticker, df in ds.run_threaded(
+            scheduler=scheduler,
+            func=download,
+            max_workers=configuration.download_concurrency
+        ):
+            store_result(ticker=ticker, df=df)
+
+    ledger.save()
+
+    failed = [ticker for ticker in configuration.tickers if ticker not in results]
+    if failed:
+        logger.warning(f"Tickers left out after {configuration.max_retries} retries: {', '.join(failed)}")
 
-        for future in as_completed(futures):
-            ticker, df = future.result()
-            if df is not None:
-                results[ticker] = df
-                df.to_csv(f"Output/Tickers/{ticker}.csv")
+    # Orden de la configuración, no el de llegada: las salidas no cambian entre corridas
+    results = {ticker: results[ticker] for ticker in configuration.tickers if ticker in results}
 
     final_results = pc.process_all_tickers(
         data_dict=results,
         column="close",
         lags=configuration.window_shift,
-        lookback=100
+        lookback=lt.LOOKBACK,
+        compute_engine=compute_engine,
+        lazy=lazy
     )
 
+    if configuration.precision.lower() == "float32" and not lazy:
+        compact_results = pr.compact_results(final_results)
+        # El reporte compara contra los float64 y se calcula fuera del camino crítico
+        writer.submit(
+            "precision report",
+            pr.write_savings_report,
+            final_results,
+            compact_results,
+            "Output/precision_report.csv",
+            compression=configuration.storage_compression.lower()
+        )
+        final_results = compact_results
+
     all_dates = final_results[next(iter(final_results))].index
     dates_to_process = ha.generate_summary_dates(all_dates=all_dates, configuration=configuration)
 
     summary_mode = configuration.summary_mode.lower()
+    summary_storage = configuration.summary_storage.lower()
     final_dict: dict[str, pd.DataFrame] = {}
 
     for date in dates_to_process:
         snapshot_dict = ha.extract_snapshot(data_dict=final_results, snapshot_date=date)
         summary_df = pc.build_summary_dataframe(data_dict=snapshot_dict)
-        summary_df.to_csv(f"Output/Historical_Summaries/{date.date()}.csv")
         final_dict[date.date()] = summary_df
 
     if summary_mode != "latest":
         latest_date = max(df.index.max() for df in final_results.values())
         latest_snapshot = ha.extract_snapshot(data_dict=final_results, snapshot_date=latest_date)
         latest_summary_df = pc.build_summary_dataframe(data_dict=latest_snapshot)
-        latest_summary_df.to_csv(f"Output/Historical_Summaries/{latest_date.date()}.csv")
         final_dict[latest_date.date()] = latest_summary_df
 
-    sr.export_results_to_csv(results=final_results, output_dir="Output/Tickers/")
+    if summary_storage == "dataset":
+        summary_store.write(final_dict)
+    else:
+        # Un csv por fecha reciente; las fechas viejas van directo al archivo compactado
+        writer.submit("summary files", summary_archive.write, final_dict)
+
+    # Los archivos por ticker se escriben en segundo plano; el dashboard puede arrancar ya
+    writer.submit(
+        "ticker files",
+        sr.export_results_to_csv,
+        results=final_results,
+        output_dir="Output/Tickers/",
+        store=store
+    )
+    writer.submit("ticker manifest", store.save_manifest)
+
+    if configuration.panel_store == "True":
+        writer.submit("panel", ps.write_panel, final_results)
+
+    if sql_store is not None:
+        writer.submit("sql store", sql_store.write_results, final_results)
+        writer.submit("sql summaries", sql_store.write_summaries, final_dict)
+
+    writer.submit("output compaction", oa.run_compaction)
+    writer.submit("output manifest", outputs.save)
 
     logger.info("Done for all tickers")
 
-    return final_dict, final_results
\ No newline at end of file
+    return final_dict, lt.LazyResults(final_results) if lazy else final_results
\ No newline at end of file
@@ -0,0 +1,162 @@
+from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.data_download import call_ledger as cl
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import fmp_standin as fs
+from src.usa_forecast.data_download import http_session as hs
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download import response_cache as rc
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import output_archive as oa
+from src.usa_forecast.storage import output_files as of
+from src.usa_forecast.storage import panel_store as ps
+from src.usa_forecast.storage import sql_store as sq
+from src.usa_forecast.storage import summary_store as ss
+from src.usa_forecast.storage import ticker_store as ts
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10, 15)
+
+# Module-level shared objects set up by fc.configure_runtime, empty until first use
+RUNTIME_SINGLETONS = [
+    (hs, "_session"),
+    (rc, "_cache"),
+    (rl, "_limiter"),
+    (cl, "_ledger"),
+    (fmd, "_chunk_executor"),
+    (bw, "_writer"),
+    (of, "_outputs"),
+    (ts, "_store"),
+    (ps, "_panel_store"),
+    (ss, "_summary_store"),
+    (oa, "_summary_archive"),
+    (oa, "_daily_archive"),
+    (sq, "_sql_store"),
+]
+
+
+def make_prices(
+    rows: int = 300,
+    start: str = "2023-01-02",
+    end: str | None = None,
+    seed: int = 0,
+    volatility: float = 0.01
+) -> pd.DataFrame:
+    """
+    Daily OHLCV bars of a random walk indexed by business date: ``rows`` bars from
+    ``start``, or every business day from ``start`` to ``end``.
+    """
+    dates = pd.bdate_range(start, end) if end is not None else pd.bdate_range(start, periods=rows)
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, volatility, len(dates)))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.02, len(dates))),
+            "low": close * (1 - rng.uniform(0, 0.02, len(dates))),
+            "close": close,
+            "volume": rng.integers(1_000, 100_000, len(dates)),
+        },
+        index=pd.DatetimeIndex(dates, name="date"),
+    )
+
+
+def add_stored_columns(df: pd.DataFrame, lags: tuple[int, ...] = LAGS) -> pd.DataFrame:
+    """
+    Adds the lag return columns and the 52-week low, the columns main stores per ticker.
+    """
+    df = la.add_lagged_return_columns(df=df, column="close", lags=lags)
+    return pc.add_52_week_low_column(df=df, column="low", window_days=252, output_column="52_week_low")
+
+
+def make_ticker_frame(lags: tuple[int, ...] = LAGS, **kwargs) -> pd.DataFrame:
+    """
+    A ticker as stored by main: make_prices bars (same keyword arguments) with their
+    stored columns.
+    """
+    return add_stored_columns(make_prices(**kwargs), lags)
+
+
+@pytest.fixture
+def prices():
+    return make_prices
+
+
+@pytest.fixture
+def enrich():
+    return add_stored_columns
+
+
+@pytest.fixture
+def ticker_frame():
+    return make_ticker_frame
+
+
+@pytest.fixture
+def ticker_store(tmp_path, monkeypatch):
+    """
+    The shared ticker store in its default folder, under ``tmp_path`` as working
+    directory. The store in use before the test is put back after it.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ts, "_store", None)
+    return ts.configure_store()
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """
+    The shared output layer with its manifest under ``tmp_path``, in place of the one
+    in use before the test.
+    """
+    outputs = of.OutputFiles(manifest_path=tmp_path / "output_manifest.json")
+    monkeypatch.setattr(of, "_outputs", outputs)
+    return outputs
+
+
+def close_runtime() -> None:
+    # Threads and sockets of the shared objects a test started
+    if bw._writer is not None:
+        bw._writer.close()
+    if hs._session is not None:
+        hs._session.close()
+    if fmd._chunk_executor is not None:
+        fmd._chunk_executor.shutdown(wait=False)
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """
+    Empties every shared singleton, with ``tmp_path`` as working directory, and returns
+    the function doing it so a test can empty them again, as a restarted process finds
+    them. What a test starts is closed and the previous singletons put back after it.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fmd, "_base_url", fmd._base_url)
+    monkeypatch.setattr(fmd, "_chunk_workers", fmd._chunk_workers)
+    for module, name in RUNTIME_SINGLETONS:
+        monkeypatch.setattr(module, name, None)
+
+    def restart() -> None:
+        close_runtime()
+        for module, name in RUNTIME_SINGLETONS:
+            setattr(module, name, None)
+
+    yield restart
+    close_runtime()
+
+
+@pytest.fixture
+def standin(runtime):
+    """
+    A local FMP stand-in server with the download layer pointed at it, on the emptied
+    runtime of ``runtime``.
+    """
+    with fs.FmpStandInServer() as server:
+        fmd.set_base_url(server.base_url)
+        yield server
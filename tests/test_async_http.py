@@ -0,0 +1,134 @@
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import fmp_standin as fs
+from src.usa_forecast.data_download import response_cache as rc
+from src.usa_forecast.data_download.async_http import AsyncHTTPClient
+
+import asyncio
+import json
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+import pandas as pd
+import pytest
+
+#%%
+
+FRAMINGS = ["length", "chunked", "close"]
+
+
+def run(coroutine_function):
+    # Each test gets its own event loop and client, closed at the end
+    async def main():
+        client = AsyncHTTPClient(max_per_host=2, timeout=5)
+        try:
+            return await coroutine_function(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+def host_key(url: str) -> tuple[str, str, int]:
+    parts = urlsplit(url)
+    return parts.scheme, parts.hostname, parts.port
+
+
+@pytest.mark.parametrize("framing", FRAMINGS)
+def test_every_body_framing_is_read_whole(standin, framing):
+    standin.framing = framing
+    url = fmd.build_eod_url("AAPL", "2020-01-01", "2024-01-31", api_key="key")
+
+    async def fetch(client):
+        chunks = [chunk async for chunk in client.iter_chunks(url, chunk_size=1024)]
+        return chunks, len(client._idle[host_key(url)])
+
+    chunks, pooled = run(fetch)
+
+    assert json.loads(b"".join(chunks)) == fs.synthetic_eod("AAPL", "2020-01-01", "2024-01-31")
+    # Only a delimited body leaves the connection reusable
+    assert pooled == (0 if framing == "close" else 1)
+
+
+@pytest.mark.parametrize("framing", FRAMINGS)
+def test_sequential_requests_share_the_connection(standin, framing):
+    standin.framing = framing
+    urls = [fmd.build_1m_url(ticker, api_key="key") for ticker in ("AAPL", "MSFT", "NVDA")]
+
+    async def fetch(client):
+        bodies = [await client.get(url) for url in urls]
+        return bodies, len(client._idle[host_key(urls[0])])
+
+    bodies, pooled = run(fetch)
+
+    assert [json.loads(body) for body in bodies] == [fs.synthetic_1min(t) for t in ("AAPL", "MSFT", "NVDA")]
+    assert pooled == (0 if framing == "close" else 1)
+
+
+@pytest.mark.parametrize("framing", FRAMINGS)
+def test_error_status_raises_after_reading_the_body(standin, framing):
+    standin.framing = framing
+    standin.throttle_rate = 1.0
+    url = fmd.build_1m_url("AAPL", api_key="key")
+
+    async def fetch(client):
+        with pytest.raises(HTTPError) as error:
+            await client.get(url)
+        return error.value, client._host_slots[host_key(url)]._value
+
+    error, free_slots = run(fetch)
+
+    assert error.code == 429
+    assert error.headers["Retry-After"] == "1"
+    assert free_slots == 2
+
+
+def test_concurrent_requests_are_capped_per_host(standin):
+    standin.latency = 0.1
+    url = fmd.build_1m_url("AAPL", api_key="key")
+
+    async def fetch(client):
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(client.get(url) for _ in range(4)))
+        return asyncio.get_running_loop().time() - started, len(client._idle[host_key(url)])
+
+    elapsed, pooled = run(fetch)
+
+    assert elapsed >= 0.2
+    assert pooled == 2
+
+
+def test_parse_error_releases_the_slot(standin, monkeypatch):
+    rc.configure_cache(mode="off")
+    url = fmd.build_eod_url("AAPL", "2020-01-01", "2024-01-31", api_key="key")
+
+    class RefusingParser(fmd.EodColumnParser):
+        def feed(self, chunk: bytes) -> None:
+            raise ValueError("refused")
+
+    monkeypatch.setattr(fmd, "EodColumnParser", RefusingParser)
+
+    async def fetch(client):
+        with pytest.raises(ValueError) as error:
+            await fmd.fetch_eod_price_data_async(
+                client=client, ticker="AAPL", start_date="2020-01-01", end_date="2024-01-31", api_key="key"
+            )
+        # Released while the error, and the frames of its traceback, are still alive
+        assert error.value is not None
+        return client._host_slots[host_key(url)]._value
+
+    assert run(fetch) == 2
+
+
+@pytest.mark.parametrize("framing", FRAMINGS)
+def test_async_download_matches_the_threaded_one(standin, framing):
+    standin.framing = framing
+    rc.configure_cache(mode="off")
+
+    async def fetch(client):
+        return await fmd.fetch_eod_price_data_async(
+            client=client, ticker="MSFT", start_date="2022-01-01", end_date="2023-12-31", api_key="key"
+        )
+
+    expected = fmd.fetch_eod_price_data(ticker="MSFT", start_date="2022-01-01", end_date="2023-12-31", api_key="key")
+
+    pd.testing.assert_frame_equal(run(fetch), expected)
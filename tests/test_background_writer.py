@@ -0,0 +1,116 @@
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import http_session as hs
+from src.usa_forecast.exceptions import BackgroundWriteError
+from src.usa_forecast.storage import background_writer as bw
+
+import threading
+import time
+from urllib.error import HTTPError
+
+import pytest
+
+#%%
+
+
+@pytest.fixture
+def writer():
+    writer = bw.BackgroundWriter(max_pending=4)
+    yield writer
+    writer.close()
+
+
+def test_flush_waits_for_every_write_in_order(writer):
+    gate = threading.Event()
+    written = []
+
+    writer.submit("first", lambda: (gate.wait(5), written.append(1)))
+    writer.submit("second", written.append, 2)
+    assert writer.pending == 2 and written == []
+
+    gate.set()
+    assert writer.flush() == []
+
+    assert written == [1, 2]
+    assert writer.pending == 0
+
+
+def test_throttled_download_raises_through_flush(standin, writer):
+    standin.throttle_rate = 1.0
+    url = fmd.build_1m_url("AAPL", api_key="key")
+    written = []
+
+    writer.submit("AAPL 1min", lambda: written.append(hs.get_session().get(url)))
+    writer.submit("summary", written.append, "summary")
+
+    with pytest.raises(BackgroundWriteError, match="AAPL 1min"):
+        writer.flush(raise_errors=True)
+
+    # A failed write does not stop the ones after it, and is reported only once
+    assert written == ["summary"]
+    assert writer.flush(raise_errors=True) == []
+
+
+def test_flush_returns_the_failures_since_the_previous_flush(standin, writer):
+    standin.throttle_rate = 1.0
+    url = fmd.build_1m_url("AAPL", api_key="key")
+
+    writer.submit("AAPL 1min", hs.get_session().get, url)
+    errors = writer.flush()
+
+    assert [description for description, _ in errors] == ["AAPL 1min"]
+    assert isinstance(errors[0][1], HTTPError) and errors[0][1].code == 429
+    assert writer.flush() == []
+
+
+def test_full_queue_blocks_the_producer():
+    writer = bw.BackgroundWriter(max_pending=1)
+    gate = threading.Event()
+    writer.submit("busy", gate.wait, 5)
+    # The worker holds the first write, the second one fills the queue
+    while writer._queue.qsize():
+        time.sleep(0.01)
+    writer.submit("queued", lambda: None)
+
+    blocked = threading.Thread(target=writer.submit, args=("blocked", lambda: None))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    gate.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    writer.close()
+
+
+def test_disabled_writer_writes_inside_submit():
+    writer = bw.BackgroundWriter(enabled=False)
+    written = []
+
+    writer.submit("inline", written.append, 1)
+
+    assert written == [1]
+    assert writer._thread is None
+
+
+def test_closed_writer_restarts_on_submit(writer):
+    written = []
+    writer.submit("first", written.append, 1)
+    writer.close()
+
+    writer.submit("second", written.append, 2)
+    writer.flush()
+
+    assert written == [1, 2]
+
+
+def test_configuring_a_new_writer_flushes_the_previous_one(runtime):
+    gate = threading.Event()
+    written = []
+    previous = bw.get_writer()
+    previous.submit("slow", lambda: (gate.wait(0.2), written.append(1)))
+
+    writer = bw.configure_writer(enabled=False)
+
+    assert written == [1]
+    assert bw.get_writer() is writer and writer is not previous
+    assert bw.flush() == []
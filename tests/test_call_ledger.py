@@ -0,0 +1,93 @@
+from src.usa_forecast.data_download import call_ledger as cl
+from src.usa_forecast.exceptions import CallBudgetExceededError
+
+import datetime
+import json
+
+import pytest
+
+#%%
+
+
+def ledger_with(used: int, daily_budget: int) -> cl.CallLedger:
+    ledger = cl.CallLedger(path=None, daily_budget=daily_budget)
+    if used:
+        ledger.record("eod", used)
+    return ledger
+
+
+def test_without_budget_every_run_is_full():
+    ledger = ledger_with(used=10_000, daily_budget=0)
+
+    assert ledger.plan(projected_calls=10 ** 6) == cl.STRATEGY_FULL
+    assert ledger.remaining() == float("inf")
+    ledger.check("eod")
+
+
+@pytest.mark.parametrize("used, projected, priority, expected", [
+    (0, 900, 0, cl.STRATEGY_FULL),
+    (0, 950, 0, cl.STRATEGY_FULL),
+    # Over the 95% a bulk run may use, the reserve is kept for the dashboard
+    (0, 951, 0, cl.STRATEGY_CACHE_ONLY),
+    (0, 951, 10, cl.STRATEGY_PRIORITY_ONLY),
+    (900, 60, 50, cl.STRATEGY_PRIORITY_ONLY),
+    (900, 60, 51, cl.STRATEGY_CACHE_ONLY),
+    (960, 1, 1, cl.STRATEGY_CACHE_ONLY),
+    (950, 0, 0, cl.STRATEGY_FULL),
+])
+def test_plan_under_budget(used, projected, priority, expected):
+    ledger = ledger_with(used=used, daily_budget=1000)
+
+    assert ledger.plan(projected_calls=projected, priority_calls=priority) == expected
+
+
+def test_check_raises_once_the_budget_is_used_up():
+    ledger = ledger_with(used=99, daily_budget=100)
+    ledger.check("eod")
+
+    ledger.record("quote")
+    assert ledger.remaining() == 0
+    with pytest.raises(CallBudgetExceededError):
+        ledger.check("eod")
+
+
+def test_counts_are_per_endpoint_and_day():
+    ledger = ledger_with(used=3, daily_budget=0)
+    ledger.record("quote", 2)
+
+    assert ledger.used_today() == 5
+    assert ledger.used_today("quote") == 2
+    assert ledger.usage_today() == {"eod": 3, "quote": 2}
+
+
+def test_counts_survive_a_restart_and_old_days_are_dropped(tmp_path):
+    path = tmp_path / "ledger.json"
+    old_day = (datetime.date.today() - datetime.timedelta(days=cl.HISTORY_DAYS + 1)).isoformat()
+    path.write_text(json.dumps({old_day: {"eod": 50}}))
+
+    ledger = cl.CallLedger(path=str(path), daily_budget=100)
+    ledger.record("eod", 7)
+    ledger.save()
+
+    restarted = cl.CallLedger(path=str(path), daily_budget=100)
+    assert restarted.used_today("eod") == 7
+    assert old_day not in json.loads(path.read_text())
+
+
+def test_ledger_is_saved_every_few_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(cl, "SAVE_EVERY", 3)
+    path = tmp_path / "ledger.json"
+    ledger = cl.CallLedger(path=str(path))
+
+    ledger.record("eod")
+    ledger.record("eod")
+    assert not path.exists()
+    ledger.record("eod")
+    assert cl.CallLedger(path=str(path)).used_today() == 3
+
+
+def test_unreadable_ledger_starts_empty(tmp_path):
+    path = tmp_path / "ledger.json"
+    path.write_text("{not json")
+
+    assert cl.CallLedger(path=str(path)).used_today() == 0
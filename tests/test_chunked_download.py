@@ -0,0 +1,107 @@
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+#%%
+
+
+def frame(dates: list[str], close: list[float]) -> pd.DataFrame:
+    return pd.DataFrame({"close": close}, index=pd.DatetimeIndex(pd.to_datetime(dates), name="date"))
+
+
+def test_single_chunk_when_disabled():
+    assert fmd.split_date_range("2010-03-15", "2024-06-30", 0) == [("2010-03-15", "2024-06-30")]
+
+
+def test_chunks_are_contiguous_and_cover_the_range():
+    chunks = fmd.split_date_range("2010-03-15", "2024-06-30", 1)
+
+    assert chunks[0] == ("2010-03-15", "2010-12-31")
+    assert chunks[-1] == ("2024-01-01", "2024-06-30")
+    assert len(chunks) == 15
+    for (_, previous_end), (next_start, _) in zip(chunks, chunks[1:]):
+        gap = datetime.date.fromisoformat(next_start) - datetime.date.fromisoformat(previous_end)
+        assert gap == datetime.timedelta(days=1)
+
+
+def test_chunk_boundaries_do_not_depend_on_the_start_date():
+    # Boundaries on the years divisible by chunk_years: closed chunks keep the same
+    # bounds, and so the same cache keys, from run to run
+    early = fmd.split_date_range("2011-02-01", "2020-12-31", 3)
+    late = fmd.split_date_range("2014-07-10", "2020-12-31", 3)
+
+    assert early == [
+        ("2011-02-01", "2012-12-31"),
+        ("2013-01-01", "2015-12-31"),
+        ("2016-01-01", "2018-12-31"),
+        ("2019-01-01", "2020-12-31"),
+    ]
+    assert late[1:] == early[2:]
+
+
+def test_range_inside_one_chunk():
+    assert fmd.split_date_range("2024-02-01", "2024-02-10", 1) == [("2024-02-01", "2024-02-10")]
+
+
+def test_merged_frames_keep_the_last_chunk_of_a_repeated_date():
+    first = frame(["2023-12-28", "2023-12-29", "2024-01-02"], [1.0, 2.0, 3.0])
+    second = frame(["2024-01-02", "2024-01-03"], [30.0, 4.0])
+
+    merged = fmd.merge_chunk_frames([second, first])
+    assert merged.index.is_monotonic_increasing
+    assert merged["close"].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+    merged = fmd.merge_chunk_frames([first, second])
+    assert merged["close"].tolist() == [1.0, 2.0, 30.0, 4.0]
+
+
+def test_merged_tables_match_merged_frames():
+    first = frame(["2023-12-28", "2023-12-29", "2024-01-02"], [1.0, 2.0, 3.0])
+    second = frame(["2024-01-02", "2024-01-03"], [30.0, 4.0])
+
+    def to_table(df: pd.DataFrame) -> pa.Table:
+        return pa.table({"date": pa.array(df.index.to_numpy(), pa.timestamp("ns")), "close": df["close"].to_numpy()})
+
+    table = fmd.merge_chunk_tables([to_table(first), to_table(second)])
+    expected = fmd.merge_chunk_frames([first, second])
+
+    assert table.column("close").to_pylist() == expected["close"].tolist()
+    assert pd.DatetimeIndex(table.column("date").to_numpy()).equals(expected.index)
+
+
+def test_fetch_eod_history_downloads_each_chunk_once(monkeypatch):
+    requested = []
+
+    def fake_fetch(ticker, start_date, end_date, api_key):
+        requested.append((start_date, end_date))
+        dates = pd.bdate_range(start_date, end_date)
+        return frame(list(dates), [float(date.year) for date in dates])
+
+    monkeypatch.setattr(fmd, "fetch_eod_price_data", fake_fetch)
+
+    df = fmd.fetch_eod_history("AAPL", "2016-06-01", "2024-03-31", api_key="key", chunk_years=2)
+
+    assert sorted(requested) == fmd.split_date_range("2016-06-01", "2024-03-31", 2)
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert df.index[0] == pd.Timestamp("2016-06-01")
+    assert df.index[-1] == pd.Timestamp("2024-03-29")
+    assert len(df) == len(pd.bdate_range("2016-06-01", "2024-03-31"))
+
+
+def test_only_ranges_the_api_truncates_are_chunked():
+    assert fmd.history_chunks("2020-01-02", "2024-06-30", 1) == [("2020-01-02", "2024-06-30")]
+    assert fmd.history_chunks("2010-03-15", "2024-06-30", 0) == [("2010-03-15", "2024-06-30")]
+    assert fmd.history_chunks("2010-03-15", "2024-06-30", 5) == fmd.split_date_range("2010-03-15", "2024-06-30", 5)
+
+
+@pytest.mark.parametrize("chunk_years", [0, 1, 5])
+def test_projected_calls_count_the_chunks(monkeypatch, chunk_years):
+    monkeypatch.setattr(fmd, "is_cached", lambda **kwargs: False)
+
+    calls = fmd.projected_history_calls("AAPL", "2015-01-01", "2024-12-31", chunk_years)
+
+    assert calls == len(fmd.history_chunks("2015-01-01", "2024-12-31", chunk_years))
@@ -0,0 +1,137 @@
+from src.usa_forecast.calculations import lags_adding as la
+from src.usa_forecast.calculations import panel_engine as pe
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.calculations import rolling as rr
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10, 15)
+
+
+@pytest.fixture
+def universe(prices, enrich) -> dict[str, pd.DataFrame]:
+    aaa = prices(600, seed=1, volatility=0.02)
+    # A missing close in the middle of a history
+    aaa.iloc[300, aaa.columns.get_loc("close")] = np.nan
+    return {
+        "AAA": enrich(aaa),
+        "BBB": enrich(prices(250, seed=2, volatility=0.02)),
+        "CCC": enrich(prices(12, seed=3, volatility=0.02)),
+    }
+
+
+@pytest.mark.parametrize("window", [1, 3, 100, 1000])
+def test_rolling_extremes_match_pandas(window):
+    rng = np.random.default_rng(window)
+    values = rng.normal(size=500)
+    values[rng.choice(500, 60, replace=False)] = np.nan
+    values[10:40] = np.nan
+    values[7] = np.inf
+    series = pd.Series(values).replace([np.inf, -np.inf], np.nan)
+
+    np.testing.assert_array_equal(
+        rr.rolling_min(values, window=window),
+        series.rolling(window, min_periods=1).min().to_numpy()
+    )
+    np.testing.assert_array_equal(
+        rr.rolling_max(values, window=window),
+        series.rolling(window, min_periods=1).max().to_numpy()
+    )
+
+
+def test_rolling_extremes_work_column_by_column():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(300, 4))
+    values[:50, 2] = np.nan
+
+    expected = pd.DataFrame(values).rolling(20, min_periods=1).max().to_numpy()
+
+    np.testing.assert_array_equal(rr.rolling_max(values, window=20), expected)
+
+
+def test_rolling_extremes_of_an_empty_series():
+    assert rr.rolling_min(np.array([]), window=5).shape == (0,)
+
+
+def test_arrow_lags_and_52_week_low_match_pandas(prices, enrich):
+    df = prices(400, seed=4, volatility=0.02)
+    expected = enrich(df)
+
+    table = pc.frame_to_table(df)
+    table = la.add_lagged_return_columns_arrow(table=table, column="close", lags=LAGS)
+    table = pc.add_52_week_low_column_arrow(table=table)
+    result = pc.table_to_frame(table)
+
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_freq=False, check_index_type=False)
+
+
+def test_arrow_engine_matches_pandas_engine(universe):
+    data = universe
+
+    expected = pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="pandas")
+    result = pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="arrow")
+
+    assert list(result) == list(expected)
+    for ticker, df in expected.items():
+        pd.testing.assert_frame_equal(
+            result[ticker][df.columns], df,
+            check_freq=False, check_index_type=False, check_dtype=False
+        )
+
+
+def test_engines_skip_tickers_without_lag_columns(universe, prices):
+    data = universe
+    data["BAD"] = prices(50, seed=5, volatility=0.02)
+
+    for engine in ("pandas", "arrow"):
+        assert "BAD" not in pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine=engine)
+
+
+def assert_same_results(result: dict, expected: dict) -> None:
+    assert list(result) == list(expected)
+    for ticker, df in expected.items():
+        pd.testing.assert_frame_equal(result[ticker], df, check_freq=False, check_index_type=False)
+
+
+def test_panel_engine_matches_pandas_engine(universe):
+    data = universe
+
+    expected = pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="pandas")
+    result = pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="panel")
+
+    assert_same_results(result, expected)
+
+
+def test_panel_engine_recomputes_the_lag_columns(universe):
+    data = universe
+    expected = pc.process_all_tickers(data_dict=data, lags=LAGS)
+
+    # Stale returns in the input do not reach the targets
+    stale = {ticker: df.assign(P5=0.0, P10=0.0, P15=0.0) for ticker, df in data.items()}
+
+    assert_same_results(pc.process_all_tickers(data_dict=stale, lags=LAGS, compute_engine="panel"), expected)
+
+
+def test_panel_engine_across_chunks(monkeypatch, universe, prices, enrich):
+    monkeypatch.setattr(pe, "PANEL_CHUNK", 2)
+    data = universe
+    data["DDD"] = enrich(prices(90, seed=6, volatility=0.02))
+    data["EEE"] = enrich(prices(1, seed=7, volatility=0.02))
+
+    expected = pc.process_all_tickers(data_dict=data, lags=LAGS)
+
+    assert_same_results(pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="panel"), expected)
+
+
+def test_panel_engine_skips_tickers_without_required_columns(universe, prices):
+    data = universe
+    data["BAD"] = prices(50, seed=5, volatility=0.02)
+
+    result = pc.process_all_tickers(data_dict=data, lags=LAGS, compute_engine="panel")
+
+    assert list(result) == ["AAA", "BBB", "CCC"]
+    assert pe.calculate_panel_targets({}, lags=LAGS) == {}
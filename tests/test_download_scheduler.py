@@ -0,0 +1,130 @@
+from src.usa_forecast.services import download_scheduler as ds
+
+import collections
+import datetime
+import json
+import threading
+
+import pytest
+
+#%%
+
+
+@pytest.fixture(autouse=True)
+def no_dashboard_selections(monkeypatch):
+    monkeypatch.setattr(ds, "_requested", collections.OrderedDict())
+    monkeypatch.setattr(ds, "_active_schedulers", set())
+
+
+def drain(scheduler: ds.DownloadScheduler) -> list[str]:
+    order = []
+    while (ticker := scheduler.pop()) is not None:
+        order.append(ticker)
+    return order
+
+
+def test_staleness_days():
+    today = datetime.date(2024, 6, 10)
+
+    assert ds.staleness_days("2024-06-07", today=today) == 3
+    assert ds.staleness_days(None) == float("inf")
+
+
+def test_order_is_priority_then_staleness_then_latency_then_submission():
+    scheduler = ds.DownloadScheduler(latency_path=None)
+    scheduler.record_latency("SLOW", 9.0)
+    scheduler.record_latency("FAST", 0.5)
+
+    scheduler.push("FAST", staleness=3)
+    scheduler.push("FIRST", staleness=3)
+    scheduler.push("SLOW", staleness=3)
+    scheduler.push("SECOND", staleness=3)
+    scheduler.push("OLD", staleness=30)
+    scheduler.push("NEW", staleness=float("inf"))
+    scheduler.push("URGENT", staleness=0, priority=5)
+
+    assert drain(scheduler) == ["URGENT", "NEW", "OLD", "SLOW", "FAST", "FIRST", "SECOND"]
+
+
+def test_bump_moves_a_queued_ticker_to_the_front():
+    scheduler = ds.DownloadScheduler(latency_path=None)
+    for ticker, staleness in [("A", 10), ("B", 5), ("C", 1)]:
+        scheduler.push(ticker, staleness=staleness)
+
+    assert scheduler.bump("C")
+    assert not scheduler.bump("MISSING")
+    assert len(scheduler) == 3
+    assert drain(scheduler) == ["C", "A", "B"]
+
+
+def test_bump_never_lowers_a_priority():
+    scheduler = ds.DownloadScheduler(latency_path=None)
+    scheduler.push("A", priority=200)
+    scheduler.push("B", priority=150)
+
+    assert scheduler.bump("A", priority=10)
+    assert drain(scheduler) == ["A", "B"]
+
+
+def test_dashboard_selection_reaches_running_and_later_schedulers():
+    running = ds.DownloadScheduler(latency_path=None)
+    for ticker in ["A", "B", "C"]:
+        running.push(ticker, staleness=1)
+
+    with running:
+        ds.bump_ticker("C")
+    assert running.pop() == "C"
+
+    later = ds.DownloadScheduler(latency_path=None)
+    later.push("A", staleness=100)
+    later.push("C", staleness=1)
+    assert drain(later) == ["C", "A"]
+    assert ds.requested_tickers() == ["C"]
+
+
+def test_prioritized_puts_recent_selections_first():
+    ds.bump_ticker("B")
+    ds.bump_ticker("D")
+
+    assert ds.prioritized(["A", "B", "C", "D"]) == ["D", "B", "A", "C"]
+
+
+def test_selections_are_bounded(monkeypatch):
+    monkeypatch.setattr(ds, "MAX_REQUESTED", 3)
+    for ticker in "ABCDE":
+        ds.bump_ticker(ticker)
+
+    assert ds.requested_tickers() == ["E", "D", "C"]
+
+
+def test_latency_is_a_moving_average_and_persisted(tmp_path):
+    path = tmp_path / "latency.json"
+    scheduler = ds.DownloadScheduler(latency_path=str(path))
+    scheduler.record_latency("A", 10.0)
+    scheduler.record_latency("A", 0.0)
+    scheduler.save_latencies()
+
+    assert json.loads(path.read_text()) == {"A": pytest.approx(10.0 * (1 - ds.LATENCY_ALPHA))}
+    assert ds.DownloadScheduler(latency_path=str(path))._latencies == {"A": pytest.approx(7.0)}
+
+
+def test_run_threaded_processes_each_ticker_once_in_priority_order():
+    scheduler = ds.DownloadScheduler(latency_path=None)
+    for i, ticker in enumerate(["A", "B", "C", "D", "E"]):
+        scheduler.push(ticker, staleness=i)
+
+    started = []
+    lock = threading.Lock()
+
+    def work(ticker: str) -> str:
+        with lock:
+            started.append(ticker)
+        if ticker == "C":
+            raise RuntimeError("download failed")
+        return ticker.lower()
+
+    results = dict(ds.run_threaded(scheduler=scheduler, func=work, max_workers=1))
+
+    assert started == ["E", "D", "C", "B", "A"]
+    assert results == {"A": "a", "B": "b", "C": None, "D": "d", "E": "e"}
+    assert len(scheduler) == 0
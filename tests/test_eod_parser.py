@@ -0,0 +1,106 @@
+from src.usa_forecast.data_download import eod_parser as ep
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+
+def eod_records(rows: int = 50) -> list[dict]:
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range("2024-01-01", periods=rows)
+    records = []
+    # FMP returns the most recent date first
+    for date in reversed(dates):
+        price = round(float(rng.uniform(50, 150)), 4)
+        records.append({
+            "symbol": "AAPL",
+            "date": date.strftime("%Y-%m-%d"),
+            "open": price,
+            "high": price + 1.5,
+            "low": price - 1.25,
+            "close": price + 0.5,
+            "volume": int(rng.integers(1_000, 1_000_000)),
+            "change": 0.5,
+            "changePercent": 0.3,
+            "vwap": price,
+        })
+    return records
+
+
+def expected_frame(payload: bytes) -> pd.DataFrame:
+    df = pd.DataFrame(json.loads(payload))
+    df = df.drop(columns=[name for name in fmd.EOD_DROP_COLUMNS if name in df.columns])
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("date")), name="date")
+    return df.sort_index()
+
+
+def parse(payload: bytes, chunk_size: int) -> pd.DataFrame:
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+    return fmd.parse_eod_stream(chunks=chunks, ticker="AAPL").to_frame()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_fast_path_matches_json_loads(chunk_size):
+    payload = json.dumps(eod_records()).encode("utf-8")
+
+    result = parse(payload, chunk_size)
+
+    pd.testing.assert_frame_equal(result, expected_frame(payload), check_index_type=False)
+    assert result["volume"].dtype == np.int64
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1 << 20])
+def test_slow_path_matches_json_loads(chunk_size):
+    records = eod_records()
+    # Records with missing and null fields take the per-record scan
+    del records[3]["volume"]
+    records[10]["open"] = None
+    records[20]["adjClose"] = 99.5
+    payload = json.dumps(records, indent=1).encode("utf-8")
+
+    result = parse(payload, chunk_size)
+    expected = expected_frame(payload)
+
+    pd.testing.assert_frame_equal(result, expected[result.columns], check_index_type=False, check_dtype=False)
+    assert set(result.columns) == set(expected.columns)
+
+
+def test_empty_array_gives_an_empty_frame():
+    assert parse(b"[]", 1).empty
+    assert parse(b" [ ] ", 1 << 20).empty
+
+
+@pytest.mark.parametrize("payload", [
+    b'{"Error Message": "Invalid API KEY."}',
+    b'[{"date": "2024-01-02", "close": 1.0}',
+    b"",
+])
+def test_payload_that_is_not_an_array_raises(payload):
+    with pytest.raises(ValueError):
+        parse(payload, 8)
+
+
+def test_string_fields_are_kept_as_strings():
+    parser = ep.EodColumnParser(ticker="AAPL")
+    parser.feed(b'[{"date": "2024-01-02", "label": "Jan 2, \\"24", "close": 1.5}]')
+
+    df = parser.to_frame()
+
+    assert df["label"].tolist() == ['Jan 2, "24']
+    assert df["close"].tolist() == [1.5]
+
+
+def test_arrow_output_matches_the_frame():
+    payload = json.dumps(eod_records()).encode("utf-8")
+    parser = fmd.parse_eod_stream(chunks=[payload], ticker="AAPL")
+
+    table = parser.to_arrow()
+    df = parser.to_frame()
+
+    assert table.column_names == ["date"] + list(df.columns)
+    assert table.column("close").to_pylist() == df["close"].tolist()
@@ -0,0 +1,108 @@
+from src.usa_forecast.data_download import call_ledger as cl
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import fmp_standin as fs
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.data_download import response_cache as rc
+from src.usa_forecast.exceptions import CallBudgetExceededError
+
+import json
+import time
+from urllib.error import HTTPError
+
+import pytest
+
+#%%
+
+
+def fetch_eod(ticker: str, start: str, end: str) -> bytes:
+    url = fmd.build_eod_url(ticker=ticker, start_date=start, end_date=end, api_key="key")
+    return b"".join(fmd.response_chunks(url=url, endpoint=fmd.EOD_ENDPOINT, symbol=ticker, start=start, end=end))
+
+
+@pytest.fixture
+def ledger(standin):
+    return cl.configure_ledger(path=None)
+
+
+def test_network_calls_are_counted_and_cache_hits_are_free(standin, ledger):
+    first = fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+    second = fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    assert json.loads(first) == json.loads(second) == fs.synthetic_eod("AAPL", "2024-01-01", "2024-03-31")
+    assert standin.stats["requests"] == 1
+    assert ledger.used_today(fmd.EOD_ENDPOINT) == 1
+
+
+def test_used_up_budget_stops_before_the_request(standin):
+    ledger = cl.configure_ledger(path=None, daily_budget=1)
+    fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    with pytest.raises(CallBudgetExceededError):
+        fetch_eod("MSFT", "2024-01-01", "2024-03-31")
+    # Cached responses are still served
+    fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    assert standin.stats["requests"] == 1
+    assert ledger.used_today() == 1
+
+
+def test_fast_responses_raise_the_concurrency_limit(standin, ledger):
+    rc.configure_cache(mode="off")
+    limiter = rl.configure_limiter(rate_per_minute=0, max_concurrency=8)
+    assert limiter.concurrency_limit == 4
+
+    for _ in range(8):
+        fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    assert limiter.concurrency_limit == 5
+    assert ledger.used_today(fmd.EOD_ENDPOINT) == 8
+
+
+def test_slow_responses_lower_the_concurrency_limit(standin, ledger):
+    standin.latency = 0.1
+    limiter = rl.configure_limiter(rate_per_minute=0, max_concurrency=8, target_latency=0.05)
+
+    fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    assert limiter.concurrency_limit == 2
+
+
+def test_throttled_response_halves_the_limit_and_pauses_the_bucket(standin, ledger):
+    standin.throttle_rate = 1.0
+    standin.retry_after = 0.5
+    limiter = rl.configure_limiter(rate_per_minute=0, max_concurrency=8)
+
+    with pytest.raises(HTTPError) as error:
+        fetch_eod("AAPL", "2024-01-01", "2024-03-31")
+
+    assert error.value.code == 429
+    assert limiter.concurrency_limit == 2
+    assert 0.3 < limiter._paused_until - time.monotonic() <= 0.5
+    # The throttled call still counts against the budget
+    assert ledger.used_today(fmd.EOD_ENDPOINT) == 1
+
+
+def test_recorded_fixtures_take_precedence(tmp_path):
+    records = [
+        {"symbol": "AAPL", "date": date, "close": close}
+        for date, close in [("2024-01-04", 3.0), ("2024-01-03", 2.0), ("2024-01-02", 1.0)]
+    ]
+    (tmp_path / fs.EOD_FIXTURES).mkdir()
+    (tmp_path / fs.EOD_FIXTURES / "AAPL.json").write_text(json.dumps(records))
+
+    with fs.FmpStandInServer(fixtures_dir=str(tmp_path), max_bars=1) as server:
+        status, body, _ = server.handle(f"{fs.EOD_PATH}?symbol=AAPL&from=2024-01-02&to=2024-01-03")
+        _, synthetic, _ = server.handle(f"{fs.EOD_PATH}?symbol=MSFT&from=2024-01-02&to=2024-01-03")
+
+    assert status == 200
+    assert json.loads(body) == records[1:2]
+    assert json.loads(synthetic) == fs.synthetic_eod("MSFT", "2024-01-02", "2024-01-03", max_bars=1)
+
+
+def test_unknown_endpoint_and_invalid_framing():
+    with fs.FmpStandInServer() as server:
+        status, _, _ = server.handle("/stable/unknown")
+
+    assert status == 404
+    with pytest.raises(ValueError):
+        fs.FmpStandInServer(framing="gzip")
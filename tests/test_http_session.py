@@ -0,0 +1,122 @@
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import fmp_standin as fs
+from src.usa_forecast.data_download import http_session as hs
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+import pytest
+
+#%%
+
+
+@pytest.fixture
+def session():
+    session = hs.PooledHTTPSession(pool_size=2, max_per_host=2, timeout=5)
+    yield session
+    session.close()
+
+
+def host_state(session: hs.PooledHTTPSession, url: str):
+    parts = urlsplit(url)
+    return session._host_state((parts.scheme, parts.hostname, parts.port))
+
+
+def free_slots(session: hs.PooledHTTPSession, url: str) -> int:
+    return host_state(session, url)[1]._value
+
+
+def test_get_reuses_the_pooled_connection(standin, session):
+    url = fmd.build_eod_url("AAPL", "2024-01-01", "2024-01-31", api_key="key")
+    idle, _ = host_state(session, url)
+
+    first = json.loads(session.get(url))
+    conn = idle.queue[0]
+    second = json.loads(session.get(url))
+
+    assert first == second == fs.synthetic_eod("AAPL", "2024-01-01", "2024-01-31")
+    assert list(idle.queue) == [conn]
+    assert free_slots(session, url) == 2
+
+
+def test_iter_chunks_streams_the_whole_body(standin, session):
+    url = fmd.build_eod_url("AAPL", "2020-01-01", "2024-01-31", api_key="key")
+
+    chunks = list(session.iter_chunks(url, chunk_size=1024))
+
+    assert len(chunks) > 1 and all(len(chunk) <= 1024 for chunk in chunks)
+    assert json.loads(b"".join(chunks)) == fs.synthetic_eod("AAPL", "2020-01-01", "2024-01-31")
+    assert len(host_state(session, url)[0].queue) == 1
+
+
+def test_closed_iterator_releases_its_slot(standin, session):
+    url = fmd.build_eod_url("AAPL", "2020-01-01", "2024-01-31", api_key="key")
+    idle, _ = host_state(session, url)
+
+    chunks = session.iter_chunks(url, chunk_size=1024)
+    next(chunks)
+    assert free_slots(session, url) == 1
+
+    chunks.close()
+
+    assert free_slots(session, url) == 2
+    # Half-read connections are dropped, not pooled
+    assert idle.empty()
+
+
+def test_parse_error_releases_the_slot(standin, session, monkeypatch):
+    monkeypatch.setattr(hs, "_session", session)
+    url = fmd.build_eod_url("AAPL", "2020-01-01", "2024-01-31", api_key="key")
+
+    def broken(chunks):
+        # A bar without its date, refused as soon as the first chunk is fed
+        for _ in chunks:
+            yield b'[{"open": 1.0}, '
+
+    with pytest.raises(ValueError) as error:
+        fmd.parse_eod_stream(broken(session.iter_chunks(url, chunk_size=64)), ticker="AAPL")
+
+    # Released while the error, and the frames of its traceback, are still alive
+    assert error.value is not None
+    assert free_slots(session, url) == 2
+
+
+def test_error_status_raises_and_releases_the_slot(standin, session):
+    standin.throttle_rate = 1.0
+    url = fmd.build_eod_url("AAPL", "2024-01-01", "2024-01-31", api_key="key")
+
+    with pytest.raises(HTTPError) as error:
+        session.get(url)
+
+    assert error.value.code == 429
+    assert free_slots(session, url) == 2
+
+
+def test_requests_per_host_are_capped(standin, session):
+    standin.latency = 0.2
+    url = fmd.build_1m_url("AAPL", api_key="key")
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    handle = standin.handle
+
+    def counting_handle(path):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            return handle(path)
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    standin.handle = counting_handle
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: session.get(url), range(4)))
+
+    assert in_flight["max"] == 2
+    assert time.perf_counter() - started >= 0.4
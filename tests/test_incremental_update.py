@@ -0,0 +1,56 @@
+from src.usa_forecast.services import incremental_update as iu
+
+import pandas as pd
+
+#%%
+
+LAGS = (5, 10, 15)
+
+
+def test_delta_starts_on_the_last_cached_date(prices, enrich):
+    cached = enrich(prices(rows=300))
+    assert iu.delta_start_date(cached) == cached.index[-1].date().isoformat()
+
+
+def test_downloaded_bar_replaces_a_partial_last_bar(prices, enrich):
+    raw = prices(rows=400)
+    expected = enrich(raw)
+
+    partial = raw.iloc[:300].copy()
+    partial.iloc[-1, partial.columns.get_loc("close")] = 1.0
+    partial.iloc[-1, partial.columns.get_loc("low")] = 0.5
+    cached = enrich(partial)
+
+    result = iu.append_delta(cached=cached, new_data=raw.iloc[299:], window_shift=LAGS)
+
+    pd.testing.assert_frame_equal(result, expected[result.columns], check_freq=False)
+
+
+def test_cached_rows_missing_from_the_download_are_kept(prices, enrich):
+    raw = prices(rows=400)
+    cached = enrich(raw.iloc[:300])
+
+    # The download skips the last cached date, which stays as stored
+    result = iu.append_delta(cached=cached, new_data=raw.iloc[300:320], window_shift=LAGS)
+
+    assert len(result) == 320
+    pd.testing.assert_frame_equal(result.iloc[:300], cached, check_freq=False)
+    pd.testing.assert_frame_equal(result, enrich(raw.iloc[:320])[result.columns], check_freq=False)
+
+
+def test_download_without_changes_returns_the_cached_data(prices, enrich):
+    raw = prices(rows=300)
+    cached = enrich(raw)
+
+    assert iu.append_delta(cached=cached, new_data=raw.iloc[299:], window_shift=LAGS) is cached
+    assert iu.append_delta(cached=cached, new_data=raw.iloc[:0], window_shift=LAGS) is cached
+
+
+def test_float32_cache_is_recomputed_in_float64(prices, enrich):
+    raw = prices(rows=400)
+    cached = enrich(raw.iloc[:300]).astype("float32")
+
+    result = iu.append_delta(cached=cached, new_data=raw.iloc[299:], window_shift=LAGS)
+
+    assert (result.dtypes == "float64").all()
+    assert len(result) == len(raw)
@@ -0,0 +1,134 @@
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.calculations import price_calculations as pc
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+#%%
+
+LAGS = (5, 10, 15)
+START = "2021-01-01"
+
+
+def reference_targets(df: pd.DataFrame, lookback: int) -> pd.DataFrame:
+    # Straight column-by-column computation, as calculate_price_targets did before lazy_targets
+    df = df.copy()
+    for lag in LAGS:
+        df[f"Max%_{lag}"] = df[f"P{lag}"].rolling(window=lookback, min_periods=1).max()
+        df[f"Min%_{lag}"] = df[f"P{lag}"].rolling(window=lookback, min_periods=1).min()
+    for lag in LAGS:
+        df[f"MaxPT_{lag}"] = df["close"].shift(lag) * (1 + df[f"Max%_{lag}"] / 100)
+        df[f"MinPT_{lag}"] = df["close"].shift(lag) * (1 + df[f"Min%_{lag}"] / 100)
+    max_pt = df[[f"MaxPT_{lag}" for lag in LAGS]]
+    min_pt = df[[f"MinPT_{lag}" for lag in LAGS]]
+    df["MinMax%"] = df[[f"Max%_{lag}" for lag in LAGS]].min(axis=1)
+    df["AvgMax"] = max_pt.mean(axis=1)
+    df["MinMax"] = max_pt.min(axis=1)
+    df["MaxMin"] = min_pt.max(axis=1)
+    df["Rate"] = ((df["MaxMin"] / df["close"]) - 1) * 100
+    return df
+
+
+def test_columns_match_a_straight_computation(ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+    expected = reference_targets(df, lookback=20)
+
+    frame = lt.LazyTargetFrame(base=df, lags=LAGS, lookback=20)
+    result = frame.to_frame()
+
+    assert list(result.columns) == list(df.columns) + lt.target_columns(LAGS)
+    for name in ["Max%_5", "Min%_15", "MaxPT_10", "MinPT_5", "MinMax%", "AvgMax", "MinMax", "MaxMin", "Rate"]:
+        pd.testing.assert_series_equal(result[name], expected[name], check_freq=False)
+    for alias, source in lt.ALIASES.items():
+        assert result[alias].equals(result[source].rename(alias))
+
+
+def test_single_columns_equal_the_materialized_frame(ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+    frame = lt.LazyTargetFrame(base=df, lags=LAGS)
+    eager = pc.calculate_price_targets(df=df, column="close", lags=LAGS)
+
+    pd.testing.assert_series_equal(frame["AvgMax"], eager["AvgMax"])
+    assert set(frame.cached_columns) <= set(lt.target_columns(LAGS))
+    assert "Rate" not in frame.cached_columns
+    pd.testing.assert_frame_equal(frame[["close", "Rate"]], eager[["close", "Rate"]])
+    # Columns of a full materialization are not kept unless asked for
+    frame.clear_cache()
+    frame.to_frame()
+    assert frame.cached_columns == []
+
+
+def test_target_columns_in_the_base_are_computed_again(ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+    stale = pc.calculate_price_targets(df=df, column="close", lags=LAGS)
+    stale["AvgMax"] = 0.0
+
+    frame = lt.LazyTargetFrame(base=stale, lags=LAGS)
+
+    pd.testing.assert_frame_equal(frame.base, df)
+    pd.testing.assert_frame_equal(frame.to_frame(), pc.calculate_price_targets(df=df, column="close", lags=LAGS))
+
+
+@pytest.mark.parametrize("date", ["2021-01-01", "2021-03-15", "2021-06-05", "2022-07-01", "2030-01-01"])
+def test_snapshot_equals_the_row_of_the_full_frame(date, ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+    frame = lt.LazyTargetFrame(base=df, lags=LAGS)
+    eager = frame.to_frame()
+
+    snapshot = frame.snapshot(pd.Timestamp(date))
+
+    position = eager.index.searchsorted(pd.Timestamp(date), side="right") - 1
+    pd.testing.assert_frame_equal(snapshot, eager.iloc[[position]], check_freq=False)
+
+
+def test_snapshot_before_the_first_date(ticker_frame):
+    assert lt.LazyTargetFrame(base=ticker_frame(rows=400, start=START), lags=LAGS).snapshot(pd.Timestamp("2020-01-01")) is None
+
+
+def test_lazy_run_equals_the_eager_run(ticker_frame):
+    data = {"AAA": ticker_frame(rows=400, start=START, seed=1), "BBB": ticker_frame(rows=30, start=START, seed=2)}
+    data["CCC"] = data["AAA"].drop(columns=["P10"])
+
+    eager = pc.process_all_tickers(data_dict=data, lags=LAGS)
+    lazy = pc.process_all_tickers(data_dict=data, lags=LAGS, lazy=True)
+
+    assert list(lazy) == list(eager) == ["AAA", "BBB"]
+    for ticker, df in eager.items():
+        assert isinstance(lazy[ticker], lt.LazyTargetFrame)
+        pd.testing.assert_frame_equal(lazy[ticker].to_frame(), df)
+        pd.testing.assert_frame_equal(lt.ensure_frame(lazy[ticker], ["Rate"]), df[["Rate"]])
+
+
+def test_lazy_run_accepts_arrow_tables(ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+    table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+
+    lazy = pc.process_all_tickers(data_dict={"AAA": table}, lags=LAGS, lazy=True)
+
+    pd.testing.assert_frame_equal(
+        lazy["AAA"].to_frame(), pc.calculate_price_targets(df=df, column="close", lags=LAGS),
+        check_freq=False, check_index_type=False
+    )
+
+
+def test_lazy_results_materialize_each_access(ticker_frame):
+    frames = {"AAA": lt.LazyTargetFrame(base=ticker_frame(rows=400, start=START), lags=LAGS)}
+    results = lt.LazyResults(frames)
+
+    assert list(results) == ["AAA"] and len(results) == 1
+    assert results.frame("AAA") is frames["AAA"]
+    pd.testing.assert_frame_equal(results["AAA"], frames["AAA"].to_frame())
+
+
+def test_default_lookback_is_shared(ticker_frame):
+    df = ticker_frame(rows=400, start=START)
+
+    assert lt.LazyTargetFrame(base=df, lags=LAGS).lookback == lt.LOOKBACK
+    pd.testing.assert_frame_equal(
+        pc.calculate_price_targets(df=df, column="close", lags=LAGS),
+        lt.LazyTargetFrame(base=df, lags=LAGS, lookback=lt.LOOKBACK).to_frame(),
+    )
+    assert not pc.calculate_price_targets(df=df, column="close", lags=LAGS).equals(
+        lt.LazyTargetFrame(base=df, lags=LAGS, lookback=lt.LOOKBACK // 2).to_frame()
+    )
@@ -0,0 +1,117 @@
+from src.usa_forecast import usa_forecast_code as fc
+from src.usa_forecast.storage import manifest as mf
+from src.usa_forecast.storage import ticker_store as ts
+
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+#%%
+
+
+@pytest.fixture
+def history(ticker_frame):
+    return ticker_frame(lags=(5, 10), end="2024-06-28")
+
+
+def forbid_reads(monkeypatch):
+    def fail(*args, **kwargs):
+        pytest.fail("ticker file read for a freshness check")
+
+    monkeypatch.setattr(ts.TickerStore, "_read_files", fail)
+
+
+def test_entry_describes_the_written_file(ticker_store, history):
+    ticker_store.write("AAPL", history)
+
+    entry = ticker_store.describe("AAPL")
+
+    assert (entry.first_date, entry.last_date) == ("2023-01-02", "2024-06-28")
+    assert entry.rows == len(history)
+    assert entry.columns == tuple(history.columns)
+    assert entry.content_hash == mf.file_hash(ticker_store.path("AAPL"))
+
+
+def test_freshness_is_answered_without_reading_the_data(ticker_store, monkeypatch, history):
+    ticker_store.write("AAPL", history)
+    ticker_store.save_manifest()
+    forbid_reads(monkeypatch)
+
+    assert fc.is_data_up_to_date(
+        "AAPL", datetime.date(2023, 3, 1), datetime.date(2024, 6, 28), (5, 10), stay_update="True"
+    )
+    assert not fc.is_data_up_to_date(
+        "AAPL", datetime.date(2023, 3, 1), datetime.date(2024, 7, 1), (5, 10), stay_update="True"
+    )
+    assert not fc.is_data_up_to_date(
+        "AAPL", datetime.date(2022, 12, 1), datetime.date(2024, 6, 28), (5, 10), stay_update="True"
+    )
+    assert not fc.is_data_up_to_date(
+        "AAPL", datetime.date(2023, 3, 1), datetime.date(2024, 6, 28), (5, 15), stay_update="True"
+    )
+    assert not fc.is_data_up_to_date("MSFT", datetime.date(2023, 3, 1), datetime.date(2024, 6, 28), (5,), "True")
+
+
+def test_stay_update_false_never_uses_local_data(ticker_store, history):
+    ticker_store.write("AAPL", history)
+
+    assert not fc.is_data_up_to_date("AAPL", datetime.date(2023, 3, 1), datetime.date(2024, 6, 28), (5,), "False")
+
+
+def test_manifest_survives_a_restart(ticker_store, monkeypatch, history):
+    ticker_store.write("AAPL", history)
+    ticker_store.save_manifest()
+
+    restarted = ts.TickerStore(directory=str(ticker_store.directory))
+    forbid_reads(monkeypatch)
+
+    assert restarted.describe("AAPL") == ticker_store.describe("AAPL")
+
+
+def test_file_changed_behind_the_manifest_is_described_again(tmp_path, ticker_store, history, ticker_frame):
+    ticker_store.write("AAPL", history)
+    ticker_store.save_manifest()
+
+    # Another tool rewrites the file with a shorter history
+    ts.TickerStore(directory=str(tmp_path / "other"), storage_format="parquet").write(
+        "AAPL", ticker_frame(lags=(5, 10), end="2024-01-31")
+    )
+    os.replace(tmp_path / "other" / "AAPL.parquet", ticker_store.path("AAPL"))
+
+    restarted = ts.TickerStore(directory=str(ticker_store.directory))
+    entry = restarted.describe("AAPL")
+
+    assert entry.last_date == "2024-01-31"
+    assert entry.content_hash == mf.file_hash(ticker_store.path("AAPL"))
+
+
+def test_entry_matches_only_the_same_size_and_mtime(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"abc")
+    entry = mf.build_entry(path, "parquet", pd.DatetimeIndex([]), [])
+
+    assert entry.matches(path)
+    assert entry.first_date is None and entry.rows == 0
+
+    path.write_bytes(b"abcd")
+    assert not entry.matches(path)
+    assert not entry.matches(tmp_path / "missing.bin")
+
+
+def test_unchanged_manifest_is_not_rewritten(ticker_store, history):
+    ticker_store.write("AAPL", history)
+    ticker_store.save_manifest()
+    manifest_path = ticker_store.directory / mf.MANIFEST_FILE
+    mtime = manifest_path.stat().st_mtime_ns
+
+    ticker_store.save_manifest()
+
+    assert manifest_path.stat().st_mtime_ns == mtime
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / mf.MANIFEST_FILE).write_text("{broken")
+
+    assert mf.Manifest(tmp_path).get("AAPL", tmp_path / "AAPL.parquet") is None
@@ -0,0 +1,100 @@
+from src.usa_forecast.storage import output_archive as oa
+from src.usa_forecast.storage import summary_store as ss
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+TODAY = datetime.date(2024, 6, 30)
+
+
+# The CSV files go through the shared output layer, its manifest under tmp_path
+pytestmark = pytest.mark.usefixtures("outputs")
+
+
+def daily_frame(seed: int) -> pd.DataFrame:
+    # Daily analysis layout: tickers as rows, metrics as columns
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(2, 3)), index=["AAPL", "MSFT"], columns=["Close", "AvgMax", "Rate"])
+
+
+def archive_in(tmp_path, **settings) -> oa.OutputArchive:
+    return oa.OutputArchive(
+        str(tmp_path / "daily"), ss.SummaryStore(str(tmp_path / "archive")), transpose=True, **settings
+    )
+
+
+def write_days(archive: oa.OutputArchive, days: list[int]) -> dict:
+    frames = {TODAY - datetime.timedelta(days=day): daily_frame(day) for day in days}
+    archive.write(frames, today=TODAY)
+    return frames
+
+
+def test_defaults_keep_every_date_as_a_file(tmp_path):
+    archive = archive_in(tmp_path)
+    frames = write_days(archive, [1, 40, 400])
+
+    archive.run(today=TODAY)
+
+    assert archive.compact_before(TODAY) is None and archive.keep_from(TODAY) is None
+    assert sorted(archive._csv_files()) == sorted(frames)
+    assert archive.archive.dates() == []
+
+
+def test_compact_moves_old_files_into_the_archive(tmp_path):
+    archive = archive_in(tmp_path)
+    frames = write_days(archive, [1, 40, 400])
+
+    assert archive.compact(TODAY - datetime.timedelta(days=30)) == 2
+
+    assert sorted(archive._csv_files()) == [TODAY - datetime.timedelta(days=1)]
+    assert archive.dates() == sorted(frames)
+    for date, df in frames.items():
+        pd.testing.assert_frame_equal(archive.read(date), df)
+    assert list(archive.read_many()) == sorted(frames)
+    assert archive.read(TODAY) is None
+
+
+def test_write_archives_dates_past_the_compaction_age(tmp_path):
+    archive = archive_in(tmp_path, compaction_days=30)
+    frames = write_days(archive, [1, 40])
+
+    assert sorted(archive._csv_files()) == [TODAY - datetime.timedelta(days=1)]
+    assert archive.archive.dates() == [TODAY - datetime.timedelta(days=40)]
+    pd.testing.assert_frame_equal(archive.read(TODAY - datetime.timedelta(days=40)), frames[TODAY - datetime.timedelta(days=40)])
+
+
+def test_retention_deletes_files_and_archived_dates(tmp_path):
+    archive = archive_in(tmp_path, compaction_days=30, retention_days=365)
+    write_days(archive, [1, 40, 400])
+    assert archive.dates() == [TODAY - datetime.timedelta(days=40), TODAY - datetime.timedelta(days=1)]
+
+    write_days(oa.OutputArchive(str(tmp_path / "daily"), archive.archive, transpose=True), [370, 380])
+    archive.run(today=TODAY)
+
+    assert archive.dates() == [TODAY - datetime.timedelta(days=40), TODAY - datetime.timedelta(days=1)]
+
+
+def test_apply_retention_counts_the_dates_removed(tmp_path):
+    archive = archive_in(tmp_path)
+    write_days(archive, [1, 40, 400])
+    archive.compact(TODAY - datetime.timedelta(days=100))
+
+    assert archive.apply_retention(TODAY - datetime.timedelta(days=10)) == 2
+    assert archive.dates() == [TODAY - datetime.timedelta(days=1)]
+
+
+def test_unreadable_file_is_left_out_of_the_compaction(tmp_path):
+    archive = archive_in(tmp_path)
+    write_days(archive, [40])
+    broken = archive.csv_path(TODAY - datetime.timedelta(days=50))
+    broken.write_bytes(b"")
+
+    assert archive.compact(TODAY - datetime.timedelta(days=30)) == 1
+
+    assert broken.exists()
+    assert archive.archive.dates() == [TODAY - datetime.timedelta(days=40)]
@@ -0,0 +1,118 @@
+from src.usa_forecast.storage import output_files as of
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+#%%
+
+
+def test_atomic_write_leaves_only_the_target(tmp_path):
+    path = tmp_path / "nested" / "summary.csv"
+
+    of.atomic_write_bytes(path, b"first")
+    of.atomic_write_bytes(path, memoryview(b"second"))
+
+    assert path.read_bytes() == b"second"
+    assert [p.name for p in path.parent.iterdir()] == ["summary.csv"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    path = tmp_path / "summary.csv"
+    of.atomic_write_bytes(path, b"old")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(of.os, "replace", fail)
+    with pytest.raises(OSError):
+        of.atomic_write_bytes(path, b"new")
+
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["summary.csv"]
+
+
+def test_identical_content_is_skipped(tmp_path):
+    outputs = of.OutputFiles(manifest_path=tmp_path / "manifest.json")
+    path = tmp_path / "report.txt"
+
+    assert outputs.write_bytes(path, b"abc")
+    mtime = path.stat().st_mtime_ns
+    assert not outputs.write_bytes(path, b"abc")
+    assert path.stat().st_mtime_ns == mtime
+    assert outputs.write_bytes(path, b"abd")
+
+    assert (outputs.written, outputs.skipped) == (2, 1)
+    assert path.read_bytes() == b"abd"
+
+
+def test_write_csv_matches_to_csv(tmp_path):
+    outputs = of.OutputFiles(manifest_path=tmp_path / "manifest.json")
+    df = pd.DataFrame({"close": [1.5, 2.0]}, index=["AAPL", "MSFT"])
+    path = tmp_path / "summary.csv"
+
+    assert outputs.write_csv(path, df, index=True)
+    assert not outputs.write_csv(path, df.copy(), index=True)
+
+    assert path.read_text() == df.to_csv(index=True)
+
+
+def test_manifest_survives_a_restart(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "manifest.json"
+    path = tmp_path / "report.txt"
+    outputs = of.OutputFiles(manifest_path=manifest_path)
+    outputs.write_bytes(path, b"abc")
+    outputs.save()
+
+    restarted = of.OutputFiles(manifest_path=manifest_path)
+    # With a valid entry the file on disk is not hashed again
+    monkeypatch.setattr(of.mf, "file_hash", lambda path: pytest.fail("file hashed"))
+
+    assert not restarted.write_bytes(path, b"abc")
+    assert list(json.loads(manifest_path.read_text())) == [of.OutputFiles._key(path)]
+
+
+def test_file_changed_by_another_tool_is_rewritten(tmp_path):
+    outputs = of.OutputFiles(manifest_path=tmp_path / "manifest.json")
+    path = tmp_path / "report.txt"
+    outputs.write_bytes(path, b"abc")
+
+    path.write_bytes(b"xyz")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert outputs.write_bytes(path, b"abc")
+    assert path.read_bytes() == b"abc"
+
+
+def test_same_content_without_manifest_is_skipped(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_bytes(b"abc")
+    outputs = of.OutputFiles(manifest_path=tmp_path / "manifest.json")
+
+    assert not outputs.write_bytes(path, b"abc")
+    assert outputs.write_bytes(path, b"abcd")
+    assert outputs.write_bytes(tmp_path / "missing.txt", b"abc")
+
+
+def test_manifest_is_saved_every_few_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(of, "SAVE_EVERY", 2)
+    manifest_path = tmp_path / "manifest.json"
+    outputs = of.OutputFiles(manifest_path=manifest_path)
+
+    outputs.write_bytes(tmp_path / "a.txt", b"a")
+    assert not manifest_path.exists()
+    outputs.write_bytes(tmp_path / "b.txt", b"b")
+    assert len(json.loads(manifest_path.read_text())) == 2
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{broken")
+    outputs = of.OutputFiles(manifest_path=manifest_path)
+
+    assert outputs.write_bytes(tmp_path / "a.txt", b"a")
+    outputs.save()
+    assert len(json.loads(manifest_path.read_text())) == 1
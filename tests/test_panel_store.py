@@ -0,0 +1,79 @@
+from src.usa_forecast.storage import panel_store as ps
+
+import pandas as pd
+import pyarrow as pa
+
+#%%
+
+
+def test_round_trip_keeps_each_ticker_and_its_coverage(tmp_path, ticker_frame):
+    store = ps.PanelStore(str(tmp_path / "panel.arrow"))
+    data = {"AAA": ticker_frame(rows=10), "BBB": ticker_frame(rows=4, start="2024-03-01", seed=1)}
+    data["BBB"]["extra"] = 1.0
+
+    store.write(data)
+    panel = store.open()
+
+    assert list(panel) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(panel["BBB"], data["BBB"], check_freq=False, check_index_type=False)
+    assert panel["AAA"]["extra"].isna().all()
+    assert panel.coverage("BBB") == (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-06"))
+    assert panel.coverage("CCC") is None
+    assert isinstance(panel.table("AAA"), pa.Table)
+
+
+def test_no_panel_yet(tmp_path):
+    store = ps.PanelStore(str(tmp_path / "panel.arrow"))
+
+    assert not store.exists()
+    assert store.open() is None
+
+
+def test_new_panel_is_written_beside_a_mapped_one(tmp_path, ticker_frame):
+    store = ps.PanelStore(str(tmp_path / "panel.arrow"))
+    store.write({"AAA": ticker_frame(rows=10)})
+    first_path = store.current_path()
+    served = store.open()["AAA"]
+
+    store.write({"AAA": ticker_frame(rows=11)})
+
+    assert store.current_path() != first_path
+    assert len(store.open()["AAA"]) == 11
+    # Frames already served keep reading the panel they came from
+    assert len(served) == 10
+
+
+def test_identical_panel_is_not_rewritten(tmp_path, ticker_frame):
+    store = ps.PanelStore(str(tmp_path / "panel.arrow"))
+    store.write({"AAA": ticker_frame(rows=10)})
+    path = store.current_path()
+    mtime = path.stat().st_mtime_ns
+
+    store.write({"AAA": ticker_frame(rows=10)})
+
+    assert store.current_path() == path
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_old_versions_are_removed_once_released(tmp_path, monkeypatch, ticker_frame):
+    store = ps.PanelStore(str(tmp_path / "panel.arrow"))
+    store.write({"AAA": ticker_frame(rows=10)})
+    first_path = store.current_path()
+
+    # A version still mapped on Windows cannot be deleted: it stays until a later write
+    real_unlink = type(first_path).unlink
+
+    def locked_unlink(path, *args, **kwargs):
+        if path == first_path:
+            raise PermissionError("file in use")
+        return real_unlink(path, *args, **kwargs)
+
+    monkeypatch.setattr(type(first_path), "unlink", locked_unlink)
+    store.write({"AAA": ticker_frame(rows=11)})
+    assert first_path.exists()
+
+    monkeypatch.setattr(type(first_path), "unlink", real_unlink)
+    store.write({"AAA": ticker_frame(rows=12)})
+    assert sorted(path.name for path in tmp_path.glob("panel.*")) == sorted(
+        [store.current_path().name, store.pointer_path.name]
+    )
@@ -0,0 +1,94 @@
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.calculations import precision as pr
+from src.usa_forecast.calculations import price_calculations as pc
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10, 15)
+
+
+@pytest.fixture
+def results(ticker_frame) -> dict:
+    return {
+        ticker: pc.calculate_price_targets(df=ticker_frame(rows=400, seed=seed), column="close", lags=LAGS)
+        for seed, ticker in enumerate(["AAA", "BBB"])
+    }
+
+
+def test_compact_frame_keeps_the_inputs_of_the_targets_in_float64(results):
+    df = results["AAA"].assign(sector="tech")
+
+    compact = pr.compact_frame(df)
+
+    for name in ["open", "high", "low", "close", "P5", "P10", "P15", "52_week_low"]:
+        assert compact[name].dtype == np.float64, name
+    for name in ["Max%_5", "MaxPT_10", "AvgMax", "MinMax", "MaxMin", "Rate"]:
+        assert compact[name].dtype == np.float32, name
+    assert compact["volume"].dtype == np.int32
+    assert isinstance(compact["sector"].dtype, pd.CategoricalDtype)
+    assert df["AvgMax"].dtype == np.float64
+
+
+def test_float64_policy_returns_the_same_frame(results):
+    assert pr.compact_frame(results["AAA"], precision="float64") is results["AAA"]
+
+
+def test_lazy_frames_pass_through(results, ticker_frame):
+    lazy = lt.LazyTargetFrame(base=ticker_frame(rows=400), lags=LAGS)
+
+    compact = pr.compact_results({"AAA": results["AAA"], "LAZY": lazy})
+
+    assert compact["LAZY"] is lazy
+    assert compact["AAA"]["Rate"].dtype == np.float32
+
+
+def test_relative_error_treats_nan_pairs_as_equal():
+    original = pd.DataFrame({"x": [1.0, np.nan, np.nan], "y": [2.0, 3.0, 4.0]})
+
+    assert pr.max_relative_error(original, original.astype(np.float32)) == 0.0
+    assert pr.max_relative_error(original, original.fillna(0.0)) == np.inf
+    assert pr.max_relative_error(pd.DataFrame({"n": [1, 2]}), pd.DataFrame({"n": [1, 2]})) == 0.0
+
+
+def test_savings_report_within_the_tolerance(results):
+    compact = pr.compact_results(results)
+
+    report = pr.savings_report(results, compact)
+
+    assert list(report.index) == ["AAA", "BBB", "TOTAL"]
+    assert report["within_tolerance"].all()
+    assert 0 < report.loc["TOTAL", "max_relative_error"] <= pr.TOLERANCE
+    assert report.loc["TOTAL", "memory_after"] < report.loc["TOTAL", "memory_before"]
+    assert report.loc["TOTAL", "memory_before"] == report.loc[["AAA", "BBB"], "memory_before"].sum()
+
+
+def test_savings_report_flags_errors_over_the_tolerance(results, caplog):
+    compact = pr.compact_results(results)
+    compact["BBB"] = compact["BBB"].copy()
+    compact["BBB"].iloc[-1, compact["BBB"].columns.get_loc("AvgMax")] *= 1 + 10 * pr.TOLERANCE
+
+    with caplog.at_level(logging.WARNING, logger="myAppLogger"):
+        report = pr.savings_report(results, compact)
+
+    assert list(report["within_tolerance"]) == [True, False, False]
+    assert "[BBB]" in caplog.text
+
+
+def test_empty_report():
+    assert pr.savings_report({}, {}).empty
+
+
+def test_report_is_written_through_the_output_layer(results, outputs, tmp_path):
+    path = tmp_path / "precision_report.csv"
+
+    pr.write_savings_report(results, pr.compact_results(results), str(path))
+
+    report = pd.read_csv(path, index_col=0)
+    assert list(report.index) == ["AAA", "BBB", "TOTAL"]
+    assert outputs.written == 1
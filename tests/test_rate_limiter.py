@@ -0,0 +1,185 @@
+from src.usa_forecast.data_download import rate_limiter as rl
+from src.usa_forecast.exceptions import ResponseCacheMissError
+
+import asyncio
+import email.message
+import http.client
+import io
+import time
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+#%%
+
+
+def http_error(code: int, retry_after: str | None = None) -> HTTPError:
+    headers = email.message.Message()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return HTTPError("https://example.com", code, "error", headers, io.BytesIO())
+
+
+@pytest.mark.parametrize("error", [
+    http_error(429),
+    http_error(500),
+    http_error(503),
+    URLError("connection refused"),
+    ConnectionResetError(),
+    TimeoutError(),
+    asyncio.TimeoutError(),
+    http.client.IncompleteRead(b""),
+])
+def test_transient_errors_are_retryable(error):
+    assert rl.is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    http_error(400),
+    http_error(401),
+    http_error(404),
+    ValueError("bad payload"),
+    ResponseCacheMissError("not cached"),
+])
+def test_permanent_errors_are_not_retryable(error):
+    assert not rl.is_retryable(error)
+
+
+def test_backoff_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(rl.random, "uniform", lambda low, high: high)
+
+    assert [rl.backoff_delay(attempt) for attempt in range(7)] == [1, 2, 4, 8, 16, 30, 30]
+    assert rl.backoff_delay(3, base_delay=0.5, max_delay=3.0) == 3.0
+
+
+def test_call_with_retries_retries_only_retryable_errors(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rl.time, "sleep", sleeps.append)
+    errors = [http_error(503), URLError("down")]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert rl.call_with_retries(flaky, max_retries=3) == "ok"
+    assert len(sleeps) == 2
+
+    def bad_payload():
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        rl.call_with_retries(bad_payload, max_retries=3)
+    assert len(sleeps) == 2
+
+
+def test_call_with_retries_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(rl.time, "sleep", lambda delay: None)
+    calls = []
+
+    def always_throttled():
+        calls.append(1)
+        raise http_error(429)
+
+    with pytest.raises(HTTPError):
+        rl.call_with_retries(always_throttled, max_retries=2)
+    assert len(calls) == 3
+
+
+def test_async_retries(monkeypatch):
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr(rl.asyncio, "sleep", no_sleep)
+    errors = [TimeoutError()]
+
+    async def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert asyncio.run(rl.call_with_retries_async(flaky, max_retries=1)) == "ok"
+
+
+def test_limit_grows_additively_on_fast_responses():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=0, max_concurrency=8, target_latency=1.0)
+    assert limiter.concurrency_limit == 4
+
+    # About +1 per limit-worth of responses under the target latency (+1/limit each)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.concurrency_limit == 5
+
+    for _ in range(200):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.concurrency_limit == 8
+
+
+def test_limit_halves_on_slow_responses_down_to_the_minimum():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=0, max_concurrency=8, target_latency=0.0)
+
+    limiter.acquire()
+    limiter.release(latency=5.0)
+    assert limiter.concurrency_limit == 2
+
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(latency=5.0)
+    assert limiter.concurrency_limit == 1
+
+
+def test_burst_of_slow_responses_is_one_congestion_event():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=0, max_concurrency=16, target_latency=60.0)
+
+    for _ in range(3):
+        limiter.acquire()
+    for _ in range(3):
+        limiter.release(latency=120.0)
+
+    assert limiter.concurrency_limit == 4
+
+
+def test_throttle_halves_the_limit_and_pauses_the_bucket():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=600, max_concurrency=8)
+
+    with pytest.raises(HTTPError):
+        with limiter.slot():
+            raise http_error(429, retry_after="30")
+
+    assert limiter.concurrency_limit == 2
+    assert limiter._try_acquire() == pytest.approx(30, abs=1)
+
+
+def test_failed_request_frees_its_slot_without_changing_the_limit():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=0, max_concurrency=2)
+
+    with pytest.raises(ConnectionError):
+        with limiter.slot():
+            raise ConnectionError("reset")
+
+    assert limiter.concurrency_limit == 1
+    assert limiter._in_flight == 0
+
+
+def test_concurrency_limit_blocks_extra_requests():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=0, max_concurrency=2)
+
+    limiter.acquire()
+    assert limiter._try_acquire() > 0
+    limiter.release(latency=0.1)
+    assert limiter._try_acquire() == 0
+
+
+def test_token_bucket_caps_the_rate():
+    limiter = rl.AdaptiveRateLimiter(rate_per_minute=60, max_concurrency=100, target_latency=100)
+    limiter._limit = 100.0
+
+    started = time.monotonic()
+    for _ in range(int(limiter.capacity)):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.5
+
+    # The bucket is empty: the next token takes about a second at one request per second
+    assert limiter._try_acquire() == pytest.approx(1.0, abs=0.1)
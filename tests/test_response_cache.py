@@ -0,0 +1,145 @@
+from src.usa_forecast.data_download import response_cache as rc
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import http_session as hs
+from src.usa_forecast.exceptions import ResponseCacheMissError
+
+import datetime
+import os
+import time
+
+import pytest
+
+#%%
+
+PAYLOAD = [b'[{"date": "2024-01-02", ', b'"close": 1.5}]']
+
+
+def store(cache: rc.ResponseCache, key: str, chunks=PAYLOAD) -> None:
+    for _ in cache.tee(key=key, chunks=iter(chunks)):
+        pass
+
+
+def age(cache: rc.ResponseCache, key: str, seconds: float) -> None:
+    path = cache._path(key)
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return rc.ResponseCache(directory=str(tmp_path / "http"), intraday_ttl=60)
+
+
+def test_key_ignores_the_url_and_separates_namespaces():
+    key = rc.ResponseCache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+
+    assert key == rc.ResponseCache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+    assert key != rc.ResponseCache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31", namespace="standin")
+    assert key != rc.ResponseCache.make_key("eod", "MSFT", "2024-01-01", "2024-12-31")
+
+
+def test_tee_stores_the_body_it_yields(cache):
+    key = cache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+
+    assert list(cache.tee(key=key, chunks=iter(PAYLOAD))) == PAYLOAD
+
+    path = cache.lookup(key=key, end="2024-12-31")
+    assert path is not None
+    assert b"".join(cache.iter_cached(path, chunk_size=4)) == b"".join(PAYLOAD)
+
+
+def test_open_range_expires_after_the_ttl(cache):
+    today = datetime.date.today().isoformat()
+    key = cache.make_key("eod", "AAPL", "2024-01-01", today)
+    store(cache, key)
+
+    assert cache.lookup(key=key, end=today) is not None
+    age(cache, key, 120)
+    assert cache.lookup(key=key, end=today) is None
+
+
+def test_endpoint_without_range_expires_after_the_ttl(cache):
+    key = cache.make_key("1min", "AAPL")
+    store(cache, key)
+
+    age(cache, key, 30)
+    assert cache.lookup(key=key) is not None
+    age(cache, key, 61)
+    assert cache.lookup(key=key) is None
+
+
+def test_closed_range_never_expires(cache):
+    key = cache.make_key("eod", "AAPL", "2010-01-01", "2010-12-31")
+    store(cache, key)
+
+    age(cache, key, 10 * 365 * 86400)
+    assert cache.lookup(key=key, end="2010-12-31") is not None
+
+
+def test_range_fetched_on_its_end_date_expires_after_the_ttl(cache):
+    # Written while the end date was still today: its last bars may have been missing
+    end = datetime.date.today() - datetime.timedelta(days=3)
+    key = cache.make_key("eod", "AAPL", "2024-01-01", end.isoformat())
+    store(cache, key)
+    fetched = datetime.datetime.combine(end, datetime.time(12)).timestamp()
+    os.utime(cache._path(key), (fetched, fetched))
+
+    assert cache.lookup(key=key, end=end.isoformat()) is None
+    assert rc.ResponseCache.is_closed_range(end.isoformat())
+    assert not rc.ResponseCache.is_closed_range(end.isoformat(), fetched=end)
+
+
+def test_error_payloads_are_not_cached(cache):
+    key = cache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+    store(cache, key, chunks=[b'{"Error Message": "Limit Reach"}'])
+
+    assert cache.lookup(key=key, end="2024-12-31") is None
+
+
+def test_interrupted_body_is_not_cached(cache):
+    key = cache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+
+    def broken():
+        yield PAYLOAD[0]
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        store(cache, key, chunks=broken())
+
+    assert cache.lookup(key=key, end="2024-12-31") is None
+    assert not list(cache.directory.rglob("*.tmp"))
+
+
+def test_off_mode_bypasses_the_cache(tmp_path):
+    cache = rc.ResponseCache(directory=str(tmp_path / "http"), mode="off")
+    key = cache.make_key("eod", "AAPL", "2024-01-01", "2024-12-31")
+    store(cache, key)
+
+    assert cache.lookup(key=key, end="2024-12-31") is None
+    assert not cache.directory.exists()
+
+
+def test_replay_serves_stale_entries_and_raises_on_a_miss(tmp_path):
+    cache = rc.ResponseCache(directory=str(tmp_path / "http"), mode="replay", intraday_ttl=0)
+    key = cache.make_key("1min", "AAPL")
+    store(cache, key)
+    age(cache, key, 86400)
+
+    assert cache.lookup(key=key) is not None
+    with pytest.raises(ResponseCacheMissError):
+        cache.lookup(key=cache.make_key("1min", "MSFT"))
+
+
+def test_replay_miss_never_reaches_the_network(tmp_path, monkeypatch):
+    # The shared cache is put back when the test ends
+    monkeypatch.setattr(rc, "_cache", rc._cache)
+    rc.configure_cache(directory=str(tmp_path / "http"), mode="replay")
+    monkeypatch.setattr(hs, "get_session", lambda: pytest.fail("network call in replay mode"))
+
+    with pytest.raises(ResponseCacheMissError):
+        fmd.fetch_eod_price_data(ticker="AAPL", start_date="2024-01-01", end_date="2024-12-31", api_key="key")
+
+
+def test_invalid_mode_raises(tmp_path):
+    with pytest.raises(ValueError):
+        rc.ResponseCache(directory=str(tmp_path), mode="write_only")
@@ -0,0 +1,120 @@
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.calculations import price_calculations as pc
+from src.usa_forecast.storage import sql_store as sq
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return sq.SqlStore(path=str(tmp_path / "forecast.sqlite"))
+
+
+@pytest.fixture
+def results(ticker_frame) -> dict:
+    return {
+        "AAA": pc.calculate_price_targets(df=ticker_frame(lags=LAGS, rows=300, seed=1), column="close", lags=LAGS),
+        "BBB": pc.calculate_price_targets(df=ticker_frame(lags=LAGS, rows=250, seed=2), column="close", lags=LAGS),
+    }
+
+
+def summary(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(2, 2)), index=["Close", "Rate"], columns=["AAA", "BBB"])
+    df.iloc[0, 1] = np.nan
+    return df
+
+
+def test_ticker_range_matches_the_frame(store, results):
+    store.write_results(results)
+
+    df = store.ticker_range("AAA", "2023-03-01", "2023-06-30")
+
+    expected = results["AAA"].loc["2023-03-01":"2023-06-30"]
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_index_type=False)
+    assert list(store.ticker_range("AAA", columns=["close", "Rate"]).columns) == ["close", "Rate"]
+    assert store.ticker_range("AAA", "2030-01-01").empty
+
+
+def test_only_changed_rows_are_written(store, results):
+    df = results["AAA"]
+    assert store.write_ticker("AAA", df) == 2 * len(df)
+    assert store.write_ticker("AAA", df) == 0
+
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc("Rate")] += 1.0
+    assert store.write_ticker("AAA", changed) == 1
+
+    # Dates no longer present are deleted from both tables
+    assert store.write_ticker("AAA", changed.iloc[:-3]) == 6
+    assert store.last_date("AAA") == changed.index[-4].date()
+
+
+def test_new_derived_columns_are_added(store, results):
+    store.write_ticker("AAA", results["AAA"])
+
+    store.write_ticker("AAA", results["AAA"].assign(Extra=1.5))
+
+    assert store.ticker_range("AAA", columns=["Extra"])["Extra"].eq(1.5).all()
+
+
+def test_lazy_frames_are_materialized(store, ticker_frame, results):
+    lazy = lt.LazyTargetFrame(base=ticker_frame(lags=LAGS, rows=300, seed=1), lags=LAGS)
+
+    store.write_ticker("AAA", lazy)
+
+    pd.testing.assert_frame_equal(
+        store.ticker_range("AAA"), lazy.to_frame(), check_freq=False, check_index_type=False
+    )
+
+
+def test_cross_section_uses_the_last_date_of_each_ticker(store, results):
+    store.write_results(results)
+    date = results["AAA"].index[-1]
+
+    df = store.cross_section(date, columns=["close"])
+
+    assert list(df.index) == ["AAA", "BBB"]
+    assert df.loc["AAA", "date"] == date
+    assert df.loc["BBB", "date"] == results["BBB"].index[-1]
+    assert df.loc["BBB", "close"] == results["BBB"]["close"].iloc[-1]
+    assert list(store.cross_section(date, tickers=["BBB"]).index) == ["BBB"]
+
+
+def test_summaries_round_trip_and_replace_their_date(store):
+    store.write_summaries({datetime.date(2024, 3, 1): summary(0), datetime.date(2024, 3, 4): summary(1)})
+    store.write_summaries({datetime.date(2024, 3, 4): summary(2)})
+
+    pd.testing.assert_frame_equal(store.summary("2024-03-04"), summary(2))
+    assert store.summary("2024-03-05") is None
+
+    df = store.summary_range("2024-03-01", "2024-03-04", metrics=["Close"], tickers=["AAA"])
+    assert list(df["value"]) == [summary(0).loc["Close", "AAA"], summary(2).loc["Close", "AAA"]]
+
+
+def test_date_queries_use_the_indexes(store, results):
+    store.write_results(results)
+
+    plans = {
+        table: " ".join(row[-1] for row in store._connection().execute(
+            f"EXPLAIN QUERY PLAN SELECT ticker FROM {table} WHERE date = ?", ("2023-03-01",)
+        ))
+        for table in (sq.BARS_TABLE, sq.TARGETS_TABLE)
+    }
+
+    assert f"{sq.BARS_TABLE}_date" in plans[sq.BARS_TABLE]
+    assert f"{sq.TARGETS_TABLE}_date" in plans[sq.TARGETS_TABLE]
+    assert store.tickers() == ["AAA", "BBB"]
+
+
+def test_disabled_store(runtime):
+    assert sq.configure_sql_store(None) is None
+    assert sq.get_sql_store() is None
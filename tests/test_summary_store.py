@@ -0,0 +1,127 @@
+from src.usa_forecast.storage import summary_store as ss
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+
+def summary(seed: int, tickers: tuple = ("MSFT", "AAPL", "NVDA")) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(size=(3, len(tickers))),
+        index=["Price_Target_P5", "Close", "Lag_P5"],
+        columns=list(tickers),
+    )
+    df.iloc[0, 0] = np.nan
+    return df
+
+
+def partition_mtimes(store: ss.SummaryStore) -> dict:
+    return {path.parent.name: path.stat().st_mtime_ns for path in store._partition_paths()}
+
+
+def test_summary_round_trip_keeps_metric_and_ticker_order(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    df = summary(0)
+
+    store.write({datetime.date(2024, 3, 1): df})
+
+    pd.testing.assert_frame_equal(store.read("2024-03-01"), df)
+    assert store.read("2024-03-04") is None
+    assert store.read("2031-01-01") is None
+
+
+def test_write_upserts_dates(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    store.write({datetime.date(2024, 3, 1): summary(0), datetime.date(2024, 3, 4): summary(1)})
+
+    store.write({datetime.date(2024, 3, 4): summary(2), datetime.date(2024, 3, 5): summary(3)})
+
+    assert store.dates() == [datetime.date(2024, 3, 1), datetime.date(2024, 3, 4), datetime.date(2024, 3, 5)]
+    pd.testing.assert_frame_equal(store.read("2024-03-01"), summary(0))
+    pd.testing.assert_frame_equal(store.read("2024-03-04"), summary(2))
+
+
+def test_only_changed_partitions_are_rewritten(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    store.write({datetime.date(2023, 6, 1): summary(0), datetime.date(2024, 6, 3): summary(1)})
+    before = partition_mtimes(store)
+
+    store.write({datetime.date(2023, 6, 1): summary(0), datetime.date(2024, 6, 4): summary(2)})
+    after = partition_mtimes(store)
+
+    assert sorted(after) == ["year=2023", "year=2024"]
+    assert after["year=2023"] == before["year=2023"]
+    assert after["year=2024"] != before["year=2024"]
+
+
+def test_month_partitions(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path), partition="month")
+    store.write({datetime.date(2024, 1, 31): summary(0), datetime.date(2024, 2, 1): summary(1)})
+
+    assert sorted(path.parent.name for path in store._partition_paths()) == ["month=2024-01", "month=2024-02"]
+    assert store.dates("2024-02-01") == [datetime.date(2024, 2, 1)]
+    pd.testing.assert_frame_equal(store.read("2024-01-31"), summary(0))
+
+
+def test_read_range_filters_dates_tickers_and_metrics(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    store.write({datetime.date(2024, 3, day): summary(day) for day in (1, 4, 5, 6)})
+
+    df = store.read_range("2024-03-04", "2024-03-05", tickers=["AAPL"], metrics=["Close"])
+
+    assert list(df.columns) == ["date", "metric", "ticker", "value"]
+    assert list(df["date"]) == [pd.Timestamp("2024-03-04"), pd.Timestamp("2024-03-05")]
+    assert list(df["value"]) == [summary(4).loc["Close", "AAPL"], summary(5).loc["Close", "AAPL"]]
+
+
+def test_read_many_matches_the_written_summaries(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    written = {datetime.date(2023, 12, 29): summary(0), datetime.date(2024, 1, 2): summary(1, ("AAPL", "MSFT"))}
+    store.write(written)
+
+    result = store.read_many()
+
+    assert list(result) == sorted(written)
+    for date, df in written.items():
+        pd.testing.assert_frame_equal(result[date], df)
+
+
+def test_empty_store(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path / "missing"))
+
+    assert store.dates() == []
+    assert store.read_many() == {}
+    assert store.read_range().empty
+
+
+def test_invalid_partition_raises(tmp_path):
+    with pytest.raises(ValueError):
+        ss.SummaryStore(directory=str(tmp_path), partition="week")
+
+
+def test_delete_before_drops_whole_and_partial_partitions(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    dates = [datetime.date(2022, 5, 2), datetime.date(2023, 6, 1), datetime.date(2023, 9, 1), datetime.date(2024, 1, 2)]
+    store.write({date: summary(i) for i, date in enumerate(dates)})
+
+    assert store.delete_before("2023-07-01") == 2
+
+    assert store.dates() == [datetime.date(2023, 9, 1), datetime.date(2024, 1, 2)]
+    assert not (tmp_path / "year=2022").exists()
+    pd.testing.assert_frame_equal(store.read("2023-09-01"), summary(2))
+
+
+def test_delete_before_without_older_dates_rewrites_nothing(tmp_path):
+    store = ss.SummaryStore(directory=str(tmp_path))
+    store.write({datetime.date(2024, 3, 1): summary(0)})
+    before = partition_mtimes(store)
+
+    assert store.delete_before("2024-03-01") == 0
+    assert ss.SummaryStore(directory=str(tmp_path / "missing")).delete_before("2024-03-01") == 0
+
+    assert partition_mtimes(store) == before
@@ -0,0 +1,167 @@
+from src.usa_forecast.storage import ticker_store as ts
+
+import pandas as pd
+import pytest
+
+#%%
+
+
+def assert_same_data(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(result, expected, check_freq=False, check_index_type=False, check_names=False)
+
+
+@pytest.mark.parametrize("storage_format", ["csv", "parquet", "feather"])
+def test_round_trip(tmp_path, storage_format, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path), storage_format=storage_format)
+    df = ticker_frame()
+
+    store.write("AAPL", df)
+
+    assert store.path("AAPL").exists()
+    assert_same_data(store.read("AAPL"), df)
+    assert store.read("MSFT") is None
+
+
+@pytest.mark.parametrize("storage_format", ["parquet", "feather"])
+def test_read_a_subset_of_columns(tmp_path, storage_format, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path), storage_format=storage_format)
+    df = ticker_frame()
+    store.write("AAPL", df)
+
+    assert_same_data(store.read("AAPL", columns=["close", "P5"]), df[["close", "P5"]])
+
+
+@pytest.mark.parametrize("old_format, new_format", [
+    ("csv", "parquet"),
+    ("csv", "feather"),
+    ("parquet", "feather"),
+])
+def test_files_of_another_format_are_migrated(tmp_path, old_format, new_format, ticker_frame):
+    df = ticker_frame()
+    ts.TickerStore(directory=str(tmp_path), storage_format=old_format).write("AAPL", df)
+
+    store = ts.TickerStore(directory=str(tmp_path), storage_format=new_format)
+
+    assert store.exists("AAPL")
+    assert store.path("AAPL").exists()
+    assert not store.path("AAPL", old_format).exists()
+    assert_same_data(store.read("AAPL"), df)
+
+
+def test_legacy_csv_layout_is_migrated(tmp_path, ticker_frame):
+    # CSVs of older versions: unnamed date index column
+    df = ticker_frame()
+    df.rename_axis(None).to_csv(tmp_path / "AAPL.csv")
+
+    store = ts.TickerStore(directory=str(tmp_path), storage_format="parquet")
+
+    assert_same_data(store.read("AAPL"), df)
+    assert not (tmp_path / "AAPL.csv").exists()
+
+
+def test_invalid_settings_raise(tmp_path):
+    with pytest.raises(ValueError):
+        ts.TickerStore(directory=str(tmp_path), storage_format="xlsx")
+    with pytest.raises(ValueError):
+        ts.TickerStore(directory=str(tmp_path), compression="gzip")
+
+
+def segments(store: ts.TickerStore, ticker: str) -> list:
+    return sorted((store.directory / ts.SEGMENTS_DIR).glob(f"{ticker}.*"))
+
+
+def test_unchanged_data_is_not_written(tmp_path, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path))
+    df = ticker_frame()
+    store.write("AAPL", df)
+    mtime = store.path("AAPL").stat().st_mtime_ns
+
+    store.write("AAPL", df.copy())
+
+    assert store.path("AAPL").stat().st_mtime_ns == mtime
+    assert segments(store, "AAPL") == []
+
+
+def test_new_and_changed_rows_go_to_a_delta_segment(tmp_path, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path))
+    df = ticker_frame(rows=300)
+    store.write("AAPL", df.iloc[:295])
+    base_mtime = store.path("AAPL").stat().st_mtime_ns
+
+    updated = df.copy()
+    updated.iloc[294, updated.columns.get_loc("close")] = 1.0
+    store.write("AAPL", updated)
+
+    assert store.path("AAPL").stat().st_mtime_ns == base_mtime
+    assert len(segments(store, "AAPL")) == 1
+    assert len(pd.read_parquet(segments(store, "AAPL")[0])) == 6
+    assert store.describe("AAPL").segments == 1
+
+    # A fresh process merges the segment over the base file
+    assert_same_data(ts.TickerStore(directory=str(tmp_path)).read("AAPL"), updated)
+
+
+def test_large_change_rewrites_the_base_file(tmp_path, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path))
+    df = ticker_frame(rows=100)
+    store.write("AAPL", df.iloc[:90])
+    store.write("AAPL", df.iloc[:95])
+    assert len(segments(store, "AAPL")) == 1
+
+    changed = df.copy()
+    changed["close"] = changed["close"] * 2
+    store.write("AAPL", changed)
+
+    assert segments(store, "AAPL") == []
+    assert store.describe("AAPL").segments == 0
+    assert_same_data(ts.TickerStore(directory=str(tmp_path)).read("AAPL"), changed)
+
+
+def test_removed_dates_rewrite_the_base_file(tmp_path, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path))
+    df = ticker_frame(rows=100)
+    store.write("AAPL", df)
+
+    store.write("AAPL", df.iloc[10:])
+
+    assert segments(store, "AAPL") == []
+    assert_same_data(store.read("AAPL"), df.iloc[10:])
+
+
+def test_segments_are_compacted_after_max_segments(tmp_path, monkeypatch, ticker_frame):
+    monkeypatch.setattr(ts, "MAX_SEGMENTS", 3)
+    store = ts.TickerStore(directory=str(tmp_path))
+    df = ticker_frame(rows=300)
+
+    store.write("AAPL", df.iloc[:290])
+    for rows in range(291, 295):
+        store.write("AAPL", df.iloc[:rows])
+        assert len(segments(store, "AAPL")) == (rows - 290) % 4
+
+    assert_same_data(ts.TickerStore(directory=str(tmp_path)).read("AAPL"), df.iloc[:294])
+
+
+def test_compact_all_merges_every_segment(tmp_path, ticker_frame):
+    store = ts.TickerStore(directory=str(tmp_path))
+    for ticker, seed in [("AAA", 1), ("BBB", 2)]:
+        df = ticker_frame(seed=seed)
+        store.write(ticker, df.iloc[:-3])
+        store.write(ticker, df)
+
+    store.compact_all()
+
+    assert list((tmp_path / ts.SEGMENTS_DIR).iterdir()) == []
+    assert_same_data(ts.TickerStore(directory=str(tmp_path)).read("BBB"), ticker_frame(seed=2))
+
+
+def test_write_after_a_restart_appends_a_segment(tmp_path, ticker_frame):
+    df = ticker_frame(rows=300)
+    store = ts.TickerStore(directory=str(tmp_path))
+    store.write("AAPL", df.iloc[:299])
+    store.save_manifest()
+
+    restarted = ts.TickerStore(directory=str(tmp_path))
+    restarted.write("AAPL", df)
+
+    assert len(segments(restarted, "AAPL")) == 1
+    assert_same_data(ts.TickerStore(directory=str(tmp_path)).read("AAPL"), df)
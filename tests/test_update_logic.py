@@ -0,0 +1,97 @@
+from src.usa_forecast.data_download import fmp_standin as fs
+from src.usa_forecast.entities.configuration import Configuration
+from src.usa_forecast.services import update_logic as ul
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import ticker_store as ts
+
+import datetime
+
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10)
+TICKERS = ("AAA", "BBB", "CCC")
+LAST_DATE = (pd.Timestamp.today().normalize() - pd.offsets.BDay(3)).date().isoformat()
+
+
+def configuration(**changes) -> Configuration:
+    values = dict(
+        start_date=datetime.date(2023, 3, 1),
+        end_date=datetime.date.fromisoformat(LAST_DATE),
+        fmp_api_key="key",
+        tickers=TICKERS,
+        window_shift=LAGS,
+        stay_update="True",
+        summary_mode="latest",
+        summary_frequency="monthly",
+        summary_start_date=datetime.date(2024, 1, 1),
+        summary_end_date=datetime.date.fromisoformat(LAST_DATE),
+        latest_price_source="quote",
+        quote_batch_size=2,
+        max_retries=0,
+    )
+    values.update(changes)
+    return Configuration(**values)
+
+
+@pytest.fixture
+def mkt_data(ticker_frame) -> dict:
+    return {
+        ticker: ticker_frame(lags=LAGS, start="2023-01-02", end=LAST_DATE, seed=seed)
+        for seed, ticker in enumerate(TICKERS)
+    }
+
+
+def latest_close(ticker: str) -> float:
+    # The stand-in quotes the newest bar of its 1-minute history
+    return fs.synthetic_1min(ticker)[0]["close"]
+
+
+def test_quotes_refresh_every_ticker_in_batches(standin, mkt_data):
+    previous = {ticker: df.index.copy() for ticker, df in mkt_data.items()}
+
+    final_dict, updated = ul.update_with_latest_data(configuration=configuration(), mkt_data=mkt_data)
+    bw.flush()
+
+    today = pd.Timestamp(datetime.date.today())
+    assert standin.stats["requests"] == 2
+    assert list(updated) == list(TICKERS)
+    for ticker, df in updated.items():
+        assert df.index[-1] == today
+        assert df.index[:-1].equals(previous[ticker])
+        assert df["close"].iloc[-1] == latest_close(ticker)
+    assert ts.get_store().read("AAA").index[-1] == today
+    assert max(final_dict) == today.date()
+
+
+def test_failed_quotes_keep_the_previous_data(standin, mkt_data):
+    standin.throttle_rate = 1.0
+    previous = {ticker: df.copy() for ticker, df in mkt_data.items()}
+
+    _, updated = ul.update_with_latest_data(configuration=configuration(), mkt_data=mkt_data)
+    bw.flush()
+
+    assert standin.stats["throttled"] == 2
+    for ticker, df in updated.items():
+        pd.testing.assert_frame_equal(df, previous[ticker])
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_minute_bars_match_the_quotes(standin, mkt_data, engine):
+    settings = configuration(latest_price_source="1min", download_engine=engine)
+
+    minute = ul.fetch_latest_bars(source="1min", tickers=["AAA", "CCC"], mkt_data=mkt_data, configuration=settings)
+    quotes = ul.fetch_latest_bars(source="quote", tickers=["AAA", "CCC"], mkt_data=mkt_data, configuration=settings)
+
+    assert sorted(minute) == sorted(quotes) == ["AAA", "CCC"]
+    for ticker in minute:
+        assert len(minute[ticker]) == 1
+        assert minute[ticker]["close"].iloc[0] == quotes[ticker]["close"].iloc[0] == latest_close(ticker)
+
+
+@pytest.mark.parametrize("source", ["quote", "1min"])
+def test_no_tickers_make_no_requests(standin, mkt_data, source):
+    assert ul.fetch_latest_bars(source=source, tickers=[], mkt_data=mkt_data, configuration=configuration()) == {}
+    assert standin.stats["requests"] == 0
@@ -0,0 +1,189 @@
+from src.usa_forecast import usa_forecast_code as fc
+from src.usa_forecast.calculations import lazy_targets as lt
+from src.usa_forecast.data_download import fmp_mkt_data as fmd
+from src.usa_forecast.data_download import http_session as hs
+from src.usa_forecast.entities.configuration import Configuration
+from src.usa_forecast.services import warm_restart as wr
+from src.usa_forecast.storage import background_writer as bw
+from src.usa_forecast.storage import output_archive as oa
+from src.usa_forecast.storage import sql_store as sq
+from src.usa_forecast.storage import summary_store as ss
+from src.usa_forecast.storage import ticker_store as ts
+
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+#%%
+
+LAGS = (5, 10)
+END = "2024-06-28"
+
+
+def configuration(**changes) -> Configuration:
+    values = dict(
+        start_date=datetime.date(2023, 3, 1),
+        end_date=datetime.date(2024, 6, 28),
+        fmp_api_key="key",
+        tickers=("AAPL", "MSFT"),
+        window_shift=LAGS,
+        stay_update="True",
+        summary_mode="latest",
+        summary_frequency="monthly",
+        summary_start_date=datetime.date(2024, 1, 1),
+        summary_end_date=datetime.date(2024, 6, 28),
+    )
+    values.update(changes)
+    return Configuration(**values)
+
+
+@pytest.fixture
+def mkt_data(ticker_frame) -> dict:
+    return {
+        ticker: ticker_frame(lags=LAGS, end=END, seed=seed)
+        for seed, ticker in enumerate(["AAPL", "MSFT"])
+    }
+
+
+@pytest.fixture
+def stored(ticker_store, mkt_data):
+    for ticker, df in mkt_data.items():
+        ticker_store.write(ticker, df)
+    ticker_store.save_manifest()
+    return ticker_store
+
+
+def computed_state(mkt_data: dict) -> dict:
+    summary = pd.DataFrame({"AAPL": [1.0, np.nan], "MSFT": [2.0, 3.0]}, index=["Close", "AvgMax"])
+    return {"final_dict": {datetime.date(2024, 6, 28): summary}, "mkt_data": mkt_data}
+
+
+def test_round_trip(stored, mkt_data):
+    state = computed_state(mkt_data)
+
+    assert wr.save_state(configuration(), state, directory="state")
+    loaded = wr.load_state(configuration(), directory="state")
+
+    assert list(loaded) == ["final_dict", "mkt_data"]
+    date = datetime.date(2024, 6, 28)
+    assert list(loaded["final_dict"]) == [date]
+    pd.testing.assert_frame_equal(loaded["final_dict"][date], state["final_dict"][date])
+    pd.testing.assert_frame_equal(loaded["mkt_data"]["MSFT"], state["mkt_data"]["MSFT"], check_freq=False, check_index_type=False)
+
+
+def test_lazy_results_come_back_lazy(stored, mkt_data):
+    frames = {ticker: lt.LazyTargetFrame(df, lags=LAGS) for ticker, df in mkt_data.items()}
+
+    assert wr.save_state(configuration(), {"mkt_data": lt.LazyResults(frames)}, directory="state")
+    loaded = wr.load_state(configuration(), directory="state")["mkt_data"]
+
+    assert isinstance(loaded, lt.LazyResults)
+    assert loaded.frame("AAPL").lookback == lt.LOOKBACK
+    pd.testing.assert_frame_equal(loaded["AAPL"], frames["AAPL"].to_frame(), check_freq=False, check_index_type=False)
+
+
+def test_hash_follows_the_configuration_and_the_data(stored, ticker_frame):
+    first = wr.inputs_hash(configuration())
+
+    assert wr.inputs_hash(configuration()) == first
+    assert wr.inputs_hash(configuration(summary_mode="daily")) != first
+
+    stored.write("AAPL", ticker_frame(lags=LAGS, end=END, seed=7))
+    assert wr.inputs_hash(configuration()) != first
+
+
+def test_hash_follows_the_lookback(stored, monkeypatch):
+    first = wr.inputs_hash(configuration())
+
+    monkeypatch.setattr(lt, "LOOKBACK", lt.LOOKBACK + 1)
+
+    assert wr.inputs_hash(configuration()) != first
+
+
+def test_no_hash_when_a_ticker_would_be_downloaded(stored, mkt_data):
+    assert wr.inputs_hash(configuration(tickers=("AAPL", "NVDA"))) is None
+    assert wr.inputs_hash(configuration(end_date=datetime.date(2024, 7, 1))) is None
+    assert not wr.save_state(configuration(tickers=("NVDA",)), computed_state(mkt_data), directory="state")
+
+
+def test_changed_data_invalidates_the_snapshot(stored, mkt_data, ticker_frame):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+
+    stored.write("MSFT", ticker_frame(lags=LAGS, end=END, seed=9))
+    stored.save_manifest()
+
+    assert wr.load_state(configuration(), directory="state") is None
+
+
+def test_changed_configuration_invalidates_the_snapshot(stored, mkt_data):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+
+    assert wr.load_state(configuration(window_shift=(5,)), directory="state") is None
+
+
+def test_snapshot_without_an_expected_group_is_ignored(stored, mkt_data):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+
+    assert wr.load_state(configuration(), directory="state", groups=("final_dict", "mkt_data")) is not None
+    assert wr.load_state(configuration(), directory="state", groups=("final_dict", "date_dict")) is None
+
+
+def test_snapshot_of_another_version_is_ignored(stored, tmp_path, mkt_data):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+    state_path = tmp_path / "state" / wr.STATE_FILE
+    raw = json.loads(state_path.read_text())
+    raw["version"] = wr.SNAPSHOT_VERSION + 1
+    state_path.write_text(json.dumps(raw))
+
+    assert wr.load_state(configuration(), directory="state") is None
+
+
+def test_corrupt_snapshot_is_ignored(stored, tmp_path, mkt_data):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+    for path in (tmp_path / "state").glob("*.arrow"):
+        path.write_bytes(b"not arrow")
+
+    assert wr.load_state(configuration(), directory="state") is None
+
+    (tmp_path / "state" / wr.STATE_FILE).write_text("{broken")
+    assert wr.load_state(configuration(), directory="state") is None
+
+
+def test_a_new_snapshot_replaces_the_old_files(stored, tmp_path, mkt_data):
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+    wr.save_state(configuration(), computed_state(mkt_data), directory="state")
+
+    assert len(list((tmp_path / "state").glob("*.arrow"))) == 2
+
+
+def test_snapshot_load_sets_up_the_runtime(runtime, mkt_data):
+    settings = configuration(
+        background_writes="False",
+        summary_partition="month",
+        storage_compression="lz4",
+        compaction_days=30,
+        sql_store="True",
+        fmp_base_url="http://127.0.0.1:8000",
+        http_max_per_host=3,
+    )
+    fc.configure_runtime(configuration=settings)
+    for ticker, df in mkt_data.items():
+        ts.get_store().write(ticker, df)
+    ts.get_store().save_manifest()
+    assert wr.save_state(settings, computed_state(mkt_data), directory="state")
+
+    # A new process loading the snapshot instead of running main
+    runtime()
+    fc.configure_runtime(configuration=settings)
+    assert wr.load_state(settings, directory="state") is not None
+
+    assert not bw.get_writer().enabled
+    assert (ts.get_store().storage_format, ts.get_store().compression) == ("parquet", "lz4")
+    assert (ss.get_summary_store().partition, ss.get_summary_store().compression) == ("month", "lz4")
+    assert oa.get_summary_archive().compaction_days == oa.get_daily_archive().compaction_days == 30
+    assert sq.get_sql_store() is not None
+    assert fmd.get_base_url() == "http://127.0.0.1:8000"
+    assert hs.get_session().max_per_host == 3